@@ -5,7 +5,7 @@ from datetime import date, timedelta
 from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
 from sqlalchemy import select, func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 
 from app.db.session import get_db
 from app.models.user_models import AuditLog, User
@@ -45,6 +45,8 @@ def list_audit_logs(
     query = (
         select(AuditLog, User.username.label("username"))
         .outerjoin(User, AuditLog.user_id == User.id)
+        # Lista prikazuje diff na klik, pa trebaju old/new; `data` se ne čita
+        .options(undefer(AuditLog.old_values), undefer(AuditLog.new_values))
     )
 
     if user_id:
@@ -6,6 +6,7 @@ from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel
+from sqlalchemy import bindparam, false, select
 from sqlalchemy.orm import Session
 
 from app.core.audit import audit_log
@@ -18,14 +19,20 @@ from app.core.security import (
     hash_password,
     verify_password,
 )
-from app.core.deps import get_current_active_user
+from app.core.deps import USER_BY_USERNAME, get_current_active_user
+from app.core.role_cache import get_role_snapshot
 from app.db.session import get_db
-from app.models.user_models import User, RefreshToken
+from app.models.user_models import RefreshToken, User
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/auth")
 
+# Upiti auth puta grade se jednom po procesu; vrijednosti idu kroz bindparam
+# pa SQLAlchemy ne mora graditi novi Query ni ključ cachea po requestu.
+_REFRESH_TOKEN_BY_HASH = select(RefreshToken).where(RefreshToken.token_hash == bindparam("token_hash"))
+_ACTIVE_REFRESH_TOKEN_BY_HASH = _REFRESH_TOKEN_BY_HASH.where(RefreshToken.revoked == false())
+
 
 # ---------------------------------------------------------------------------
 # Schemas
@@ -63,9 +70,13 @@ class UserMeResponse(BaseModel):
 # ---------------------------------------------------------------------------
 
 def _get_user_permissions(user: User) -> list[str]:
-    if user.role is None:
-        return []
-    return [p.name for p in user.role.permissions]
+    role = get_role_snapshot(user)
+    return sorted(role.permissions) if role else []
+
+
+def _get_role_name(user: User) -> str:
+    role = get_role_snapshot(user)
+    return role.name if role else "Viewer"
 
 
 def _set_auth_cookies(response: Response, access: str, refresh: str, remember: bool) -> None:
@@ -123,7 +134,7 @@ def _check_brute_force(user: User) -> None:
 
 @router.post("/login")
 def login(body: LoginRequest, request: Request, response: Response, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == body.username).first()
+    user = db.execute(USER_BY_USERNAME, {"username": body.username}).scalars().first()
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Pogrešno korisničko ime ili lozinka.")
 
@@ -141,7 +152,7 @@ def login(body: LoginRequest, request: Request, response: Response, db: Session
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Korisnički račun je zaključan.")
 
     perms = _get_user_permissions(user)
-    role_name = user.role.name if user.role else "Viewer"
+    role_name = _get_role_name(user)
 
     access = create_access_token(user.id, role_name, user.warehouse_id, perms)
     refresh = create_refresh_token(user.id, body.remember_me)
@@ -194,7 +205,7 @@ def logout(request: Request, response: Response, db: Session = Depends(get_db)):
     refresh_cookie = request.cookies.get("refresh_token")
     if refresh_cookie:
         token_hash = _hash_token(refresh_cookie)
-        existing = db.query(RefreshToken).filter(RefreshToken.token_hash == token_hash).first()
+        existing = db.execute(_REFRESH_TOKEN_BY_HASH, {"token_hash": token_hash}).scalars().first()
         if existing:
             existing.revoked = True
             db.commit()
@@ -230,22 +241,19 @@ def refresh_token(request: Request, response: Response, db: Session = Depends(ge
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token je nevažeći.")
 
     token_hash = _hash_token(refresh_cookie)
-    stored = db.query(RefreshToken).filter(
-        RefreshToken.token_hash == token_hash,
-        RefreshToken.revoked == False,  # noqa: E712
-    ).first()
+    stored = db.execute(_ACTIVE_REFRESH_TOKEN_BY_HASH, {"token_hash": token_hash}).scalars().first()
     if stored is None:
         _clear_auth_cookies(response)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token je povučen.")
 
     user_id = int(payload["sub"])
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if user is None or not user.aktivan or user.locked:
         _clear_auth_cookies(response)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Korisnik nije dostupan.")
 
     perms = _get_user_permissions(user)
-    role_name = user.role.name if user.role else "Viewer"
+    role_name = _get_role_name(user)
     new_access = create_access_token(user.id, role_name, user.warehouse_id, perms)
 
     response.set_cookie(
@@ -263,7 +271,7 @@ def refresh_token(request: Request, response: Response, db: Session = Depends(ge
 @router.get("/me", response_model=UserMeResponse)
 def get_me(user: User = Depends(get_current_active_user)):
     perms = _get_user_permissions(user)
-    role_name = user.role.name if user.role else "Viewer"
+    role_name = _get_role_name(user)
     return UserMeResponse(
         id=user.id,
         username=user.username,
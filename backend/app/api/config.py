@@ -4,7 +4,7 @@ Config API endpointi.
 CRUD za settings i prioritete.
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
@@ -21,9 +21,22 @@ from app.schemas.config import (
     StatusOut,
     StatusUpdate,
 )
+from app.services.distance_service import invalidate_provider_cache
 
 router = APIRouter()
 
+# Broj ključeva po IN listi (MSSQL dopušta najviše 2100 parametara po upitu)
+_SETTINGS_CHUNK = 500
+
+# Postavka koju distance_service cache-ira – svaki upis mora poništiti taj cache
+_PROVIDER_KEY = "geocoding_provider"
+
+
+def _invalidate_provider_if_written(keys) -> None:
+    # Collation baze je case-insensitive pa i 'GEOCODING_PROVIDER' pogađa isti redak
+    if any(key.lower() == _PROVIDER_KEY for key in keys):
+        invalidate_provider_cache()
+
 
 # ==============================================================================
 # Settings CRUD
@@ -61,6 +74,7 @@ def create_setting(payload: SettingCreate, db: Session = Depends(get_db)) -> Set
     setting = Setting(key=payload.key, value=payload.value)
     db.add(setting)
     db.commit()
+    _invalidate_provider_if_written([payload.key])
     db.refresh(setting)
     return SettingOut.model_validate(setting)
 
@@ -80,6 +94,7 @@ def update_setting(
         setting.value = payload.value
 
     db.commit()
+    _invalidate_provider_if_written([key])
     db.refresh(setting)
     return SettingOut.model_validate(setting)
 
@@ -89,24 +104,28 @@ def bulk_update_settings(
     payload: SettingsBulkUpdate, db: Session = Depends(get_db)
 ) -> list[SettingOut]:
     """Bulk update postavki. Kreira nepostojeće."""
-    updated = []
-    for key, value in payload.settings.items():
-        setting = db.get(Setting, key)
-        if setting:
-            setting.value = value
-        else:
-            setting = Setting(key=key, value=value)
-            db.add(setting)
-        updated.append(setting)
+    keys = list(payload.settings)
+    existing: set[str] = set()
+    for i in range(0, len(keys), _SETTINGS_CHUNK):
+        existing.update(
+            db.execute(
+                select(Setting.key).where(Setting.key.in_(keys[i:i + _SETTINGS_CHUNK]))
+            ).scalars()
+        )
 
+    # Jedan executemany UPDATE i jedan INSERT umjesto get/refresh po ključu
+    rows = [{"key": key, "value": value} for key, value in payload.settings.items()]
+    to_update = [row for row in rows if row["key"] in existing]
+    to_insert = [row for row in rows if row["key"] not in existing]
+    if to_update:
+        db.execute(update(Setting), to_update)
+    if to_insert:
+        db.execute(insert(Setting), to_insert)
     db.commit()
+    _invalidate_provider_if_written(keys)
 
-    # Refresh i vrati
-    result = []
-    for s in updated:
-        db.refresh(s)
-        result.append(SettingOut.model_validate(s))
-    return result
+    # Vrijednosti su upravo zapisane — odgovor se gradi iz payloada, bez refresha
+    return [SettingOut.model_construct(**row) for row in rows]
 
 
 @router.delete("/settings/{key}", status_code=status.HTTP_204_NO_CONTENT)
@@ -119,6 +138,7 @@ def delete_setting(key: str, db: Session = Depends(get_db)) -> None:
         )
     db.delete(setting)
     db.commit()
+    _invalidate_provider_if_written([key])
 
 
 # ==============================================================================
@@ -13,7 +13,7 @@ import uuid
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, Response, UploadFile, status
-from pydantic import BaseModel
+from pydantic import BaseModel, SkipValidation
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -23,7 +23,8 @@ from app.core.security import (
     create_refresh_token,
     verify_password,
 )
-from app.core.deps import get_current_active_user
+from app.core.deps import USER_BY_USERNAME, get_current_active_user
+from app.core.role_cache import get_role_snapshot
 from app.db.session import get_db
 from app.models.driver_models import DeliveryProof, DriverLocation, DriverSession
 from app.models.erp_models import NalogHeader, Partner
@@ -72,7 +73,7 @@ class DriverRouteOut(BaseModel):
     vozilo_oznaka: str | None = None
     vozilo_registracija: str | None = None
     stops: list[DriverRouteStopOut] = []
-    polyline: list[list[float]] | None = None
+    polyline: SkipValidation[list[list[float]] | None] = None
 
 
 class LocationUpdate(BaseModel):
@@ -173,7 +174,7 @@ def driver_login(
     db: Session = Depends(get_db),
 ):
     """Driver login — authenticates and creates a driver session linked to a vehicle."""
-    user = db.query(User).filter(User.username == body.username).first()
+    user = db.execute(USER_BY_USERNAME, {"username": body.username}).scalars().first()
     if not user:
         raise HTTPException(status_code=401, detail="Pogrešno korisničko ime ili lozinka.")
 
@@ -249,8 +250,9 @@ def driver_login(
     db.add(session)
     db.commit()
 
-    role_name = user.role.name if user.role else "Vozac"
-    perms = [p.name for p in user.role.permissions] if user.role else []
+    role = get_role_snapshot(user)
+    role_name = role.name if role else "Vozac"
+    perms = sorted(role.permissions) if role else []
     access = create_access_token(user.id, role_name, user.warehouse_id, perms)
     refresh = create_refresh_token(user.id)
 
@@ -389,15 +391,10 @@ def get_driver_routes(
         vozilo = db.get(Vozilo, ruta.vozilo_id) if ruta.vozilo_id else None
 
         # Load polyline
-        polyline: list[list[float]] | None = None
         polyline_obj = db.execute(
             select(RutaPolyline).where(RutaPolyline.ruta_id == ruta.id)
         ).scalar_one_or_none()
-        if polyline_obj and polyline_obj.polyline:
-            try:
-                polyline = json.loads(polyline_obj.polyline)
-            except (json.JSONDecodeError, TypeError):
-                pass
+        polyline = polyline_obj.coords if polyline_obj else None
 
         result.append(DriverRouteOut(
             id=ruta.id,
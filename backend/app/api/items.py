@@ -1,27 +1,41 @@
 import io
+import os
+import shutil
+import tempfile
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Response, UploadFile, status
 from fastapi.responses import StreamingResponse
 from openpyxl import Workbook
+from pydantic import TypeAdapter
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.models.erp_models import Artikl, ArtiklKriterija, GrupaArtikla, KriterijaSku
+from app.models.sync_models import SyncLog
 from app.schemas.items import (
     ArtiklKriterijaCreate,
-    ArtiklKriterijaImportResponse,
     ArtiklKriterijaOut,
     ArtiklOut,
     GrupaArtiklaOut,
     KriterijaSkuCreate,
     KriterijaSkuOut,
     KriterijaSkuUpdate,
+    artikl_out_from_orm,
+    grupa_artikla_out_from_orm,
 )
-from app.services.artikl_kriterija_import_service import import_artikl_kriterija_from_xlsx
+from app.schemas.sync import SyncResponse
+from app.services.artikl_kriterija_import_service import run_artikl_kriterija_import
 
 router = APIRouter()
 
+# Liste artikala/grupa (deseci tisuća redaka) čitaju samo kolone iz Out sheme,
+# grade modele bez validacije i serijaliziraju se jednim dump_json pozivom.
+_artikl_list_adapter = TypeAdapter(list[ArtiklOut])
+_ARTIKL_LIST_COLS = [getattr(Artikl, name) for name in ArtiklOut.model_fields]
+_grupa_list_adapter = TypeAdapter(list[GrupaArtiklaOut])
+_GRUPA_LIST_COLS = [getattr(GrupaArtikla, name) for name in GrupaArtiklaOut.model_fields]
+
 
 # ==============================================================================
 # Artikli (postojeći)
@@ -35,8 +49,8 @@ def list_artikli(
     limit: int = Query(default=100, ge=1, le=50000),
     offset: int = Query(default=0, ge=0),
     db: Session = Depends(get_db),
-) -> list[ArtiklOut]:
-    query = select(Artikl)
+) -> Response:
+    query = select(*_ARTIKL_LIST_COLS)
     if search:
         pattern = f"%{search}%"
         query = query.where(
@@ -45,15 +59,17 @@ def list_artikli(
     if grupa_uid:
         query = query.where(Artikl.grupa_artikla_uid == grupa_uid)
     query = query.order_by(Artikl.artikl).offset(offset).limit(limit)
-    return db.execute(query).scalars().all()
+    artikli = [artikl_out_from_orm(row) for row in db.execute(query)]
+    return Response(content=_artikl_list_adapter.dump_json(artikli), media_type="application/json")
 
 
 @router.get("/grupe-artikala", response_model=list[GrupaArtiklaOut])
 def list_grupe_artikala(
     db: Session = Depends(get_db),
-) -> list[GrupaArtiklaOut]:
-    query = select(GrupaArtikla).order_by(GrupaArtikla.grupa_artikla)
-    return db.execute(query).scalars().all()
+) -> Response:
+    query = select(*_GRUPA_LIST_COLS).order_by(GrupaArtikla.grupa_artikla)
+    grupe = [grupa_artikla_out_from_orm(row) for row in db.execute(query)]
+    return Response(content=_grupa_list_adapter.dump_json(grupe), media_type="application/json")
 
 
 # ==============================================================================
@@ -167,17 +183,47 @@ def delete_artikl_kriterija(ak_id: int, db: Session = Depends(get_db)):
     db.commit()
 
 
-@router.post("/artikli-kriterija/import", response_model=ArtiklKriterijaImportResponse)
-async def import_artikli_kriterija(
+@router.post(
+    "/artikli-kriterija/import",
+    response_model=SyncResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def import_artikli_kriterija(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-):
+) -> SyncResponse:
+    """
+    Pokreće import artikl-kriterija u backgroundu; status se prati preko
+    /sync/status/{sync_id}.
+    """
     if not file.filename or not file.filename.endswith(".xlsx"):
         raise HTTPException(status_code=400, detail="Samo XLSX datoteke su podržane.")
 
-    content = await file.read()
-    result = import_artikl_kriterija_from_xlsx(content, db)
-    return result
+    # Upload se zatvara s requestom — kopira se u privremenu datoteku za background posao
+    with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as tmp:
+        shutil.copyfileobj(file.file, tmp)
+        tmp_path = tmp.name
+
+    log = SyncLog(entity="artikli_kriterija", status="QUEUED", message="Import pokrenut...")
+    db.add(log)
+    db.commit()
+    db.refresh(log)
+
+    from app.db.session import SessionLocal
+
+    def run_import():
+        try:
+            with SessionLocal() as bg_db:
+                bg_log = bg_db.get(SyncLog, log.id)
+                if bg_log:
+                    run_artikl_kriterija_import(bg_db, bg_log, tmp_path)
+        finally:
+            os.unlink(tmp_path)
+
+    background_tasks.add_task(run_import)
+
+    return SyncResponse(sync_id=log.id, status=log.status, message=log.message)
 
 
 @router.get("/artikli-kriterija/artikl-sifre", response_model=list[str])
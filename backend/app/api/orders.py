@@ -1,17 +1,26 @@
 """
 API endpoints za naloge (orders).
 """
-from datetime import date
+from datetime import date, datetime
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from pydantic import BaseModel, Field, TypeAdapter
 from sqlalchemy import delete, select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only, selectinload
 
 from app.core.deps import get_current_active_user
 from app.core.warehouse_scope import apply_warehouse_filter
 from app.db.session import get_db
-from app.models.erp_models import Artikl, ArtiklKriterija, NalogDetail, NalogHeader, NaloziBlacklist, Partner, VrstaIsporuke
+from app.models.erp_models import (
+    PARTNER_SIFRARNICI,
+    Artikl,
+    ArtiklKriterija,
+    NalogDetail,
+    NalogHeader,
+    NaloziBlacklist,
+    Partner,
+    VrstaIsporuke,
+)
 from app.models.config_models import SyncStatus
 from app.models.regional_models import PostanskiBroj, Regija
 from app.models.user_models import User
@@ -20,6 +29,7 @@ from app.schemas.orders import (
     NalogHeaderOut,
     NalogListOut,
     NalogUpdate,
+    PartnerEmbed,
     PartnerListOut,
     PartnerOut,
     PartnerUpdate,
@@ -29,10 +39,17 @@ from app.schemas.orders import (
     VrstaIsporukeCreate,
     VrstaIsporukeOut,
     VrstaIsporukeUpdate,
+    nalog_header_out_from_orm,
+    partner_out_from_orm,
 )
 
 router = APIRouter()
 
+# Nazivi šifrarnika partnera (PartnerOut) — jedan IN upit po šifrarniku umjesto lazy loada
+_PARTNER_SIFRARNIK_OPTIONS = [
+    selectinload(getattr(Partner, relacija)) for _, relacija, _ in PARTNER_SIFRARNICI.values()
+]
+
 
 class BlacklistRequest(BaseModel):
     nalog_uids: list[str] = Field(..., min_length=1)
@@ -46,6 +63,18 @@ class BlacklistItem(BaseModel):
     blocked_at: str | None
 
 
+# Lista partnera čita samo kolone iz PartnerListOut (ne ~80 kolona entiteta) i
+# serijalizira se izravno u JSON, bez FastAPI-jeve ponovne validacije i encodera.
+_partner_list_adapter = TypeAdapter(list[PartnerListOut])
+_PARTNER_LIST_COLS = [getattr(Partner, name) for name in PartnerListOut.model_fields]
+
+# Lista naloga (~90 polja po retku) također ide izravno kroz dump_json.
+_nalog_list_adapter = TypeAdapter(list[NalogHeaderOut])
+
+# Nalozi učitavaju samo kolone partnera iz PartnerEmbed (partner_* polja).
+_PARTNER_EMBED_COLS = [getattr(Partner, name) for name in PartnerEmbed.model_fields]
+
+
 # =============================================================================
 # Orders endpoints
 # =============================================================================
@@ -63,10 +92,13 @@ def list_orders(
     offset: int = Query(default=0, ge=0),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> list[NalogHeaderOut]:
+) -> Response:
     """Dohvati listu naloga s filterima (sva polja nalozi_header + partner/dostava + regija)."""
     # First: fetch distinct header UIDs with filters and limit applied
-    header_q = select(NalogHeader)
+    header_q = select(NalogHeader).options(
+        selectinload(NalogHeader.fiscal),
+        selectinload(NalogHeader.partner_ref).load_only(*_PARTNER_EMBED_COLS),
+    )
     header_q = apply_warehouse_filter(header_q, NalogHeader, current_user, db)
 
     if status_filter:
@@ -88,37 +120,36 @@ def list_orders(
     headers = db.execute(header_q).scalars().all()
 
     # Second: enrich with partner + regija data (no duplicates possible)
-    result: list[NalogHeaderOut] = []
+    postanski_brojevi = {
+        h.partner_ref.postanski_broj
+        for h in headers
+        if h.partner_uid and h.partner_ref and h.partner_ref.postanski_broj
+    }
+    regija_po_pb: dict[str, str | None] = {}
+    if postanski_brojevi:
+        for pb, regija_naziv in db.execute(
+            select(PostanskiBroj.postanski_broj, Regija.naziv)
+            .join(Regija, Regija.id == PostanskiBroj.regija_id)
+            .where(PostanskiBroj.postanski_broj.in_(postanski_brojevi))
+        ):
+            regija_po_pb.setdefault(pb, regija_naziv)
+
+    # partner_* polja projiciraju se jednom po partneru i dijele među nalozima
+    embed_po_partneru: dict[str, dict] = {}
+    result = []
     for header in headers:
-        out = NalogHeaderOut.model_validate(header)
-
-        if header.partner_uid:
-            partner = db.get(Partner, header.partner_uid)
-            if partner:
-                out.partner_naziv = partner.naziv
-                out.partner_ime = partner.ime
-                out.partner_prezime = partner.prezime
-                out.partner_mobitel = partner.mobitel
-                out.partner_adresa = partner.adresa
-                out.partner_telefon = partner.telefon
-                out.partner_naziv_mjesta = partner.naziv_mjesta
-                out.partner_postanski_broj = partner.postanski_broj
-                out.partner_drzava = partner.drzava
-                out.partner_kontakt_osoba = partner.kontakt_osoba
-                out.partner_e_mail = partner.e_mail
-
+        partner = header.partner_ref if header.partner_uid else None
+        embed: dict = {}
+        if partner is not None:
+            embed = embed_po_partneru.get(partner.partner_uid)
+            if embed is None:
+                embed = PartnerEmbed.header_polja(partner)
                 if partner.postanski_broj:
-                    pb = db.execute(
-                        select(PostanskiBroj).where(
-                            PostanskiBroj.postanski_broj == partner.postanski_broj
-                        ).limit(1)
-                    ).scalar_one_or_none()
-                    if pb and pb.regija_id:
-                        regija = db.get(Regija, pb.regija_id)
-                        out.regija_naziv = regija.naziv if regija else None
+                    embed["regija_naziv"] = regija_po_pb.get(partner.postanski_broj)
+                embed_po_partneru[partner.partner_uid] = embed
+        result.append(nalog_header_out_from_orm(header, **embed))
 
-        result.append(out)
-    return result
+    return Response(content=_nalog_list_adapter.dump_json(result), media_type="application/json")
 
 
 @router.get("/orders/with-criteria", response_model=list[str])
@@ -159,23 +190,28 @@ def list_blacklisted_orders(
 @router.get("/orders/{nalog_prodaje_uid}", response_model=NalogHeaderOut)
 def get_order(nalog_prodaje_uid: str, db: Session = Depends(get_db)) -> NalogHeaderOut:
     """Dohvati pojedinačni nalog s detaljima (stavkama) i podacima partnera (dostava)."""
-    header = db.get(NalogHeader, nalog_prodaje_uid)
+    header = db.get(
+        NalogHeader, nalog_prodaje_uid,
+        options=[
+            selectinload(NalogHeader.fiscal),
+            selectinload(NalogHeader.details).selectinload(NalogDetail.artikl_ref).load_only(
+                Artikl.naziv_kratki, Artikl.jm, Artikl.masa, Artikl.volumen, Artikl.visina,
+            ),
+        ],
+    )
     if not header:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nalog nije pronađen.")
-    partner = db.get(Partner, header.partner_uid) if header.partner_uid else None
-    # Dohvati stavke s joinanim artiklom
-    detail_rows = (
-        db.execute(
-            select(NalogDetail, Artikl)
-            .outerjoin(Artikl, NalogDetail.artikl_uid == Artikl.artikl_uid)
-            .where(NalogDetail.nalog_prodaje_uid == nalog_prodaje_uid)
-        )
-        .all()
+    partner = (
+        db.get(Partner, header.partner_uid, options=[load_only(*_PARTNER_EMBED_COLS)])
+        if header.partner_uid else None
+    )
+    header_out = nalog_header_out_from_orm(
+        header, **(PartnerEmbed.header_polja(partner) if partner else {})
     )
-    header_out = NalogHeaderOut.model_validate(header)
     details_out: list[NalogDetailOut] = []
-    for detail, artikl in detail_rows:
+    for detail in header.details:
         detail_item = NalogDetailOut.model_validate(detail)
+        artikl = detail.artikl_ref
         if artikl:
             detail_item.artikl_naziv_kratki = artikl.naziv_kratki
             detail_item.artikl_jm = artikl.jm
@@ -184,33 +220,20 @@ def get_order(nalog_prodaje_uid: str, db: Session = Depends(get_db)) -> NalogHea
             detail_item.artikl_visina = float(artikl.visina) if artikl.visina else None
         details_out.append(detail_item)
     header_out.details = details_out
-    if partner:
-        header_out.partner_naziv = partner.naziv
-        header_out.partner_ime = partner.ime
-        header_out.partner_prezime = partner.prezime
-        header_out.partner_mobitel = partner.mobitel
-        header_out.partner_adresa = partner.adresa
-        header_out.partner_telefon = partner.telefon
-        header_out.partner_naziv_mjesta = partner.naziv_mjesta
-        header_out.partner_postanski_broj = partner.postanski_broj
-        header_out.partner_drzava = partner.drzava
-        header_out.partner_kontakt_osoba = partner.kontakt_osoba
-        header_out.partner_e_mail = partner.e_mail
-
-        if partner.postanski_broj:
-            pb = (
-                db.execute(
-                    select(PostanskiBroj)
-                    .where(PostanskiBroj.postanski_broj == partner.postanski_broj)
-                    .limit(1)
-                )
-                .scalars()
-                .first()
+    if partner and partner.postanski_broj:
+        pb = (
+            db.execute(
+                select(PostanskiBroj)
+                .where(PostanskiBroj.postanski_broj == partner.postanski_broj)
+                .limit(1)
             )
-            if pb and pb.regija_id:
-                regija = db.get(Regija, pb.regija_id)
-                if regija:
-                    header_out.regija_naziv = regija.naziv
+            .scalars()
+            .first()
+        )
+        if pb and pb.regija_id:
+            regija = db.get(Regija, pb.regija_id)
+            if regija:
+                header_out.regija_naziv = regija.naziv
     return header_out
 
 
@@ -227,8 +250,10 @@ def update_order(
         setattr(header, field, value)
     
     db.commit()
-    db.refresh(header)
-    return header
+    return nalog_header_out_from_orm(db.get(
+        NalogHeader, nalog_prodaje_uid,
+        options=[selectinload(NalogHeader.fiscal)], populate_existing=True,
+    ))
 
 
 @router.patch("/orders/{nalog_prodaje_uid}/manual-paleta")
@@ -257,9 +282,9 @@ def list_partners(
     limit: int = Query(default=100, ge=1, le=10000),
     offset: int = Query(default=0, ge=0),
     db: Session = Depends(get_db),
-) -> list[PartnerListOut]:
+) -> Response:
     """Dohvati listu partnera."""
-    query = select(Partner)
+    query = select(*_PARTNER_LIST_COLS)
     
     if search:
         pattern = f"%{search}%"
@@ -275,16 +300,17 @@ def list_partners(
         query = query.where(Partner.blokiran == blokiran)
     
     query = query.order_by(Partner.partner).offset(offset).limit(limit)
-    return db.execute(query).scalars().all()
+    partners = _partner_list_adapter.validate_python(db.execute(query).all(), from_attributes=True)
+    return Response(content=_partner_list_adapter.dump_json(partners), media_type="application/json")
 
 
 @router.get("/partners/{partner_uid}", response_model=PartnerOut)
 def get_partner(partner_uid: str, db: Session = Depends(get_db)) -> PartnerOut:
     """Dohvati pojedinačnog partnera."""
-    partner = db.get(Partner, partner_uid)
+    partner = db.get(Partner, partner_uid, options=_PARTNER_SIFRARNIK_OPTIONS)
     if not partner:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Partner nije pronađen.")
-    return partner
+    return partner_out_from_orm(partner)
 
 
 @router.patch("/partners/{partner_uid}", response_model=PartnerOut)
@@ -294,7 +320,7 @@ def update_partner(
     db: Session = Depends(get_db),
 ) -> PartnerOut:
     """Ažurira podatke partnera. Samo poslana polja se mijenjaju."""
-    partner = db.get(Partner, partner_uid)
+    partner = db.get(Partner, partner_uid, options=_PARTNER_SIFRARNIK_OPTIONS)
     if not partner:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Partner nije pronađen.")
 
@@ -318,8 +344,8 @@ def update_partner(
             nalog.regija_id = new_regija_id
 
     db.commit()
-    db.refresh(partner)
-    return partner
+    partner = db.get(Partner, partner_uid, options=_PARTNER_SIFRARNIK_OPTIONS, populate_existing=True)
+    return partner_out_from_orm(partner)
 
 
 # =============================================================================
@@ -459,7 +485,7 @@ def delete_and_blacklist_orders(
         header = db.get(NalogHeader, uid)
         if header:
             db.execute(delete(NalogDetail).where(NalogDetail.nalog_prodaje_uid == uid))
-            db.delete(header)
+            header.deleted_at = datetime.utcnow()
             deleted += 1
 
         if not db.get(NaloziBlacklist, uid):
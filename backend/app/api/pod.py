@@ -15,7 +15,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from sqlalchemy import select, or_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.core.config import settings
 from app.core.deps import get_current_active_user
@@ -248,12 +248,17 @@ def get_pod_detail(
 
         details = db.execute(
             select(NalogDetail)
+            .options(
+                selectinload(NalogDetail.artikl_ref).load_only(
+                    Artikl.naziv_kratki, Artikl.naziv, Artikl.jm, Artikl.masa,
+                )
+            )
             .where(NalogDetail.nalog_prodaje_uid == pod.nalog_prodaje_uid)
             .order_by(NalogDetail.redoslijed)
         ).scalars().all()
 
         for d in details:
-            artikl = db.get(Artikl, d.artikl_uid) if d.artikl_uid else None
+            artikl = d.artikl_ref
             nalog_details_list.append({
                 "stavka_uid": d.stavka_uid,
                 "artikl": d.artikl,
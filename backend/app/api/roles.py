@@ -3,11 +3,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.core.audit import audit_log
 from app.core.deps import get_current_active_user
 from app.core.logging_config import correlation_id_var
+from app.core.role_cache import invalidate_role_cache
 from app.db.session import get_db
 from app.models.user_models import Permission, Role, RolePermission, User
 
@@ -83,13 +84,17 @@ def list_all_permissions(db: Session = Depends(get_db)) -> list[PermissionOut]:
 
 @router.get("", response_model=list[RoleOut])
 def list_roles(db: Session = Depends(get_db)) -> list[RoleOut]:
-    roles = db.execute(select(Role).order_by(Role.name)).unique().scalars().all()
+    roles = db.execute(
+        select(Role).options(selectinload(Role.permissions)).order_by(Role.name)
+    ).scalars().all()
     return [_role_to_out(r) for r in roles]
 
 
 @router.get("/{role_id}", response_model=RoleOut)
 def get_role(role_id: int, db: Session = Depends(get_db)) -> RoleOut:
-    role = db.execute(select(Role).where(Role.id == role_id)).unique().scalar_one_or_none()
+    role = db.execute(
+        select(Role).options(selectinload(Role.permissions)).where(Role.id == role_id)
+    ).scalar_one_or_none()
     if not role:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rola nije pronađena.")
     return _role_to_out(role)
@@ -101,7 +106,7 @@ def create_role(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> RoleOut:
-    existing = db.execute(select(Role).where(Role.name == payload.name)).unique().scalar_one_or_none()
+    existing = db.execute(select(Role).where(Role.name == payload.name)).scalar_one_or_none()
     if existing:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Rola s tim imenom već postoji.")
     role = Role(name=payload.name, description=payload.description)
@@ -124,7 +129,7 @@ def update_role(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> RoleOut:
-    role = db.execute(select(Role).where(Role.id == role_id)).unique().scalar_one_or_none()
+    role = db.get(Role, role_id)
     if not role:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rola nije pronađena.")
     if role.is_system and payload.name and payload.name != role.name:
@@ -152,7 +157,7 @@ def delete_role(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> None:
-    role = db.execute(select(Role).where(Role.id == role_id)).unique().scalar_one_or_none()
+    role = db.get(Role, role_id)
     if not role:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rola nije pronađena.")
     if role.is_system:
@@ -173,7 +178,7 @@ def set_role_permissions(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> RoleOut:
-    role = db.execute(select(Role).where(Role.id == role_id)).unique().scalar_one_or_none()
+    role = db.get(Role, role_id)
     if not role:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rola nije pronađena.")
 
@@ -193,5 +198,7 @@ def set_role_permissions(
         correlation_id=correlation_id_var.get(None),
     )
     db.commit()
+    # Bulk DELETE nad role_permissions ne prolazi kroz flush event role_cachea
+    invalidate_role_cache()
     db.refresh(role)
     return _role_to_out(role)
@@ -6,13 +6,14 @@ CRUD za rute, optimizacija, geocoding, distance matrix.
 import logging
 from datetime import date, datetime
 from decimal import Decimal
+from typing import Literal
 
 logger = logging.getLogger(__name__)
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import Response
 from sqlalchemy import delete as sa_delete, func, select, update as sa_update
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from pydantic import BaseModel as _BaseModel
 
@@ -32,7 +33,6 @@ from app.schemas.routing import (
     ReorderStopsRequest,
     RouteListOut,
     RouteOut,
-    RouteStopOut,
     UpdateRouteStatusRequest,
     UpdateStopStatusRequest,
 )
@@ -41,7 +41,7 @@ from app.core.deps import get_current_active_user
 from app.core.warehouse_scope import is_admin
 from app.models.config_models import Setting
 from app.models.user_models import User
-from app.services.distance_service import distance_service
+from app.services.distance_service import distance_service, invalidate_provider_cache
 from app.services.export_service import export_service
 from app.services.geocoding_service import geocoding_service
 from app.services.routing_service import routing_service
@@ -96,7 +96,12 @@ def list_routes(
     current_user: User = Depends(get_current_active_user),
 ) -> list[RouteListOut]:
     """Lista svih ruta s filterima."""
-    query = select(Ruta)
+    from app.models.vehicle_models import Vozilo
+    from app.services.mantis_service import mantis_service
+
+    query = select(Ruta).options(
+        selectinload(Ruta.vozilo_ref).load_only(Vozilo.oznaka, Vozilo.naziv),
+    )
 
     if not is_admin(current_user) and current_user.warehouse_id:
         query = query.where(Ruta.warehouse_id == current_user.warehouse_id)
@@ -114,19 +119,22 @@ def list_routes(
     routes = db.execute(query).scalars().all()
 
     # Dodaj broj stopova, vozilo oznaku i WMS palete
-    from app.models.vehicle_models import Vozilo
-    from app.services.mantis_service import mantis_service
+    stops_po_ruti: dict[int, int] = {}
+    if routes:
+        stops_po_ruti = dict(db.execute(
+            select(RutaStop.ruta_id, func.count(RutaStop.id))
+            .where(RutaStop.ruta_id.in_([route.id for route in routes]))
+            .group_by(RutaStop.ruta_id)
+        ).all())
+
     result = []
     for route in routes:
-        stops_count = db.execute(
-            select(func.count(RutaStop.id)).where(RutaStop.ruta_id == route.id)
-        ).scalar() or 0
+        stops_count = stops_po_ruti.get(route.id, 0)
 
         vozilo_oznaka = None
-        if route.vozilo_id:
-            vozilo = db.get(Vozilo, route.vozilo_id)
-            if vozilo:
-                vozilo_oznaka = vozilo.oznaka or vozilo.naziv
+        vozilo = route.vozilo_ref if route.vozilo_id else None
+        if vozilo:
+            vozilo_oznaka = vozilo.oznaka or vozilo.naziv
 
         # WMS pallet count
         wms_paleta = None
@@ -162,23 +170,22 @@ def list_routes(
     return result
 
 
-@router.get("/routes/{route_id}", response_model=RouteOut)
-def get_route(route_id: int, db: Session = Depends(get_db)) -> RouteOut:
-    """Dohvati rutu s detaljima stopova."""
+def _route_response(db: Session, route_id: int, status_code: int = status.HTTP_200_OK) -> Response:
+    """RouteOut rute kao gotov JSON Response (status_code ide eksplicitno – dekorator ga ne primjenjuje)."""
     route_data = routing_service.get_route_with_stops(db, route_id)
     if not route_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Ruta nije pronađena."
         )
 
-    stops = [RouteStopOut(**s) for s in route_data.get("stops", [])]
+    stops = route_data.get("stops", [])
 
     raspored_raw = route_data.get("raspored")
     raspored_val = None
     if raspored_raw:
         raspored_val = date.fromisoformat(raspored_raw) if isinstance(raspored_raw, str) else raspored_raw
 
-    return RouteOut(
+    route = RouteOut(
         id=route_data["id"],
         datum=date.fromisoformat(route_data["datum"]) if route_data.get("datum") else None,
         raspored=raspored_val,
@@ -196,6 +203,13 @@ def get_route(route_id: int, db: Session = Depends(get_db)) -> RouteOut:
         stops=stops,
         polyline=route_data.get("polyline"),
     )
+    return Response(content=route.model_dump_json(), media_type="application/json", status_code=status_code)
+
+
+@router.get("/routes/{route_id}", response_model=RouteOut)
+def get_route(route_id: int, db: Session = Depends(get_db)) -> Response:
+    """Dohvati rutu s detaljima stopova."""
+    return _route_response(db, route_id)
 
 
 @router.post("/routes", response_model=RouteOut, status_code=status.HTTP_201_CREATED)
@@ -203,7 +217,7 @@ def create_route(
     payload: CreateRouteRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> RouteOut:
+) -> Response:
     """
     Kreiraj novu rutu.
 
@@ -236,7 +250,7 @@ def create_route(
             ruta.driver_name = driver.full_name or driver.username
             db.commit()
 
-    return get_route(ruta.id, db)
+    return _route_response(db, ruta.id, status.HTTP_201_CREATED)
 
 
 # ---------------------------------------------------------------------------
@@ -323,7 +337,7 @@ def update_route_status(
     route_id: int,
     payload: UpdateRouteStatusRequest,
     db: Session = Depends(get_db),
-) -> RouteOut:
+) -> Response:
     """Promijeni status rute."""
     ruta = db.get(Ruta, route_id)
     if not ruta:
@@ -334,7 +348,7 @@ def update_route_status(
     ruta.status = payload.status
     db.commit()
 
-    return get_route(route_id, db)
+    return _route_response(db, route_id)
 
 
 @router.put("/routes/{route_id}/reorder", response_model=RouteOut)
@@ -342,14 +356,14 @@ def reorder_route_stops(
     route_id: int,
     payload: ReorderStopsRequest,
     db: Session = Depends(get_db),
-) -> RouteOut:
+) -> Response:
     """Ručna promjena redoslijeda stopova."""
     try:
         routing_service.reorder_stops(db, route_id, payload.new_order)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
-    return get_route(route_id, db)
+    return _route_response(db, route_id)
 
 
 @router.post("/routes/{route_id}/optimize", response_model=RouteOut)
@@ -357,7 +371,7 @@ def optimize_route(
     route_id: int,
     payload: OptimizeRouteRequest,
     db: Session = Depends(get_db),
-) -> RouteOut:
+) -> Response:
     """
     Re-optimiziraj postojeću rutu.
 
@@ -399,7 +413,7 @@ def optimize_route(
     db.delete(ruta)
     db.commit()
 
-    return get_route(new_ruta.id, db)
+    return _route_response(db, new_ruta.id)
 
 
 @router.get("/routes/{route_id}/export/excel")
@@ -653,6 +667,7 @@ def set_manual_coordinates(
     entry.lng = Decimal(str(lng))
     entry.provider = "manual"
     db.commit()
+    geocoding_service.invalidate(entry.address)
     return {
         "id": entry.id,
         "address": entry.address,
@@ -674,6 +689,7 @@ def delete_geocoding_cache(cache_id: int, db: Session = Depends(get_db)) -> dict
     address = entry.address
     db.delete(entry)
     db.commit()
+    geocoding_service.invalidate(address)
     return {"deleted": True, "address": address}
 
 
@@ -719,9 +735,7 @@ def geocode_orders(
 @router.get("/provider", response_model=ProviderInfoResponse)
 def get_provider_info(db: Session = Depends(get_db)) -> ProviderInfoResponse:
     """Dohvati informacije o aktivnom geocoding/distance provideru."""
-    row = db.execute(
-        select(Setting).where(Setting.key == "geocoding_provider")
-    ).scalar_one_or_none()
+    row = db.get(Setting, "geocoding_provider")
     provider = (row.value or "nominatim") if row else "nominatim"
     return ProviderInfoResponse(
         provider=provider.strip().lower(),
@@ -734,7 +748,7 @@ def get_provider_info(db: Session = Depends(get_db)) -> ProviderInfoResponse:
 
 @router.put("/provider")
 def set_provider(
-    provider: str = Query(..., pattern="^(nominatim|ors|google|osrm|tomtom)$"),
+    provider: Literal["nominatim", "ors", "google", "osrm", "tomtom"] = Query(...),
     db: Session = Depends(get_db),
 ) -> ProviderInfoResponse:
     """Promijeni aktivni geocoding/distance provider."""
@@ -744,6 +758,7 @@ def set_provider(
     else:
         db.add(Setting(key="geocoding_provider", value=provider))
     db.commit()
+    invalidate_provider_cache()
     return ProviderInfoResponse(
         provider=provider,
         has_google_key=bool(app_settings.GOOGLE_MAPS_API_KEY),
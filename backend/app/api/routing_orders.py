@@ -5,12 +5,13 @@ Prebacivanje naloga iz originala u rutiranje, vraćanje natrag,
 arhiviranje dostavljenih, prerutiranje nedostavljenih.
 """
 import logging
-from typing import Any
+from datetime import datetime
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import BaseModel, Field, TypeAdapter
 from sqlalchemy import delete, select, update
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.core.deps import get_current_active_user
 from app.core.warehouse_scope import apply_warehouse_filter
@@ -94,6 +95,9 @@ class RutiranjeNalogOut(BaseModel):
     vrsta_isporuke: str | None = None
 
 
+_rutiranje_nalog_list_adapter = TypeAdapter(list[RutiranjeNalogOut])
+
+
 # =============================================================================
 # Helperi
 # =============================================================================
@@ -151,6 +155,39 @@ def _copy_detail(src, TargetCls):
     return TargetCls(**data)
 
 
+def _restore_original(db: Session, rut_header: NalogHeaderRutiranje) -> None:
+    """
+    Vrati nalog iz rutiranja u original tablice (nalozi_header/details).
+    Soft-deleteani original se reaktivira, a nepostojeći kreira; stavke se
+    kopiraju iz rutiranja. Aktivni original ostaje netaknut. NE radi commit.
+    """
+    uid = rut_header.nalog_prodaje_uid
+    # Original je obično soft-deletean – tada ga obnavljamo iz rutiranja
+    orig = db.get(
+        NalogHeader, uid,
+        options=[selectinload(NalogHeader.fiscal)],
+        execution_options={"include_deleted": True},
+    )
+    if orig and orig.deleted_at is None:
+        return
+
+    if orig:
+        for col in _HEADER_COPY_COLS:
+            setattr(orig, col, getattr(rut_header, col, None))
+        orig.deleted_at = None
+    else:
+        db.add(_copy_header(rut_header, NalogHeader))
+    db.flush()  # Header mora biti upisan PRIJE stavki (FK constraint)
+
+    rut_details = db.execute(
+        select(NalogDetailRutiranje).where(
+            NalogDetailRutiranje.nalog_prodaje_uid == uid
+        )
+    ).scalars().all()
+    for rd in rut_details:
+        db.add(_copy_detail(rd, NalogDetail))
+
+
 def _archive_delivered_stops(db: Session, ruta: Ruta) -> int:
     """
     Arhiviraj sve DELIVERED stopove s rute.
@@ -216,13 +253,13 @@ def _archive_delivered_stops(db: Session, ruta: Ruta) -> int:
         )
         db.delete(rut_header)
 
-        # Brisi i iz originala ako postoji
+        # Soft-delete u originalu ako postoji (rute_stops ima FK na header)
         orig = db.get(NalogHeader, stop.nalog_uid)
         if orig:
             db.execute(
                 delete(NalogDetail).where(NalogDetail.nalog_prodaje_uid == stop.nalog_uid)
             )
-            db.delete(orig)
+            orig.deleted_at = datetime.utcnow()
 
         archived += 1
 
@@ -306,7 +343,9 @@ def prebaci_u_rutiranje(
 
     # Dohvati headere
     headers = db.execute(
-        select(NalogHeader).where(NalogHeader.nalog_prodaje_uid.in_(new_uids))
+        select(NalogHeader)
+        .options(selectinload(NalogHeader.fiscal), selectinload(NalogHeader.details))
+        .where(NalogHeader.nalog_prodaje_uid.in_(new_uids))
     ).scalars().all()
 
     copied = 0
@@ -315,19 +354,21 @@ def prebaci_u_rutiranje(
         db.add(rut_header)
         db.flush()
 
-        details = db.execute(
-            select(NalogDetail).where(NalogDetail.nalog_prodaje_uid == h.nalog_prodaje_uid)
-        ).scalars().all()
-        for d in details:
+        for d in h.details:
             rut_detail = _copy_detail(d, NalogDetailRutiranje)
             db.add(rut_detail)
 
-        # Fizički obriši iz originala
+        # Header se soft-deletea (rute_stops ima FK na njega)
+        h.deleted_at = datetime.utcnow()
+        copied += 1
+
+    # Stavke prebačenih naloga brišu se jednim DELETE-om
+    if headers:
         db.execute(
-            delete(NalogDetail).where(NalogDetail.nalog_prodaje_uid == h.nalog_prodaje_uid)
+            delete(NalogDetail).where(
+                NalogDetail.nalog_prodaje_uid.in_([h.nalog_prodaje_uid for h in headers])
+            )
         )
-        db.delete(h)
-        copied += 1
 
     db.commit()
     logger.info("Prebačeno %d naloga u rutiranje (obrisano iz originala)", copied)
@@ -351,22 +392,7 @@ def vrati_iz_rutiranja(
         if not rut_header:
             continue
 
-        # Provjeri da nalog vec ne postoji u originalu (ne bi smjelo, ali sigurnost)
-        orig = db.get(NalogHeader, uid)
-        if not orig:
-            # Kopiraj natrag u original
-            new_header = _copy_header(rut_header, NalogHeader)
-            db.add(new_header)
-            db.flush()  # Header mora biti upisan PRIJE stavki (FK constraint)
-
-            rut_details = db.execute(
-                select(NalogDetailRutiranje).where(
-                    NalogDetailRutiranje.nalog_prodaje_uid == uid
-                )
-            ).scalars().all()
-            for rd in rut_details:
-                new_detail = _copy_detail(rd, NalogDetail)
-                db.add(new_detail)
+        _restore_original(db, rut_header)
 
         # Brisi iz rutiranja (cascade ce obrisati i details)
         db.execute(
@@ -384,7 +410,7 @@ def vrati_iz_rutiranja(
 def list_rutiranje_nalozi(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> list[RutiranjeNalogOut]:
+) -> Response:
     """
     Dohvati sve naloge u rutiranju, obogaćene partner podacima i regijom.
     """
@@ -407,7 +433,8 @@ def list_rutiranje_nalozi(
         d = _enrich_with_partner(nalog, partner, regija_naziv)
         result.append(RutiranjeNalogOut(**d))
 
-    return result
+    # Modeli su već validirani — serijaliziraju se jednim dump_json pozivom
+    return Response(content=_rutiranje_nalog_list_adapter.dump_json(result), media_type="application/json")
 
 
 @router.get("/rutiranje-uids")
@@ -475,7 +502,7 @@ class VratiStopRequest(BaseModel):
     """Vrati pojedinačni neuspjeli nalog s rute."""
     ruta_id: int
     nalog_uid: str
-    destination: str = Field(..., pattern="^(nalozi|rutiranje)$")
+    destination: Literal["nalozi", "rutiranje"]
 
 
 @router.post("/obradi-rutu")
@@ -545,20 +572,7 @@ def vrati_stop_s_rute(
 
     if payload.destination == "nalozi":
         # Vrati u originalne tablice
-        orig = db.get(NalogHeader, payload.nalog_uid)
-        if not orig:
-            new_header = _copy_header(rut_header, NalogHeader)
-            db.add(new_header)
-            db.flush()
-
-            rut_details = db.execute(
-                select(NalogDetailRutiranje).where(
-                    NalogDetailRutiranje.nalog_prodaje_uid == payload.nalog_uid
-                )
-            ).scalars().all()
-            for rd in rut_details:
-                new_detail = _copy_detail(rd, NalogDetail)
-                db.add(new_detail)
+        _restore_original(db, rut_header)
 
         # Brisi iz rutiranja
         db.execute(
@@ -16,12 +16,15 @@ from app.db.session import get_db
 from app.models.config_models import Setting, SyncStatus
 from app.models.sync_models import SyncLog
 from app.schemas.sync import RefreshOrdersRequest, SyncByRasporedRequest, SyncOrdersRequest, SyncResponse
+from app.services.erp_client import erp_client
 from app.services.sync_service import (
     refresh_orders as do_refresh_orders,
     sync_artikli as do_sync_artikli,
     sync_orders as do_sync_orders,
     sync_orders_by_raspored as do_sync_by_raspored,
     sync_partners as do_sync_partners,
+    get_last_successful_sync_at,
+    purge_deleted_nalozi as do_purge_deleted_nalozi,
 )
 
 logger = logging.getLogger(__name__)
@@ -38,6 +41,8 @@ def _run_async(coro):
         try:
             loop.run_until_complete(coro)
         finally:
+            # ERP session je vezan uz ovaj loop – zatvori ga prije loopa
+            loop.run_until_complete(erp_client.close())
             loop.close()
     except Exception as exc:
         print(f"[_run_async] GREŠKA: {exc}", flush=True)
@@ -119,8 +124,14 @@ def refresh_orders_endpoint(
 
     Koristi ERP endpoint IzmjenaStatus za dohvat promjena od zadanog datuma.
     Ažurira header i partner podatke za naloge koji su u našoj bazi u statusu '08'.
+
+    - `datum_od`: default je datum zadnjeg uspješnog osvježavanja (delta),
+      a ako ga nema, danas - 7 dana
     """
-    datum_od = payload.datum_od or (date.today() - timedelta(days=7))
+    datum_od = payload.datum_od
+    if datum_od is None:
+        last_sync_at = get_last_successful_sync_at(db, "refresh_orders")
+        datum_od = last_sync_at.date() if last_sync_at else (date.today() - timedelta(days=7))
 
     log = SyncLog(entity="refresh_orders", status="QUEUED", message="Osvježavanje naloga pokrenuto...")
     db.add(log)
@@ -237,6 +248,12 @@ def sync_orders_by_raspored_endpoint(
     return SyncResponse(sync_id=log.id, status=log.status, message=log.message)
 
 
+@router.post("/sync/purge-deleted-orders")
+def purge_deleted_orders_endpoint(older_than_days: int = 90, db: Session = Depends(get_db)) -> dict:
+    """Trajno briše soft-deleteane naloge starije od `older_than_days` (poziva ga noćni cron)."""
+    return {"obrisano": do_purge_deleted_nalozi(db, older_than_days)}
+
+
 @router.get("/sync/status/{sync_id}", response_model=SyncResponse)
 def get_sync_status(sync_id: int, db: Session = Depends(get_db)) -> SyncResponse:
     """Dohvati status sinkronizacije po ID-u."""
@@ -3,7 +3,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.core.audit import audit_log
 from app.core.deps import require_permission
@@ -107,10 +107,10 @@ def list_users(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("users.view")),
 ) -> list[UserOut]:
-    query = select(User).order_by(User.username)
+    query = select(User).options(selectinload(User.role)).order_by(User.username)
     if not is_admin(current_user) and current_user.warehouse_id:
         query = query.where(User.warehouse_id == current_user.warehouse_id)
-    users = db.execute(query).unique().scalars().all()
+    users = db.execute(query).scalars().all()
     return [_user_to_out(u) for u in users]
 
 
@@ -120,7 +120,9 @@ def get_user(
     db: Session = Depends(get_db),
     _user: User = Depends(require_permission("users.view")),
 ) -> UserOut:
-    u = db.execute(select(User).where(User.id == user_id)).unique().scalar_one_or_none()
+    u = db.execute(
+        select(User).options(selectinload(User.role)).where(User.id == user_id)
+    ).scalar_one_or_none()
     if not u:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Korisnik nije pronađen.")
     return _user_to_out(u)
@@ -133,7 +135,7 @@ def create_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("users.create")),
 ) -> UserOut:
-    existing = db.execute(select(User).where(User.username == payload.username)).unique().scalar_one_or_none()
+    existing = db.execute(select(User).where(User.username == payload.username)).scalar_one_or_none()
     if existing:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Korisničko ime već postoji.")
 
@@ -141,7 +143,7 @@ def create_user(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lozinka mora imati najmanje 5 znakova.")
 
     if payload.role_id:
-        role = db.execute(select(Role).where(Role.id == payload.role_id)).unique().scalar_one_or_none()
+        role = db.get(Role, payload.role_id)
         if not role:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Rola nije pronađena.")
 
@@ -186,13 +188,13 @@ def update_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("users.edit")),
 ) -> UserOut:
-    u = db.execute(select(User).where(User.id == user_id)).unique().scalar_one_or_none()
+    u = db.get(User, user_id)
     if not u:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Korisnik nije pronađen.")
 
     data = payload.model_dump(exclude_unset=True)
     if "role_id" in data and data["role_id"] is not None:
-        role = db.execute(select(Role).where(Role.id == data["role_id"])).unique().scalar_one_or_none()
+        role = db.get(Role, data["role_id"])
         if not role:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Rola nije pronađena.")
 
@@ -218,7 +220,7 @@ def deactivate_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("users.delete")),
 ) -> None:
-    u = db.execute(select(User).where(User.id == user_id)).unique().scalar_one_or_none()
+    u = db.get(User, user_id)
     if not u:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Korisnik nije pronađen.")
     if u.username == "admin":
@@ -241,7 +243,7 @@ def reset_password(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("users.edit")),
 ) -> UserOut:
-    u = db.execute(select(User).where(User.id == user_id)).unique().scalar_one_or_none()
+    u = db.get(User, user_id)
     if not u:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Korisnik nije pronađen.")
     if len(payload.new_password) < 5:
@@ -266,7 +268,7 @@ def lock_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("users.edit")),
 ) -> UserOut:
-    u = db.execute(select(User).where(User.id == user_id)).unique().scalar_one_or_none()
+    u = db.get(User, user_id)
     if not u:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Korisnik nije pronađen.")
     u.locked = True
@@ -287,7 +289,7 @@ def unlock_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("users.edit")),
 ) -> UserOut:
-    u = db.execute(select(User).where(User.id == user_id)).unique().scalar_one_or_none()
+    u = db.get(User, user_id)
     if not u:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Korisnik nije pronađen.")
     u.locked = False
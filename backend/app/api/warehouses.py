@@ -1,5 +1,7 @@
 """API endpoints za upravljanje skladištima."""
 
+from typing import Literal
+
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 from sqlalchemy import select
@@ -53,8 +55,8 @@ class WarehouseCreate(BaseModel):
     drzava: str | None = None
     lat: float | None = None
     lng: float | None = None
-    tip: str = "store"
-    is_central: bool = False
+    tip: Literal["central", "store"] = "store"
+    is_central: bool = False  # zastarjelo – True postavlja tip='central'
     radno_vrijeme_od: str | None = None
     radno_vrijeme_do: str | None = None
     kontakt_telefon: str | None = None
@@ -72,8 +74,8 @@ class WarehouseUpdate(BaseModel):
     drzava: str | None = None
     lat: float | None = None
     lng: float | None = None
-    tip: str | None = None
-    is_central: bool | None = None
+    tip: Literal["central", "store"] | None = None
+    is_central: bool | None = None  # zastarjelo – mapira se na tip
     radno_vrijeme_od: str | None = None
     radno_vrijeme_do: str | None = None
     kontakt_telefon: str | None = None
@@ -117,7 +119,10 @@ def create_warehouse(
         existing = db.execute(select(Skladiste).where(Skladiste.code == payload.code)).scalar_one_or_none()
         if existing:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Skladište s kodom '{payload.code}' već postoji.")
-    wh = Skladiste(**payload.model_dump())
+    data = payload.model_dump()
+    if data.pop("is_central"):
+        data["tip"] = "central"
+    wh = Skladiste(**data)
     db.add(wh)
     db.flush()
     audit_log(
@@ -141,6 +146,11 @@ def update_warehouse(
     if not wh:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Skladište nije pronađeno.")
     data = payload.model_dump(exclude_unset=True)
+    is_central = data.pop("is_central", None)
+    if is_central:
+        data["tip"] = "central"
+    elif is_central is not None and "tip" not in data:
+        data["tip"] = "store"
     old_vals = {k: getattr(wh, k) for k in data}
     for field, value in data.items():
         setattr(wh, field, value)
@@ -20,6 +20,11 @@ class Settings(BaseSettings):
     DB_DRIVER: str = "ODBC Driver 17 for SQL Server"
     DB_ENCRYPT: bool = True
     DB_TRUST_SERVER_CERTIFICATE: bool = True
+    DB_MARS_CONNECTION: bool = True
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800  # sekunde
 
     # ERP
     ERP_BASE_URL: str = "http://10.10.2.203:3616"
@@ -63,6 +68,9 @@ class Settings(BaseSettings):
     # TomTom
     TOMTOM_API_KEY: str = ""
 
+    # Distance matrix: A→B se koristi i za B→A (upola manje poziva providera i cache redova)
+    ASSUME_SYMMETRIC_DISTANCE: bool = False
+
     # Mantis WMS (LVision) Database
     MANTIS_DB_SERVER: str = ""
     MANTIS_DB_NAME: str = "LVision"
@@ -3,12 +3,17 @@
 from typing import Callable
 
 from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
+from app.core.role_cache import get_role_snapshot
 from app.core.security import decode_token
 from app.db.session import get_db
 from app.models.user_models import User
 
+# Prijava (web i vozač): upit se gradi jednom po procesu, username ide kroz bindparam
+USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+
 
 def _extract_token(request: Request) -> str | None:
     """Extract JWT from httpOnly cookie or Authorization header."""
@@ -39,7 +44,7 @@ def get_current_user(
             detail="Token je nevažeći ili je istekao.",
         )
     user_id = int(payload["sub"])
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -66,20 +71,22 @@ def get_current_active_user(
 
 
 def require_permission(permission_name: str) -> Callable:
-    """Factory — returns a dependency that verifies the user has a specific permission."""
+    """
+    Factory — returns a dependency that verifies the user has a specific permission.
+
+    Permissions come from the role snapshot (role_cache), not from the JWT
+    "perms" claim, so permission changes apply without a new login (within
+    the cache TTL for other worker processes).
+    """
 
     def _check(
-        request: Request,
         user: User = Depends(get_current_active_user),
     ) -> User:
-        if user.role and user.role.name == "Admin":
+        role = get_role_snapshot(user)
+        if role and role.name == "Admin":
             return user
 
-        token = _extract_token(request)
-        payload = decode_token(token) if token else None
-        perms: list[str] = (payload or {}).get("perms", [])
-
-        if permission_name not in perms:
+        if role is None or permission_name not in role.permissions:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Nemate dozvolu: {permission_name}",
@@ -0,0 +1,70 @@
+"""
+In-process cache rola i njihovih dozvola.
+
+Svaki autenticirani request treba ime role (Admin?) i skup dozvola korisnika.
+Role se mijenjaju rijetko, pa se umjesto učitavanja Role + permissions po
+requestu čita nepromjenjivi RoleSnapshot iz cachea. Cache se prazni nakon
+commita transakcije čiji je flush dirao Role/Permission/RolePermission (i
+eksplicitno nakon bulk izmjena dozvola); TTL pokriva izmjene iz drugih procesa.
+"""
+from __future__ import annotations
+
+from itertools import chain
+from typing import NamedTuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.user_models import Permission, Role, RolePermission, User
+from app.utils.cache import TTLCache
+
+
+class RoleSnapshot(NamedTuple):
+    id: int
+    name: str
+    permissions: frozenset[str]
+
+
+_cache: TTLCache[int, RoleSnapshot] = TTLCache(maxsize=64, ttl=300)
+
+
+def get_role_snapshot(user: User) -> RoleSnapshot | None:
+    """Rola korisnika iz cachea; na promašaj se učitava preko user.role."""
+    if user.role_id is None:
+        return None
+    snapshot = _cache.get(user.role_id)
+    if snapshot is None:
+        role = user.role
+        if role is None:
+            return None
+        snapshot = RoleSnapshot(role.id, role.name, frozenset(p.name for p in role.permissions))
+        _cache.set(role.id, snapshot)
+    return snapshot
+
+
+def invalidate_role_cache() -> None:
+    _cache.clear()
+
+
+_ROLE_WRITE_FLAG = "role_cache_dirty"
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_role_write(session: Session, flush_context) -> None:
+    # Samo oznaka – prazniti prije commita bi dopustilo paralelnom requestu
+    # da u cache vrati staro (ili kasnije rollbackano) stanje na cijeli TTL
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (Role, Permission, RolePermission)):
+            session.info[_ROLE_WRITE_FLAG] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_role_commit(session: Session) -> None:
+    if session.info.pop(_ROLE_WRITE_FLAG, False):
+        invalidate_role_cache()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_role_write(session: Session) -> None:
+    session.info.pop(_ROLE_WRITE_FLAG, None)
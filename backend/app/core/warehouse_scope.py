@@ -3,13 +3,15 @@
 from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
+from app.core.role_cache import get_role_snapshot
 from app.models.erp_models import Skladiste
 from app.models.user_models import User
 
 
 def is_admin(user: User) -> bool:
     """Check if user has Admin role (sees everything, no filters)."""
-    return bool(user.role and user.role.name == "Admin")
+    role = get_role_snapshot(user)
+    return bool(role and role.name == "Admin")
 
 
 def get_user_warehouse(db: Session, user: User) -> Skladiste | None:
@@ -1,7 +1,7 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from collections.abc import Generator
 
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import ORMExecuteState, sessionmaker, Session, with_loader_criteria
 from sqlalchemy.engine import URL
 
 from app.core.config import settings
@@ -11,6 +11,8 @@ def get_database_url() -> URL:
     query = {"driver": settings.DB_DRIVER}
     query["Encrypt"] = "yes" if settings.DB_ENCRYPT else "no"
     query["TrustServerCertificate"] = "yes" if settings.DB_TRUST_SERVER_CERTIFICATE else "no"
+    if settings.DB_MARS_CONNECTION:
+        query["MARS_Connection"] = "yes"
     return URL.create(
         "mssql+pyodbc",
         username=settings.DB_USERNAME,
@@ -21,10 +23,43 @@ def get_database_url() -> URL:
     )
 
 
-engine = create_engine(get_database_url(), pool_pre_ping=True, future=True)
+# fast_executemany: pyodbc šalje parametre executemany INSERT-a (sync stavki,
+# Mantis cache) u jednom batchu umjesto jednog round-tripa po retku.
+# Pool je veći od defaulta (5) jer sync partnera, artikala i naloga te planer
+# paralelno drže kratke transakcije; pool_recycle zatvara konekcije prije nego
+# ih mrežna oprema tiho prekine.
+engine = create_engine(
+    get_database_url(),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    future=True,
+    fast_executemany=True,
+)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
 
+@event.listens_for(Session, "do_orm_execute")
+def _skip_soft_deleted_nalozi(execute_state: ORMExecuteState) -> None:
+    """
+    Svi ORM SELECT-i preskaču soft-deleteane naloge (deleted_at IS NOT NULL).
+    Restore/re-import putanje ih dohvaćaju s execution_options(include_deleted=True).
+    """
+    from app.models.erp_models import NalogHeader  # app.models uvozi app.db (kružni import)
+
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get("include_deleted", False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(NalogHeader, NalogHeader.deleted_at.is_(None), include_aliases=True)
+        )
+
+
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
@@ -110,6 +110,7 @@ def _ensure_tables():
         _add_column_if_missing(engine, "users", "failed_login_attempts", "INT", "0")
         _add_column_if_missing(engine, "users", "last_login", "DATETIME", "NULL")
         _add_column_if_missing(engine, "users", "last_login_ip", "NVARCHAR(45)", "NULL")
+        _add_column_if_missing(engine, "users", "full_name", "NVARCHAR(201)", "NULL")
 
     if "audit_log" in existing_tables:
         _add_column_if_missing(engine, "audit_log", "old_values", "NVARCHAR(MAX)", "NULL")
@@ -141,7 +142,6 @@ def _ensure_tables():
 
     if "skladista" in existing_tables:
         _add_column_if_missing(engine, "skladista", "code", "NVARCHAR(10)", "NULL")
-        _add_column_if_missing(engine, "skladista", "is_central", "BIT", "0")
         _add_column_if_missing(engine, "skladista", "radno_vrijeme_od", "NVARCHAR(5)", "NULL")
         _add_column_if_missing(engine, "skladista", "radno_vrijeme_do", "NVARCHAR(5)", "NULL")
         _add_column_if_missing(engine, "skladista", "kontakt_telefon", "NVARCHAR(50)", "NULL")
@@ -170,6 +170,17 @@ def _ensure_tables():
             )
             db.commit()
 
+    # Popuni users.full_name za korisnike kreirane prije te kolone
+    with SessionLocal() as db:
+        from sqlalchemy import select
+        from app.models.user_models import compose_full_name
+        bez_imena = db.execute(select(User).where(User.full_name.is_(None))).scalars().all()
+        for u in bez_imena:
+            u.full_name = compose_full_name(u.ime, u.prezime, u.username)
+        if bez_imena:
+            db.commit()
+            logger.info("Popunjen full_name za %d korisnika", len(bez_imena))
+
     with SessionLocal() as db:
         # --- Sync statusi ---
         count = db.query(SyncStatus).count()
@@ -1,4 +1,4 @@
-from app.models.erp_models import Partner, Artikl, GrupaArtikla, NalogHeader, NalogDetail, Skladiste, VrstaIsporuke
+from app.models.erp_models import Partner, PartnerSifrarnik, Artikl, GrupaArtikla, NalogHeader, NalogHeaderFiscal, NalogDetail, RoutingStop, Skladiste, VrstaIsporuke
 from app.models.regional_models import Regija, PostanskiBroj, Zona, ZonaIzvor
 from app.models.config_models import Prioritet, Setting, SyncStatus
 from app.models.vehicle_models import VoziloTip, Vozilo, Vozac
@@ -14,9 +14,12 @@ from app.models.mantis_models import MantisSSCC
 
 __all__ = [
     "Partner",
+    "PartnerSifrarnik",
     "Artikl",
     "NalogHeader",
+    "NalogHeaderFiscal",
     "NalogDetail",
+    "RoutingStop",
     "Skladiste",
     "VrstaIsporuke",
     "GrupaArtikla",
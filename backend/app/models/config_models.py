@@ -1,4 +1,6 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, func
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, String, Integer, Boolean, DateTime, Text, func
 
 from app.db.base import Base
 
@@ -10,8 +12,8 @@ class Prioritet(Base):
     naziv = Column(String(100), nullable=False)
     tezina = Column(Integer, nullable=False, server_default="0")
     aktivan = Column(Boolean, nullable=False, server_default="1")
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
 
 
 class Setting(Base):
@@ -25,14 +27,14 @@ class RefreshLog(Base):
     __tablename__ = "refresh_log"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    sync_log_id = Column(Integer, nullable=True)
+    sync_log_id = Column(BigInteger, nullable=True)
     nalog_prodaje_uid = Column(String(50), nullable=False)
     partner_uid = Column(String(50), nullable=True)
     tip = Column(String(20), nullable=False)  # 'HEADER' ili 'PARTNER'
     polja_promijenjena = Column(Text, nullable=True)   # JSON
     stare_vrijednosti = Column(Text, nullable=True)     # JSON
     nove_vrijednosti = Column(Text, nullable=True)      # JSON
-    created_at = Column(DateTime, server_default=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
 
 
 class Status(Base):
@@ -43,8 +45,8 @@ class Status(Base):
     opis = Column(String(500), nullable=True)
     redoslijed = Column(Integer, nullable=False, server_default="0")
     aktivan = Column(Boolean, nullable=False, server_default="1")
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
 
 
 class SyncStatus(Base):
@@ -55,5 +57,5 @@ class SyncStatus(Base):
     status_id = Column(String(10), nullable=False, unique=True)
     naziv = Column(String(100), nullable=True)
     aktivan = Column(Boolean, nullable=False, server_default="1")
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
@@ -1,5 +1,7 @@
 """Models for driver mobile app — sessions, proof of delivery, GPS tracking."""
 
+from datetime import datetime
+
 from sqlalchemy import (
     Column, String, Integer, Boolean, DateTime, ForeignKey, Numeric, Text, func,
 )
@@ -15,7 +17,7 @@ class DriverSession(Base):
     vozilo_id = Column(Integer, ForeignKey("vozila.id"), nullable=True)
     registration_plate = Column(String(20), nullable=True)
     on_duty = Column(Boolean, nullable=False, server_default="0")
-    started_at = Column(DateTime, server_default=func.getutcdate())
+    started_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
     ended_at = Column(DateTime, nullable=True)
     is_active = Column(Boolean, nullable=False, server_default="1")
 
@@ -35,7 +37,7 @@ class DeliveryProof(Base):
     comment = Column(Text, nullable=True)
     gps_lat = Column(Numeric(18, 8), nullable=True)
     gps_lng = Column(Numeric(18, 8), nullable=True)
-    created_at = Column(DateTime, server_default=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
     luceed_sent_at = Column(DateTime, nullable=True)
 
 
@@ -51,4 +53,4 @@ class DriverLocation(Base):
     accuracy = Column(Numeric(10, 2), nullable=True)
     speed = Column(Numeric(10, 2), nullable=True)
     heading = Column(Numeric(10, 2), nullable=True)
-    created_at = Column(DateTime, server_default=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
@@ -3,22 +3,106 @@ SQLAlchemy modeli za ERP entitete (Luceed).
 
 Proširene tablice sa svim poljima iz Luceed API-ja.
 """
+from datetime import datetime
+
 from sqlalchemy import (
     Column,
     String,
     Integer,
     Date,
     DateTime,
+    Enum,
+    Float,
     ForeignKey,
+    Index,
+    MetaData,
     Numeric,
     Boolean,
+    Table,
     Text,
     func,
+    inspect,
+    text,
 )
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import relationship
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.db.base import Base
 
 
+# Šifrarnici partnera: tip -> (uid kolona na Partneru, ime relacije, stari naziv atributa).
+# Nazivi se drže u partner_sifrarnici, a na Partneru ostaju samo uid/šifra kolone.
+PARTNER_SIFRARNICI: dict[str, tuple[str, str, str]] = {
+    "drzava": ("drzava_uid", "drzava_ref", "naziv_drzave"),
+    "grupacija": ("grupacija_uid", "grupacija_ref", "naziv_grupacije"),
+    "komercijalista": ("komercijalista_uid", "komercijalista_ref", "ime_komercijaliste"),
+    "kam": ("kam_uid", "kam_ref", "ime_kam"),
+    "grupa_partnera": ("grupa_partnera_uid", "grupa_partnera_ref", "naziv_grupe_partnera"),
+    "agent": ("agent_uid", "agent_ref", "naziv_agenta"),
+    "vrsta_isporuke": ("vrsta_isporuke_uid", "vrsta_isporuke_ref", "naziv_vrste_isporuke"),
+    "grupa_mjesta": ("grupa_mjesta_uid", "grupa_mjesta_ref", "naziv_grupe_mjesta"),
+    "nivo_partnera": ("nivo_partnera_uid", "nivo_partnera_ref", "naziv_nivoa_partnera"),
+    "suradnik": ("suradnik_uid", "suradnik_ref", "naziv_suradnika"),
+    "odakle": ("odakle_uid", "odakle_ref", "odakle_naziv"),
+}
+
+
+def _sifrarnik_relacija(tip: str, uid_kolona: str):
+    """
+    Many-to-one relacija Partner -> PartnerSifrarnik za zadani tip šifrarnika.
+    lazy="raise" — serializacija naziva traži selectinload (_PARTNER_SIFRARNIK_OPTIONS),
+    da čitanje partnera bez njih ne radi SELECT po šifrarniku i partneru.
+    """
+    return relationship(
+        "PartnerSifrarnik",
+        primaryjoin=(
+            f"and_(foreign(Partner.{uid_kolona}) == PartnerSifrarnik.uid, "
+            f"PartnerSifrarnik.tip == '{tip}')"
+        ),
+        uselist=False,
+        lazy="raise",
+        viewonly=True,
+    )
+
+
+def _sifrarnik_naziv(relacija: str) -> property:
+    """Read-only naziv iz šifrarnika — zadržava stari oblik Partner API-ja."""
+    def _get(self):
+        zapis = getattr(self, relacija)
+        return zapis.naziv if zapis is not None else None
+    return property(_get)
+
+
+def _fiscal_zapis(header):
+    """
+    1:1 fiscal zapis headera. Ako ga upit nije učitao (bez selectinload),
+    dohvaća se na zahtjev jednim get-om po PK umjesto da relacija digne grešku.
+    """
+    state = inspect(header)
+    if "fiscal" in state.unloaded and state.has_identity and state.session is not None:
+        fiscal = state.session.get(NalogHeaderFiscal, header.nalog_prodaje_uid)
+        set_committed_value(header, "fiscal", fiscal)
+        return fiscal
+    return header.fiscal
+
+
+def _fiscal_polje(kolona: str) -> property:
+    """Atribut NalogHeadera koji se čita/piše kroz 1:1 relaciju fiscal."""
+    def _get(self):
+        fiscal = _fiscal_zapis(self)
+        return getattr(fiscal, kolona) if fiscal is not None else None
+
+    def _set(self, value):
+        fiscal = _fiscal_zapis(self)
+        if fiscal is None:
+            if value is None:
+                return
+            fiscal = self.fiscal = NalogHeaderFiscal()
+        setattr(fiscal, kolona, value)
+    return property(_get, _set)
+
+
 class NaloziBlacklist(Base):
     """Nalozi blokirani za automatski ERP import. Ručno se mogu reimportirati."""
     __tablename__ = "nalozi_blacklist"
@@ -26,7 +110,7 @@ class NaloziBlacklist(Base):
     nalog_prodaje_uid = Column(String(50), primary_key=True)
     razlog = Column(String(500), nullable=True)
     blocked_by = Column(String(100), nullable=True)
-    blocked_at = Column(DateTime, server_default=func.getutcdate())
+    blocked_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
 
 
 class VrstaIsporuke(Base):
@@ -37,8 +121,24 @@ class VrstaIsporuke(Base):
     vrsta_isporuke = Column(String(50), nullable=False, unique=True)
     opis = Column(String(255), nullable=True)
     aktivan = Column(Boolean, nullable=False, server_default="1")
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
+
+
+class PartnerSifrarnik(Base):
+    """
+    Šifrarnici partnera iz Luceed ERP-a (grupacija, komercijalista, agent, ...).
+
+    Nazivi se rijetko mijenjaju pa se drže jednom po (tip, uid) umjesto
+    da se ponavljaju u svakom retku tablice partneri.
+    """
+    __tablename__ = "partner_sifrarnici"
+
+    tip = Column(String(30), primary_key=True)
+    uid = Column(String(50), primary_key=True)
+    sifra = Column(String(50), nullable=True)
+    naziv = Column(String(255), nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
 
 
 class Partner(Base):
@@ -47,6 +147,8 @@ class Partner(Base):
     
     Sva polja mapirana iz API poziva: /datasnap/rest/partneri/sifra/{sifra}
     Primarni ključ je partner_uid (ne partner/sifra).
+    Nazivi šifrarnika (naziv_grupacije, ime_komercijaliste, ...) čitaju se
+    iz partner_sifrarnici preko *_ref relacija.
     """
     __tablename__ = "partneri"
 
@@ -73,11 +175,10 @@ class Partner(Base):
     b2b_mjesto = Column(String(50), nullable=True)
     drzava_uid = Column(String(50), nullable=True)
     drzava = Column(String(10), nullable=True)
-    naziv_drzave = Column(String(100), nullable=True)
     b2b_drzava = Column(String(50), nullable=True)
     valuta = Column(String(10), nullable=True)
     b2b_valuta = Column(String(50), nullable=True)
-    rabat = Column(Numeric(18, 2), nullable=True)
+    rabat = Column(Numeric(5, 2), nullable=True)  # postotak
     limit_iznos = Column(Numeric(18, 2), nullable=True)
     limit_dana = Column(Integer, nullable=True)
     odgoda_placanja = Column(Integer, nullable=True)
@@ -103,40 +204,54 @@ class Partner(Base):
     export_cjenika = Column(String(1), nullable=True)
     grupacija_uid = Column(String(50), nullable=True)
     grupacija = Column(String(50), nullable=True)
-    naziv_grupacije = Column(String(255), nullable=True)
     parent__partner_uid = Column(String(50), nullable=True)
     parent__partner = Column(String(50), nullable=True)
     parent__partner_b2b = Column(String(50), nullable=True)
     komercijalista_uid = Column(String(50), nullable=True)
     komercijalista = Column(String(50), nullable=True)
-    ime_komercijaliste = Column(String(255), nullable=True)
     kam_uid = Column(String(50), nullable=True)
     kam = Column(String(50), nullable=True)
-    ime_kam = Column(String(255), nullable=True)
     grupa_partnera_uid = Column(String(50), nullable=True)
     grupa_partnera = Column(String(50), nullable=True)
-    naziv_grupe_partnera = Column(String(255), nullable=True)
     agent_uid = Column(String(50), nullable=True)
     agent = Column(String(50), nullable=True)
-    naziv_agenta = Column(String(255), nullable=True)
     vrsta_isporuke_uid = Column(String(50), nullable=True)
     vrsta_isporuke = Column(String(50), nullable=True)
-    naziv_vrste_isporuke = Column(String(255), nullable=True)
     grupa_mjesta_uid = Column(String(50), nullable=True)
     grupa_mjesta = Column(String(50), nullable=True)
-    naziv_grupe_mjesta = Column(String(255), nullable=True)
     nivo_partnera_uid = Column(String(50), nullable=True)
     nivo_partnera = Column(String(50), nullable=True)
-    naziv_nivoa_partnera = Column(String(255), nullable=True)
     suradnik_uid = Column(String(50), nullable=True)
     suradnik = Column(String(50), nullable=True)
-    naziv_suradnika = Column(String(255), nullable=True)
     odakle_uid = Column(String(50), nullable=True)
     odakle = Column(String(50), nullable=True)
-    odakle_naziv = Column(String(255), nullable=True)
-    synced_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    synced_at = Column(DateTime, nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
+
+    drzava_ref = _sifrarnik_relacija("drzava", "drzava_uid")
+    grupacija_ref = _sifrarnik_relacija("grupacija", "grupacija_uid")
+    komercijalista_ref = _sifrarnik_relacija("komercijalista", "komercijalista_uid")
+    kam_ref = _sifrarnik_relacija("kam", "kam_uid")
+    grupa_partnera_ref = _sifrarnik_relacija("grupa_partnera", "grupa_partnera_uid")
+    agent_ref = _sifrarnik_relacija("agent", "agent_uid")
+    vrsta_isporuke_ref = _sifrarnik_relacija("vrsta_isporuke", "vrsta_isporuke_uid")
+    grupa_mjesta_ref = _sifrarnik_relacija("grupa_mjesta", "grupa_mjesta_uid")
+    nivo_partnera_ref = _sifrarnik_relacija("nivo_partnera", "nivo_partnera_uid")
+    suradnik_ref = _sifrarnik_relacija("suradnik", "suradnik_uid")
+    odakle_ref = _sifrarnik_relacija("odakle", "odakle_uid")
+
+    naziv_drzave = _sifrarnik_naziv("drzava_ref")
+    naziv_grupacije = _sifrarnik_naziv("grupacija_ref")
+    ime_komercijaliste = _sifrarnik_naziv("komercijalista_ref")
+    ime_kam = _sifrarnik_naziv("kam_ref")
+    naziv_grupe_partnera = _sifrarnik_naziv("grupa_partnera_ref")
+    naziv_agenta = _sifrarnik_naziv("agent_ref")
+    naziv_vrste_isporuke = _sifrarnik_naziv("vrsta_isporuke_ref")
+    naziv_grupe_mjesta = _sifrarnik_naziv("grupa_mjesta_ref")
+    naziv_nivoa_partnera = _sifrarnik_naziv("nivo_partnera_ref")
+    naziv_suradnika = _sifrarnik_naziv("suradnik_ref")
+    odakle_naziv = _sifrarnik_naziv("odakle_ref")
 
 
 class GrupaArtikla(Base):
@@ -150,8 +265,8 @@ class GrupaArtikla(Base):
     nadgrupa_artikla_naziv = Column(String(255), nullable=True)
     supergrupa_artikla = Column(String(50), nullable=True)
     supergrupa_artikla_naziv = Column(String(255), nullable=True)
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
 
 
 class Artikl(Base):
@@ -164,24 +279,24 @@ class Artikl(Base):
     naziv = Column(String(500), nullable=True)
     barcode = Column(String(100), nullable=True)
     jm = Column(String(20), nullable=True)
-    vpc = Column(Numeric(18, 6), nullable=True)
-    mpc = Column(Numeric(18, 6), nullable=True)
-    duzina = Column(Numeric(18, 6), nullable=True)
-    sirina = Column(Numeric(18, 6), nullable=True)
-    visina = Column(Numeric(18, 6), nullable=True)
-    masa = Column(Numeric(18, 6), nullable=True)
-    volumen = Column(Numeric(18, 6), nullable=True)
+    vpc = Column(Numeric(12, 4), nullable=True)
+    mpc = Column(Numeric(12, 4), nullable=True)
+    duzina = Column(Numeric(9, 3), nullable=True)
+    sirina = Column(Numeric(9, 3), nullable=True)
+    visina = Column(Numeric(9, 3), nullable=True)
+    masa = Column(Numeric(9, 3), nullable=True)
+    volumen = Column(Numeric(9, 6), nullable=True)
     pakiranje = Column(String(50), nullable=True)
     pakiranje_jm = Column(String(20), nullable=True)
-    pakiranje_masa = Column(Numeric(18, 6), nullable=True)
+    pakiranje_masa = Column(Numeric(9, 3), nullable=True)
     pakiranje_barcode = Column(String(100), nullable=True)
     pakiranje_trans = Column(String(50), nullable=True)
     pakiranje_trans_jm = Column(String(20), nullable=True)
-    pakiranje_trans_masa = Column(Numeric(18, 6), nullable=True)
+    pakiranje_trans_masa = Column(Numeric(9, 3), nullable=True)
     pakiranje_trans_barcode = Column(String(100), nullable=True)
-    pakiranje_trans_duzina = Column(Numeric(18, 6), nullable=True)
-    pakiranje_trans_sirina = Column(Numeric(18, 6), nullable=True)
-    pakiranje_trans_visina = Column(Numeric(18, 6), nullable=True)
+    pakiranje_trans_duzina = Column(Numeric(9, 3), nullable=True)
+    pakiranje_trans_sirina = Column(Numeric(9, 3), nullable=True)
+    pakiranje_trans_visina = Column(Numeric(9, 3), nullable=True)
     naziv_kratki = Column(String(255), nullable=True)
     supergrupa_artikla = Column(String(50), nullable=True)
     supergrupa_artikla_naziv = Column(String(255), nullable=True)
@@ -192,19 +307,19 @@ class Artikl(Base):
     grupa_artikla_uid = Column(String(50), nullable=True)
     grupa_artikla = Column(String(50), nullable=True)
     grupa_artikla_naziv = Column(String(255), nullable=True)
-    masa_netto = Column(Numeric(18, 6), nullable=True)
-    pakiranje_duzina = Column(Numeric(18, 6), nullable=True)
-    pakiranje_visina = Column(Numeric(18, 6), nullable=True)
-    pakiranje_sirina = Column(Numeric(18, 6), nullable=True)
+    masa_netto = Column(Numeric(9, 3), nullable=True)
+    pakiranje_duzina = Column(Numeric(9, 3), nullable=True)
+    pakiranje_visina = Column(Numeric(9, 3), nullable=True)
+    pakiranje_sirina = Column(Numeric(9, 3), nullable=True)
     paleta_kolicina = Column(Integer, nullable=True)
     proizvodac_uid = Column(String(50), nullable=True)
     proizvodac = Column(String(50), nullable=True)
     proizvodac_naziv = Column(String(255), nullable=True)
     glavni_dobavljac = Column(String(50), nullable=True)
     glavni_dobavljac_artikl = Column(String(255), nullable=True)
-    synced_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    synced_at = Column(DateTime, nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
 
 
 class KriterijaSku(Base):
@@ -214,8 +329,8 @@ class KriterijaSku(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     naziv = Column(String(100), nullable=False)
     opis = Column(Text, nullable=True)
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
 
 
 class ArtiklKriterija(Base):
@@ -226,8 +341,8 @@ class ArtiklKriterija(Base):
     artikl = Column(String(50), nullable=False)
     artikl_naziv = Column(String(500), nullable=True)
     kriterija_id = Column(Integer, ForeignKey("kriterije_sku.id"), nullable=False)
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
 
 
 class Skladiste(Base):
@@ -241,10 +356,13 @@ class Skladiste(Base):
     mjesto = Column(String(100), nullable=True)
     postanski_broj = Column(String(20), nullable=True)
     drzava = Column(String(50), nullable=True)
-    lat = Column(Numeric(18, 8), nullable=True)
-    lng = Column(Numeric(18, 8), nullable=True)
-    tip = Column(String(20), nullable=False)  # central / store
-    is_central = Column(Boolean, nullable=False, server_default="0")
+    lat = Column(Float, nullable=True)
+    lng = Column(Float, nullable=True)
+    tip = Column(
+        Enum("central", "store", name="ck_skladista_tip", create_constraint=True, length=10),
+        nullable=False,
+        server_default="store",
+    )
     radno_vrijeme_od = Column(String(5), nullable=True)  # "07:00"
     radno_vrijeme_do = Column(String(5), nullable=True)  # "15:00"
     kontakt_telefon = Column(String(50), nullable=True)
@@ -252,8 +370,17 @@ class Skladiste(Base):
     max_vozila = Column(Integer, nullable=True)
     aktivan = Column(Boolean, nullable=False, server_default="1")
     sync_naloga = Column(Boolean, nullable=False, server_default="0")
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
+
+    @hybrid_property
+    def is_central(self) -> bool:
+        """Centralno skladište – izvodi se iz `tip` (više nije zasebna kolona)."""
+        return self.tip == "central"
+
+    @is_central.expression
+    def is_central(cls):
+        return cls.tip == "central"
 
 
 class NalogHeader(Base):
@@ -263,33 +390,37 @@ class NalogHeader(Base):
     Sva polja mapirana iz API poziva: /datasnap/rest/NaloziProdaje/uid/{uid}
     Primarni ključ je nalog_prodaje_uid.
     Polje raspored = datum isporuke.
+
+    Fiskalna i B2B polja su u nalozi_header_fiscal (1:1) da redak koji planer
+    čita ostane uzak. Liste ih učitavaju s selectinload(NalogHeader.fiscal); bez toga
+    se fiscal zapis dohvaća na zahtjev pri prvom čitanju/pisanju fiskalnog atributa.
     """
     __tablename__ = "nalozi_header"
 
     nalog_prodaje_uid = Column(String(50), primary_key=True)
-    nalog_prodaje_b2b = Column(String(50), nullable=True)
+    nalog_prodaje_b2b = _fiscal_polje("nalog_prodaje_b2b")
     broj = Column(Integer, nullable=True)
     datum = Column(Date, nullable=True)
     rezervacija_od_datuma = Column(DateTime, nullable=True)
     rezervacija_do_datuma = Column(Date, nullable=True)
     raspored = Column(Date, nullable=True, index=True)  # datum isporuke
     skladiste = Column(String(50), nullable=True)
-    skladiste_b2b = Column(String(50), nullable=True)
+    skladiste_b2b = _fiscal_polje("skladiste_b2b")
     na__skladiste = Column(String(50), nullable=True)
-    na__skladiste_b2b = Column(String(50), nullable=True)
+    na__skladiste_b2b = _fiscal_polje("na__skladiste_b2b")
     partner_uid = Column(String(50), ForeignKey("partneri.partner_uid"), nullable=True, index=True)
     partner = Column(String(50), nullable=True)
-    partner_b2b = Column(String(50), nullable=True)
+    partner_b2b = _fiscal_polje("partner_b2b")
     korisnik__partner_uid = Column(String(50), nullable=True)
     korisnik__partner = Column(String(50), nullable=True)
-    korisnik__partner_b2b = Column(String(50), nullable=True)
+    korisnik__partner_b2b = _fiscal_polje("korisnik__partner_b2b")
     agent__partner_uid = Column(String(50), nullable=True)
     agent__partner = Column(String(50), nullable=True)
-    agent__partner_b2b = Column(String(50), nullable=True)
+    agent__partner_b2b = _fiscal_polje("agent__partner_b2b")
     narudzba = Column(String(100), nullable=True)
     kupac_placa_isporuku = Column(String(1), nullable=True)
     valuta = Column(String(10), nullable=True)
-    valuta_b2b = Column(String(50), nullable=True)
+    valuta_b2b = _fiscal_polje("valuta_b2b")
     tecaj = Column(Numeric(18, 6), nullable=True)
     generalni_rabat = Column(String(50), nullable=True)
     placa_porez = Column(String(1), nullable=True)
@@ -300,24 +431,106 @@ class NalogHeader(Base):
     na_uvid = Column(String(50), nullable=True)
     referenca_isporuke = Column(String(100), nullable=True)
     sa__skladiste = Column(String(50), nullable=True)
-    sa__skladiste_b2b = Column(String(50), nullable=True)
+    sa__skladiste_b2b = _fiscal_polje("sa__skladiste_b2b")
     skl_dokument = Column(String(10), nullable=True)
-    skl_dokument_b2b = Column(String(50), nullable=True)
+    skl_dokument_b2b = _fiscal_polje("skl_dokument_b2b")
     status = Column(String(20), nullable=True, index=True)
-    status_b2b = Column(String(50), nullable=True)
+    status_b2b = _fiscal_polje("status_b2b")
     komercijalist__radnik = Column(String(100), nullable=True)
-    komercijalist__radnik_b2b = Column(String(50), nullable=True)
+    komercijalist__radnik_b2b = _fiscal_polje("komercijalist__radnik_b2b")
     dostavljac_uid = Column(String(50), nullable=True)
     dostavljac__radnik = Column(String(100), nullable=True)
-    dostavljac__radnik_b2b = Column(String(50), nullable=True)
+    dostavljac__radnik_b2b = _fiscal_polje("dostavljac__radnik_b2b")
     kreirao__radnik_uid = Column(String(50), nullable=True)
     kreirao__radnik = Column(String(100), nullable=True)
     kreirao__radnik_ime = Column(String(255), nullable=True)
     vrsta_isporuke = Column(String(50), nullable=True, index=True)
-    vrsta_isporuke_b2b = Column(String(50), nullable=True)
+    vrsta_isporuke_b2b = _fiscal_polje("vrsta_isporuke_b2b")
     izravna_dostava = Column(String(1), nullable=True)
     dropoff_sifra = Column(String(50), nullable=True)
     dropoff_naziv = Column(String(255), nullable=True)
+    user_uid = _fiscal_polje("user_uid")
+    username = _fiscal_polje("username")
+    user_b2b = _fiscal_polje("user_b2b")
+    tip_racuna_uid = _fiscal_polje("tip_racuna_uid")
+    tip_racuna = _fiscal_polje("tip_racuna")
+    tip_racuna_b2b = _fiscal_polje("tip_racuna_b2b")
+    predmet_uid = _fiscal_polje("predmet_uid")
+    predmet = _fiscal_polje("predmet")
+    predmet_b2b = _fiscal_polje("predmet_b2b")
+    za_naplatu = Column(Numeric(18, 2), nullable=True)
+    zki = _fiscal_polje("zki")
+    jir = _fiscal_polje("jir")
+    # Interna polja koja mi računamo
+    regija_id = Column(Integer, ForeignKey("regije.id"), nullable=True)
+    vozilo_tip = Column(String(50), nullable=True)
+    # Totale računa trigger, a Python ih samo zbraja — čitaju se kao float (asdecimal=False)
+    total_weight = Column(Numeric(18, 3, asdecimal=False), nullable=True)
+    total_volume = Column(Numeric(18, 6, asdecimal=False), nullable=True)
+    manual_paleta = Column(Integer, nullable=True)
+    synced_at = Column(DateTime, nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
+    # Soft-delete: nalog prebačen u rutiranje/arhivu ili blacklistan ostaje u
+    # tablici (rute_stops ima FK na njega); čitanja ga filtriraju (app.db.session).
+    deleted_at = Column(DateTime, nullable=True, index=True)
+
+    # Partner naloga; lazy="raise" — pozivatelj mora eksplicitno tražiti selectinload
+    partner_ref = relationship("Partner", lazy="raise", viewonly=True)
+    fiscal = relationship(
+        "NalogHeaderFiscal",
+        uselist=False,
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    # Stavke naloga; lazy="raise" — učitavaju se jednim IN upitom (selectinload)
+    details = relationship(
+        "NalogDetail", lazy="raise", viewonly=True, order_by="NalogDetail.redoslijed",
+    )
+
+    __table_args__ = (
+        # Filtrirani covering indeks za planer: samo nalozi s rasporedom, a kolone
+        # koje rutiranje čita su INCLUDE-ane pa upit ne mora na clustered redak.
+        # (MSSQL ne dopušta SYSUTCDATETIME() u filteru, pa je prozor "raspored IS NOT NULL".)
+        Index(
+            "ix_nalozi_header_raspored_active",
+            "raspored",
+            "status",
+            mssql_where=text("raspored IS NOT NULL AND deleted_at IS NULL"),
+            mssql_include=[
+                "partner_uid",
+                "vrsta_isporuke",
+                "skladiste",
+                "sa__skladiste",
+                "regija_id",
+                "total_weight",
+                "total_volume",
+            ],
+        ),
+    )
+
+
+class NalogHeaderFiscal(Base):
+    """Hladni dio naloga (fiskalizacija, B2B šifre) — 1:1 s nalozi_header."""
+    __tablename__ = "nalozi_header_fiscal"
+
+    nalog_prodaje_uid = Column(
+        String(50), ForeignKey("nalozi_header.nalog_prodaje_uid", ondelete="CASCADE"), primary_key=True
+    )
+    nalog_prodaje_b2b = Column(String(50), nullable=True)
+    skladiste_b2b = Column(String(50), nullable=True)
+    na__skladiste_b2b = Column(String(50), nullable=True)
+    partner_b2b = Column(String(50), nullable=True)
+    korisnik__partner_b2b = Column(String(50), nullable=True)
+    agent__partner_b2b = Column(String(50), nullable=True)
+    valuta_b2b = Column(String(50), nullable=True)
+    sa__skladiste_b2b = Column(String(50), nullable=True)
+    skl_dokument_b2b = Column(String(50), nullable=True)
+    status_b2b = Column(String(50), nullable=True)
+    komercijalist__radnik_b2b = Column(String(50), nullable=True)
+    dostavljac__radnik_b2b = Column(String(50), nullable=True)
+    vrsta_isporuke_b2b = Column(String(50), nullable=True)
     user_uid = Column(String(50), nullable=True)
     username = Column(String(100), nullable=True)
     user_b2b = Column(String(50), nullable=True)
@@ -327,18 +540,8 @@ class NalogHeader(Base):
     predmet_uid = Column(String(50), nullable=True)
     predmet = Column(String(50), nullable=True)
     predmet_b2b = Column(String(50), nullable=True)
-    za_naplatu = Column(Numeric(18, 2), nullable=True)
     zki = Column(String(100), nullable=True)
     jir = Column(String(100), nullable=True)
-    # Interna polja koja mi računamo
-    regija_id = Column(Integer, ForeignKey("regije.id"), nullable=True)
-    vozilo_tip = Column(String(50), nullable=True)
-    total_weight = Column(Numeric(18, 3), nullable=True)
-    total_volume = Column(Numeric(18, 6), nullable=True)
-    manual_paleta = Column(Integer, nullable=True)
-    synced_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
 
 
 class NalogDetail(Base):
@@ -369,6 +572,46 @@ class NalogDetail(Base):
     rabat = Column(Numeric(18, 2), nullable=True)
     dodatni_rabat = Column(String(50), nullable=True)
     redoslijed = Column(Integer, nullable=True)
-    synced_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    synced_at = Column(DateTime, nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
+
+    # Artikl stavke; lazy="raise" — učitava se s selectinload(...).load_only(...)
+    artikl_ref = relationship("Artikl", lazy="raise", viewonly=True)
+
+
+# Indeksirani view (migracija 018) nije dio Base.metadata da ga create_all ne
+# pokuša kreirati kao tablicu.
+_view_metadata = MetaData()
+
+
+class RoutingStop(Base):
+    """
+    Read-only projekcija nalozi_header ⋈ partneri za planer (view v_routing_stops).
+
+    Indeksirani view (SCHEMABINDING + unique clustered indeks) — MSSQL ga održava
+    pri svakom upisu u bazne tablice pa nema ručnog refresha. Sadrži samo naloge
+    koji imaju partnera (indeksirani view ne dopušta OUTER JOIN).
+    """
+    __table__ = Table(
+        "v_routing_stops",
+        _view_metadata,
+        Column("nalog_prodaje_uid", String(50), primary_key=True),
+        Column("broj", Integer),
+        Column("raspored", Date),
+        Column("status", String(20)),
+        Column("skladiste", String(50)),
+        Column("sa__skladiste", String(50)),
+        Column("vrsta_isporuke", String(50)),
+        Column("regija_id", Integer),
+        Column("total_weight", Numeric(18, 3, asdecimal=False)),
+        Column("total_volume", Numeric(18, 6, asdecimal=False)),
+        Column("partner_uid", String(50)),
+        Column("partner_naziv", String(255)),
+        Column("partner_ime", String(100)),
+        Column("partner_prezime", String(100)),
+        Column("adresa", String(255)),
+        Column("naziv_mjesta", String(100)),
+        Column("postanski_broj", String(20)),
+        Column("drzava", String(10)),
+    )
@@ -4,6 +4,8 @@ SQLAlchemy model za Mantis WMS SSCC podatke.
 Tablica mantis_sscc služi kao lokalni cache podataka iz
 Mantis WMS view-a v_CST_OrderProgress.
 """
+from datetime import datetime
+
 from sqlalchemy import (
     Column,
     String,
@@ -46,6 +48,6 @@ class MantisSSCC(Base):
     assigned_user = Column(String(100), nullable=True)
     agency = Column(String(100), nullable=True)
     city = Column(String(100), nullable=True)
-    synced_at = Column(DateTime, nullable=False)
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    synced_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, DateTime, func, Text, UniqueConstraint
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, DateTime, Enum, func, Text, UniqueConstraint
 
 from app.db.base import Base
 
@@ -11,8 +13,8 @@ class Regija(Base):
     opis = Column(Text, nullable=True)
     parent_id = Column(Integer, ForeignKey("regije.id"), nullable=True)
     aktivan = Column(Boolean, nullable=False, server_default="1")
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
 
 
 class PostanskiBroj(Base):
@@ -22,8 +24,8 @@ class PostanskiBroj(Base):
     postanski_broj = Column(String(10), nullable=False)
     naziv_mjesta = Column(String(100), nullable=False, server_default="")
     regija_id = Column(Integer, ForeignKey("regije.id"), nullable=True)
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
 
     __table_args__ = (
         UniqueConstraint("postanski_broj", "naziv_mjesta", name="uq_postanski_brojevi_broj_mjesto"),
@@ -37,8 +39,8 @@ class Zona(Base):
     naziv = Column(String(100), nullable=False)
     opis = Column(Text, nullable=True)
     aktivan = Column(Boolean, nullable=False, server_default="1")
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
 
 
 class ZonaIzvor(Base):
@@ -46,5 +48,8 @@ class ZonaIzvor(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     zona_id = Column(Integer, ForeignKey("zone.id"), nullable=False)
-    izvor_tip = Column(String(20), nullable=False)  # depot / store
+    izvor_tip = Column(
+        Enum("depot", "store", name="ck_zone_izvori_izvor_tip", create_constraint=True, length=10),
+        nullable=False,
+    )
     izvor_id = Column(Integer, nullable=False)
@@ -1,10 +1,28 @@
-from sqlalchemy import Column, String, Integer, Date, DateTime, ForeignKey, Numeric, Text, func
+import json
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, Date, DateTime, Enum, ForeignKey, Index, LargeBinary, Numeric, Text, func, text
+from sqlalchemy.orm import relationship
 
 from app.db.base import Base
+from app.utils.polyline import decode_polyline, encode_polyline
 
 
 class Ruta(Base):
     __tablename__ = "rute"
+    __table_args__ = (
+        # Lista ruta planera: filtar po skladištu, sortirano po datumu.
+        Index("ix_rute_warehouse_datum", "warehouse_id", "datum"),
+        # Vozačka aplikacija traži samo aktivne rute (po vozilu/vozaču/korisniku),
+        # a one su mali dio tablice pa je filtrirani indeks dovoljan.
+        Index(
+            "ix_rute_active",
+            "status",
+            "datum",
+            mssql_where=text("status IN ('PLANNED', 'IN_PROGRESS')"),
+            mssql_include=["vozilo_id", "vozac_id", "driver_user_id"],
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     datum = Column(Date, nullable=False)
@@ -16,12 +34,18 @@ class Ruta(Base):
     driver_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     driver_name = Column(String(200), nullable=True)
     warehouse_id = Column(Integer, ForeignKey("skladista.id"), nullable=True)
-    izvor_tip = Column(String(20), nullable=True)
+    izvor_tip = Column(
+        Enum("depot", "store", name="ck_rute_izvor_tip", create_constraint=True, length=10),
+        nullable=True,
+    )
     izvor_id = Column(Integer, nullable=True)
     distance_km = Column(Numeric(18, 3), nullable=True)
     duration_min = Column(Integer, nullable=True)
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
+
+    # Vozilo rute; lazy="raise" — liste ruta ga učitavaju jednim selectinload-om
+    vozilo_ref = relationship("Vozilo", lazy="raise", viewonly=True)
 
 
 class RutaStop(Base):
@@ -29,7 +53,8 @@ class RutaStop(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     ruta_id = Column(Integer, ForeignKey("rute.id"), nullable=False)
-    nalog_uid = Column(String(50), nullable=False)  # FK uklonjen jer se nalozi brisu iz originala
+    # Nalozi se iz originala samo soft-deleteaju, pa FK može ostati
+    nalog_uid = Column(String(50), ForeignKey("nalozi_header.nalog_prodaje_uid"), nullable=False, index=True)
     redoslijed = Column(Integer, nullable=False)
     eta = Column(DateTime, nullable=True)
     status = Column(String(30), nullable=True)
@@ -40,6 +65,24 @@ class RutaPolyline(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     ruta_id = Column(Integer, ForeignKey("rute.id"), nullable=False)
-    polyline = Column(Text, nullable=False)
+    polyline = Column(LargeBinary, nullable=True)  # float32 [lat, lng, ...] (app.utils.polyline)
+    polyline_encoded = Column(Text, nullable=True)  # stari JSON format, samo za rute prije migracije 023
     distance_km = Column(Numeric(18, 3), nullable=True)
     duration_min = Column(Integer, nullable=True)
+
+    @property
+    def coords(self) -> list[list[float]] | None:
+        """Geometrija rute kao [[lat, lng], ...]."""
+        if self.polyline:
+            return decode_polyline(self.polyline)
+        if self.polyline_encoded:
+            try:
+                return json.loads(self.polyline_encoded)
+            except (json.JSONDecodeError, TypeError):
+                return None
+        return None
+
+    @coords.setter
+    def coords(self, value: list[list[float]]) -> None:
+        self.polyline = encode_polyline(value)
+        self.polyline_encoded = None
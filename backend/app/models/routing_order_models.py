@@ -8,6 +8,8 @@ Tablice:
   - nalozi_details_arhiva: stavke arhiviranih naloga
 """
 
+from datetime import datetime
+
 from sqlalchemy import (
     Column, String, Integer, Date, DateTime, Numeric, Text, func, ForeignKey
 )
@@ -85,15 +87,15 @@ class NalogHeaderRutiranje(Base):
     jir = Column(String(100), nullable=True)
     regija_id = Column(Integer, nullable=True)
     vozilo_tip = Column(String(50), nullable=True)
-    total_weight = Column(Numeric(18, 3), nullable=True)
-    total_volume = Column(Numeric(18, 6), nullable=True)
+    total_weight = Column(Numeric(18, 3, asdecimal=False), nullable=True)
+    total_volume = Column(Numeric(18, 6, asdecimal=False), nullable=True)
     synced_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
     # Dodatne kolone za rutiranje
     ruta_id = Column(Integer, nullable=True)
     status_rutiranja = Column(String(30), nullable=False, server_default="CEKA_RUTU")
-    prebaceno_at = Column(DateTime, server_default=func.getutcdate())
+    prebaceno_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
     manual_paleta = Column(Integer, nullable=True)
 
 
@@ -126,8 +128,8 @@ class NalogDetailRutiranje(Base):
     dodatni_rabat = Column(String(50), nullable=True)
     redoslijed = Column(Integer, nullable=True)
     synced_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
 
 
 class NalogHeaderArhiva(Base):
@@ -201,8 +203,8 @@ class NalogHeaderArhiva(Base):
     jir = Column(String(100), nullable=True)
     regija_id = Column(Integer, nullable=True)
     vozilo_tip = Column(String(50), nullable=True)
-    total_weight = Column(Numeric(18, 3), nullable=True)
-    total_volume = Column(Numeric(18, 6), nullable=True)
+    total_weight = Column(Numeric(18, 3, asdecimal=False), nullable=True)
+    total_volume = Column(Numeric(18, 6, asdecimal=False), nullable=True)
     synced_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, nullable=True)
     updated_at = Column(DateTime, nullable=True)
@@ -230,7 +232,7 @@ class NalogHeaderArhiva(Base):
     ukupno_trajanje_rute_min = Column(Integer, nullable=True)
     broj_stopova_na_ruti = Column(Integer, nullable=True)
     # Meta
-    arhivirano_at = Column(DateTime, server_default=func.getutcdate())
+    arhivirano_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
 
 
 class NalogDetailArhiva(Base):
@@ -266,4 +268,4 @@ class NalogDetailArhiva(Base):
     synced_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, nullable=True)
     updated_at = Column(DateTime, nullable=True)
-    arhivirano_at = Column(DateTime, server_default=func.getutcdate())
+    arhivirano_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, Numeric, func
+from datetime import datetime
+
+from sqlalchemy import BINARY, BigInteger, Column, String, Integer, DateTime, Float, Text, Index, PrimaryKeyConstraint, func
 
 from app.db.base import Base
 
@@ -6,33 +8,44 @@ from app.db.base import Base
 class SyncLog(Base):
     __tablename__ = "sync_log"
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
     entity = Column(String(50), nullable=False)
     status = Column(String(20), nullable=False)
     message = Column(Text, nullable=True)
-    started_at = Column(DateTime, server_default=func.getutcdate())
+    started_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
     finished_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        # Upiti su uvijek "zadnji sync za entitet" pa je clustered ključ
+        # (entity, started_at DESC); PK na id ostaje nonclustered.
+        PrimaryKeyConstraint("id", mssql_clustered=False),
+        Index("ix_sync_log_entity_time", entity, started_at.desc(), mssql_clustered=True),
+    )
+
 
 class GeocodingCache(Base):
     __tablename__ = "geocoding_cache"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    address_hash = Column(String(64), unique=True, nullable=False)
+    address_hash = Column(BINARY(32), unique=True, nullable=False)  # sirovi SHA-256 digest
     address = Column(Text, nullable=False)
-    lat = Column(Numeric(18, 8), nullable=True)
-    lng = Column(Numeric(18, 8), nullable=True)
+    lat = Column(Float, nullable=True)
+    lng = Column(Float, nullable=True)
     provider = Column(String(50), nullable=True)
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
 
 
 class DistanceMatrixCache(Base):
     __tablename__ = "distance_matrix_cache"
+    __table_args__ = (
+        # INCLUDE pokriva lookup i preload bez key lookupa na clustered PK
+        Index("ix_dmc_pair", "origin_hash", "dest_hash", unique=True, mssql_include=["distance_m", "duration_s"]),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    origin_hash = Column(String(64), nullable=False)
-    dest_hash = Column(String(64), nullable=False)
+    origin_hash = Column(BINARY(8), nullable=False)  # lat/lng * 1e5 spakirani kao dva int32
+    dest_hash = Column(BINARY(8), nullable=False)
     distance_m = Column(Integer, nullable=True)
     duration_s = Column(Integer, nullable=True)
     provider = Column(String(50), nullable=True)
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
@@ -1,7 +1,9 @@
+from datetime import datetime
+
 from sqlalchemy import (
-    Column, String, Integer, Boolean, DateTime, ForeignKey, Text, func, UniqueConstraint,
+    Column, String, Integer, Boolean, DateTime, ForeignKey, Index, Text, event, func, UniqueConstraint,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from app.db.base import Base
 
@@ -15,6 +17,8 @@ class User(Base):
     ime = Column(String(100), nullable=True)
     prezime = Column(String(100), nullable=True)
     email = Column(String(100), nullable=True)
+    # ime + prezime (ili username) — puni se pri zapisu, vidi _set_full_name
+    full_name = Column(String(201), nullable=True)
     aktivan = Column(Boolean, nullable=False, server_default="1")
 
     # Auth & security
@@ -27,16 +31,23 @@ class User(Base):
     last_login = Column(DateTime, nullable=True)
     last_login_ip = Column(String(45), nullable=True)
 
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
+
+    # Relationships — bez eager joina; mjesta koja trebaju rolu/dozvole
+    # traže ih s selectinload(User.role).selectinload(Role.permissions)
+    role = relationship("Role", lazy="select")
+
 
-    # Relationships
-    role = relationship("Role", lazy="joined")
+def compose_full_name(ime: str | None, prezime: str | None, username: str) -> str:
+    """"Ime Prezime", a ako oboje nedostaje — username."""
+    return " ".join(p for p in (ime, prezime) if p).strip() or username
 
-    @property
-    def full_name(self) -> str:
-        parts = [self.ime or "", self.prezime or ""]
-        return " ".join(p for p in parts if p).strip() or self.username
+
+@event.listens_for(User, "before_insert")
+@event.listens_for(User, "before_update")
+def _set_full_name(mapper, connection, target: User) -> None:
+    target.full_name = compose_full_name(target.ime, target.prezime, target.username)
 
 
 class Role(Base):
@@ -46,9 +57,9 @@ class Role(Base):
     name = Column(String(50), unique=True, nullable=False)
     description = Column(String(255), nullable=True)
     is_system = Column(Boolean, nullable=False, server_default="0")
-    created_at = Column(DateTime, server_default=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
 
-    permissions = relationship("Permission", secondary="role_permissions", lazy="joined")
+    permissions = relationship("Permission", secondary="role_permissions", lazy="select")
 
 
 class Permission(Base):
@@ -85,7 +96,12 @@ class RefreshToken(Base):
     revoked = Column(Boolean, nullable=False, server_default="0")
     user_agent = Column(String(500), nullable=True)
     ip_address = Column(String(45), nullable=True)
-    created_at = Column(DateTime, server_default=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+
+    __table_args__ = (
+        Index("ix_refresh_tokens_token_hash", token_hash),
+        Index("ix_refresh_tokens_user_revoked", user_id, revoked),
+    )
 
 
 class AuditLog(Base):
@@ -96,14 +112,22 @@ class AuditLog(Base):
     action = Column(String(100), nullable=False)
     entity = Column(String(100), nullable=True)
     entity_id = Column(String(100), nullable=True)
-    data = Column(Text, nullable=True)
-    old_values = Column(Text, nullable=True)
-    new_values = Column(Text, nullable=True)
+    # JSON payloadi mogu biti desetci KB — ne čitaju se bez eksplicitnog undefer()
+    data = deferred(Column(Text, nullable=True), raiseload=True)
+    old_values = deferred(Column(Text, nullable=True), raiseload=True)
+    new_values = deferred(Column(Text, nullable=True), raiseload=True)
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(String(500), nullable=True)
     warehouse_id = Column(Integer, nullable=True)
     correlation_id = Column(String(36), nullable=True)
-    created_at = Column(DateTime, server_default=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+
+    __table_args__ = (
+        # Lista audita: ORDER BY created_at DESC, opcionalno filtrirano po korisniku
+        Index("ix_audit_log_created_at", created_at.desc()),
+        Index("ix_audit_log_user_created", user_id, created_at.desc()),
+        Index("ix_audit_log_entity", entity, entity_id),
+    )
 
 
 class UserPreference(Base):
@@ -113,7 +137,7 @@ class UserPreference(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     pref_key = Column(String(200), nullable=False)
     pref_value = Column(Text, nullable=False)
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
 
     __table_args__ = (
         UniqueConstraint("user_id", "pref_key", name="uq_user_pref_key"),
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from sqlalchemy import Column, String, Integer, Numeric, Boolean, DateTime, ForeignKey, func, Text
 
 from app.db.base import Base
@@ -10,8 +12,8 @@ class VoziloTip(Base):
     naziv = Column(String(100), nullable=False)
     opis = Column(Text, nullable=True)
     aktivan = Column(Boolean, nullable=False, server_default="1")
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
 
 
 class Vozilo(Base):
@@ -22,14 +24,14 @@ class Vozilo(Base):
     naziv = Column(String(100), nullable=True)
     registracija = Column(String(20), nullable=True)
     tip_id = Column(Integer, ForeignKey("vozila_tip.id"), nullable=True)
-    warehouse_id = Column(Integer, ForeignKey("skladista.id"), nullable=True)
-    nosivost_kg = Column(Numeric(18, 3), nullable=True)
-    volumen_m3 = Column(Numeric(18, 6), nullable=True)
+    warehouse_id = Column(Integer, ForeignKey("skladista.id"), nullable=True, index=True)
+    nosivost_kg = Column(Numeric(18, 3, asdecimal=False), nullable=True)
+    volumen_m3 = Column(Numeric(18, 6, asdecimal=False), nullable=True)
     profil_rutiranja = Column(String(200), nullable=True)
     paleta = Column(Integer, nullable=True)
     aktivan = Column(Boolean, nullable=False, server_default="1")
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
 
 
 class Vozac(Base):
@@ -40,7 +42,7 @@ class Vozac(Base):
     prezime = Column(String(100), nullable=False)
     telefon = Column(String(50), nullable=True)
     email = Column(String(100), nullable=True)
-    warehouse_id = Column(Integer, ForeignKey("skladista.id"), nullable=True)
+    warehouse_id = Column(Integer, ForeignKey("skladista.id"), nullable=True, index=True)
     aktivan = Column(Boolean, nullable=False, server_default="1")
-    created_at = Column(DateTime, server_default=func.getutcdate())
-    updated_at = Column(DateTime, server_default=func.getutcdate(), onupdate=func.getutcdate())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.getutcdate(), onupdate=datetime.utcnow)
@@ -20,7 +20,6 @@ from app.schemas.items import (
     KriterijaSkuUpdate,
     ArtiklKriterijaCreate,
     ArtiklKriterijaOut,
-    ArtiklKriterijaImportResponse,
 )
 from app.schemas.regions import (
     RegijaCreate,
@@ -55,6 +54,7 @@ from app.schemas.routing import (
     ReorderStopsRequest,
     RouteListOut,
     RouteOut,
+    RouteStopFast,
     RouteStopOut,
     UpdateRouteStatusRequest,
     UpdateStopStatusRequest,
@@ -110,6 +110,7 @@ __all__ = [
     "ReorderStopsRequest",
     "RouteListOut",
     "RouteOut",
+    "RouteStopFast",
     "RouteStopOut",
     "UpdateRouteStatusRequest",
     "UpdateStopStatusRequest",
@@ -0,0 +1,42 @@
+"""Zajednički pomoćnici za pydantic sheme."""
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, ConfigDict
+
+_M = TypeVar("_M", bound=BaseModel)
+_NEMA = object()
+
+# Jedan config za sve izlazne (ORM) sheme umjesto ConfigDict-a po klasi.
+FROM_ATTRS = ConfigDict(from_attributes=True)
+
+
+def orm_konstruktor(model: type[_M], izostavi: tuple[str, ...] = ()) -> Callable[..., _M]:
+    """
+    Brzi DB -> API konstruktor preko model_construct (bez validacije po polju).
+
+    Vrijednosti je već tipizirao SQLAlchemy; jedina konverzija je Decimal ->
+    float za float polja. Samo za izlazne sheme — ulazne sheme i dalje
+    prolaze model_validate. Polja iz `izostavi` (npr. relacije s
+    lazy="raise") se ne čitaju i ostaju na defaultu. Polja koja ne dolaze
+    s ORM objekta (npr. partner_* projekcija) predaju se kao keyword argumenti.
+    """
+    polja = tuple(name for name in model.model_fields if name not in izostavi)
+    float_polja = tuple(
+        name for name, field in model.model_fields.items() if field.annotation in (float, float | None)
+    )
+
+    def konstruiraj(obj: Any, **dodatno: Any) -> _M:
+        data = {}
+        for name in polja:
+            value = getattr(obj, name, _NEMA)
+            if value is not _NEMA:
+                data[name] = value
+        for name in float_polja:
+            value = data.get(name)
+            if value is not None:
+                data[name] = float(value)
+        data.update(dodatno)
+        return model.model_construct(**data)
+
+    return konstruiraj
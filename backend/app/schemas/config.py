@@ -1,5 +1,7 @@
 """Pydantic sheme za config module."""
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, Field
+
+from app.schemas.base import FROM_ATTRS
 
 
 class PrioritetBase(BaseModel):
@@ -25,7 +27,7 @@ class PrioritetOut(PrioritetBase):
     """Output shema za prioritet."""
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
 
 
 class SettingBase(BaseModel):
@@ -46,7 +48,7 @@ class SettingUpdate(BaseModel):
 
 class SettingOut(SettingBase):
     """Output shema za setting."""
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
 
 
 class SettingsBulkUpdate(BaseModel):
@@ -83,4 +85,4 @@ class StatusUpdate(BaseModel):
 
 class StatusOut(StatusBase):
     """Output shema za status."""
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
@@ -1,6 +1,8 @@
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel
+
+from app.schemas.base import FROM_ATTRS, orm_konstruktor
 
 
 class GrupaArtiklaOut(BaseModel):
@@ -14,7 +16,10 @@ class GrupaArtiklaOut(BaseModel):
     created_at: datetime | None = None
     updated_at: datetime | None = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
+
+
+grupa_artikla_out_from_orm = orm_konstruktor(GrupaArtiklaOut)
 
 
 class ArtiklOut(BaseModel):
@@ -36,7 +41,10 @@ class ArtiklOut(BaseModel):
     glavni_dobavljac: str | None = None
     synced_at: datetime | None = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
+
+
+artikl_out_from_orm = orm_konstruktor(ArtiklOut)
 
 
 # ==============================================================================
@@ -61,7 +69,7 @@ class KriterijaSkuUpdate(BaseModel):
 class KriterijaSkuOut(KriterijaSkuBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
 
 
 # ==============================================================================
@@ -80,11 +88,4 @@ class ArtiklKriterijaOut(BaseModel):
     artikl_naziv: str | None = None
     kriterija_id: int
 
-    model_config = ConfigDict(from_attributes=True)
-
-
-class ArtiklKriterijaImportResponse(BaseModel):
-    imported: int
-    skipped: int
-    errors: list[str] = []
-
+    model_config = FROM_ATTRS
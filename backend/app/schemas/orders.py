@@ -2,8 +2,11 @@
 Pydantic sheme za naloge i partnere (proširene prema Luceed API-ju).
 """
 from datetime import date, datetime
+from typing import Any
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, Field
+
+from app.schemas.base import FROM_ATTRS, orm_konstruktor
 
 
 # =============================================================================
@@ -31,7 +34,7 @@ class VrstaIsporukeOut(VrstaIsporukeBase):
     created_at: datetime | None = None
     updated_at: datetime | None = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
 
 
 # =============================================================================
@@ -58,7 +61,7 @@ class SyncStatusOut(SyncStatusBase):
     created_at: datetime | None = None
     updated_at: datetime | None = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
 
 
 # =============================================================================
@@ -155,7 +158,10 @@ class PartnerOut(BaseModel):
     created_at: datetime | None = None
     updated_at: datetime | None = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
+
+
+partner_out_from_orm = orm_konstruktor(PartnerOut)
 
 
 class PartnerUpdate(BaseModel):
@@ -189,7 +195,7 @@ class PartnerListOut(BaseModel):
     e_mail: str | None = None
     blokiran: str | None = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
 
 
 # =============================================================================
@@ -226,13 +232,40 @@ class NalogDetailOut(BaseModel):
     artikl_volumen: float | None = None
     artikl_visina: float | None = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
 
 
 # =============================================================================
 # NalogHeader sheme (proširene)
 # =============================================================================
 
+class PartnerEmbed(BaseModel):
+    """
+    Projekcija partnera (dostava / kupac) koja se ugrađuje u nalog.
+
+    Polja odgovaraju partner_* poljima NalogHeaderOut-a (partner_naziv, ...)
+    i jedine su kolone partnera koje liste naloga učitavaju (load_only).
+    """
+    naziv: str | None = None
+    ime: str | None = None
+    prezime: str | None = None
+    mobitel: str | None = None
+    adresa: str | None = None
+    telefon: str | None = None
+    naziv_mjesta: str | None = None
+    postanski_broj: str | None = None
+    drzava: str | None = None
+    kontakt_osoba: str | None = None
+    e_mail: str | None = None
+
+    model_config = FROM_ATTRS
+
+    @classmethod
+    def header_polja(cls, partner: Any) -> dict[str, Any]:
+        """Partner entitet -> {partner_naziv: ..., partner_ime: ..., ...} za NalogHeaderOut."""
+        return {f"partner_{name}": getattr(partner, name) for name in cls.model_fields}
+
+
 class NalogHeaderOut(BaseModel):
     """Nalog header output shema sa svim poljima iz Luceed API-ja."""
     nalog_prodaje_uid: str
@@ -311,7 +344,7 @@ class NalogHeaderOut(BaseModel):
     updated_at: datetime | None = None
     # Nested details
     details: list[NalogDetailOut] = Field(default_factory=list)
-    # Polja iz tablice partneri (dostava / kupac) – popunjavaju se joinom
+    # Polja iz tablice partneri (dostava / kupac) – PartnerEmbed.header_polja
     partner_naziv: str | None = None
     partner_ime: str | None = None
     partner_prezime: str | None = None
@@ -324,7 +357,11 @@ class NalogHeaderOut(BaseModel):
     partner_kontakt_osoba: str | None = None
     partner_e_mail: str | None = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
+
+
+# details se grade zasebno (NalogDetailOut + artikl), vidi orders.get_order
+nalog_header_out_from_orm = orm_konstruktor(NalogHeaderOut, izostavi=("details",))
 
 
 class NalogListOut(BaseModel):
@@ -344,7 +381,7 @@ class NalogListOut(BaseModel):
     total_volume: float | None = None
     synced_at: datetime | None = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
 
 
 class NalogUpdate(BaseModel):
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel
+
+from app.schemas.base import FROM_ATTRS
 
 
 # ==============================================================================
@@ -29,7 +31,7 @@ class RegijaUpdate(BaseModel):
 class RegijaOut(RegijaBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
 
 
 class RegijaTreeOut(RegijaOut):
@@ -62,7 +64,7 @@ class PostanskiBrojUpdate(BaseModel):
 class PostanskiBrojOut(PostanskiBrojBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
 
 
 # ==============================================================================
@@ -1,7 +1,16 @@
 """Pydantic sheme za routing module."""
+from dataclasses import dataclass
 from datetime import date, datetime, time
+from typing import Literal
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, Field, SkipValidation
+
+from app.schemas.base import FROM_ATTRS
+
+# Zatvoreni skupovi vrijednosti — Literal se validira lookupom, bez regexa
+IzvorTip = Literal["depot", "store"]
+RouteStatus = Literal["DRAFT", "PLANNED", "IN_PROGRESS", "COMPLETED", "CANCELLED"]
+StopStatus = Literal["PENDING", "ARRIVED", "DELIVERED", "FAILED", "SKIPPED"]
 
 
 class RouteStopOut(BaseModel):
@@ -17,7 +26,27 @@ class RouteStopOut(BaseModel):
     lat: float | None = None
     lng: float | None = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
+
+
+@dataclass(slots=True, frozen=True)
+class RouteStopFast:
+    """
+    Stop na ruti za prikaz karte — ista polja kao RouteStopOut.
+
+    Ruta ima i stotine stopova; dataclass sa __slots__ nema __dict__ ni
+    pydantic interno stanje po objektu, a routing_service ga puni izravno.
+    """
+    id: int
+    nalog_uid: str
+    redoslijed: int
+    eta: datetime | None = None
+    status: str | None = None
+    partner_naziv: str | None = None
+    partner_adresa: str | None = None
+    partner_mjesto: str | None = None
+    lat: float | None = None
+    lng: float | None = None
 
 
 class RouteOut(BaseModel):
@@ -38,10 +67,12 @@ class RouteOut(BaseModel):
     distance_km: float | None = None
     duration_min: int | None = None
     regije: str | None = None
-    stops: list[RouteStopOut] = Field(default_factory=list)
-    polyline: list[list[float]] | None = None
+    stops: list[RouteStopFast] = Field(default_factory=list)
+    # Geometrija (10k+ točaka) dolazi iz RutaPolyline/routing providera — ne
+    # validira se po točki; shema i serializer ostaju list[list[float]]
+    polyline: SkipValidation[list[list[float]] | None] = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
 
 
 class RouteListOut(BaseModel):
@@ -62,7 +93,7 @@ class RouteListOut(BaseModel):
     wms_paleta: int | None = None
     regije: str | None = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
 
 
 class CreateRouteRequest(BaseModel):
@@ -71,12 +102,12 @@ class CreateRouteRequest(BaseModel):
     vozilo_id: int | None = None
     vozac_id: int | None = None
     driver_user_id: int | None = None
-    izvor_tip: str | None = Field(None, pattern="^(depot|store)$")
+    izvor_tip: IzvorTip | None = None
     izvor_id: int | None = None
     datum: date | None = None
     raspored: date | None = None
     start_time: time | None = None
-    algoritam: str = Field(default="nearest_neighbor", pattern="^(nearest_neighbor|ortools|manual)$")
+    algoritam: Literal["nearest_neighbor", "ortools", "manual"] = "nearest_neighbor"
 
 
 class ReorderStopsRequest(BaseModel):
@@ -86,17 +117,17 @@ class ReorderStopsRequest(BaseModel):
 
 class UpdateRouteStatusRequest(BaseModel):
     """Request za promjenu statusa rute."""
-    status: str = Field(..., pattern="^(DRAFT|PLANNED|IN_PROGRESS|COMPLETED|CANCELLED)$")
+    status: RouteStatus
 
 
 class UpdateStopStatusRequest(BaseModel):
     """Request za promjenu statusa stopa."""
-    status: str = Field(..., pattern="^(PENDING|ARRIVED|DELIVERED|FAILED|SKIPPED)$")
+    status: StopStatus
 
 
 class OptimizeRouteRequest(BaseModel):
     """Request za optimizaciju postojeće rute."""
-    algoritam: str = Field(default="nearest_neighbor", pattern="^(nearest_neighbor|ortools)$")
+    algoritam: Literal["nearest_neighbor", "ortools"] = "nearest_neighbor"
 
 
 class GeocodingRequest(BaseModel):
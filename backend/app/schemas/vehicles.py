@@ -1,4 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel
+
+from app.schemas.base import FROM_ATTRS
 
 
 class VoziloTipBase(BaseModel):
@@ -20,7 +22,7 @@ class VoziloTipUpdate(BaseModel):
 class VoziloTipOut(VoziloTipBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
 
 
 class VoziloBase(BaseModel):
@@ -55,7 +57,7 @@ class VoziloOut(VoziloBase):
     id: int
     registracija: str | None = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
 
 
 class VozacBase(BaseModel):
@@ -83,4 +85,4 @@ class VozacUpdate(BaseModel):
 class VozacOut(VozacBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = FROM_ATTRS
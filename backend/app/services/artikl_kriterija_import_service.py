@@ -9,138 +9,373 @@ Očekivani XLSX format (header u prvom redu):
 from __future__ import annotations
 
 import logging
-from typing import Any
+from collections.abc import Callable, Iterator, Sequence
+from datetime import datetime
+from itertools import islice
+from typing import Any, BinaryIO
 
 from openpyxl import load_workbook
-from sqlalchemy import select
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.models.erp_models import Artikl, ArtiklKriterija, KriterijaSku
+from app.models.sync_models import SyncLog
+
+try:  # python-calamine (Rust) parsira XLSX višestruko brže od openpyxl-a
+    from python_calamine import CalamineWorkbook
+except ImportError:  # openpyxl ostaje fallback
+    CalamineWorkbook = None
 
 logger = logging.getLogger(__name__)
 
+# Broj šifri po IN listi (MSSQL dopušta najviše 2100 parametara po upitu)
+_ARTIKL_CHUNK = 1000
+# Broj novih veza po executemany INSERT-u. Engine ima fast_executemany, pa
+# pyodbc šalje cijeli batch kao jedan parametrizirani bulk poziv — to je na
+# MSSQL-u ekvivalent COPY puta, bez zasebne grane za velike datoteke.
+_INSERT_BATCH = 1000
+# Commit nakon svakih N upisanih veza — ograničava veličinu transakcije/loga
+_COMMIT_EVERY = 5000
+
+_ARTIKL_ALIASES = frozenset({"artikl", "sifra", "šifra", "artikl_sifra", "sifra_artikla"})
+_KRITERIJA_ALIASES = frozenset({"kriterija", "kriterij", "criteria", "criterion", "tip"})
+
+# Normalizirani naziv kolone u headeru -> uloga kolone
+_HEADER_ROLES: dict[str, str] = {
+    **dict.fromkeys(_ARTIKL_ALIASES, "artikl"),
+    **dict.fromkeys(_KRITERIJA_ALIASES, "kriterija"),
+}
+
 
 def _normalize(val: Any) -> str:
     """Normalize header name."""
-    return str(val).strip().lower().replace(" ", "_")
+    text = val if isinstance(val, str) else str(val)
+    return text.strip().lower().replace(" ", "_")
 
 
-def import_artikl_kriterija_from_xlsx(
-    file_content: bytes,
-    db: Session,
-) -> dict[str, Any]:
-    """Import artikl-kriterija veza iz XLSX datoteke.
-
-    Returns dict with keys: imported, skipped, errors.
-    """
-    import io
+def _calamine_value(val: Any) -> Any:
+    """Calamine vraća "" za praznu ćeliju i float za svaki broj — svedi na openpyxl oblik."""
+    if val == "":
+        return None
+    if isinstance(val, float) and val.is_integer():
+        return int(val)
+    return val
 
-    wb = load_workbook(filename=io.BytesIO(file_content), read_only=True)
-    ws = wb.active
-    if ws is None:
-        return {"imported": 0, "skipped": 0, "errors": ["XLSX nema aktivni sheet."]}
 
-    rows = list(ws.iter_rows(values_only=True))
-    if len(rows) < 2:
-        return {"imported": 0, "skipped": 0, "errors": ["XLSX nema podataka (samo header ili prazno)."]}
+def _insert_batch(db: Session, batch: list[tuple[int, dict[str, Any]]]) -> tuple[int, list[str]]:
+    """
+    Upiši batch novih veza jednim executemany INSERT-om u savepointu.
 
-    # Parse header
-    header = [_normalize(cell) if cell else "" for cell in rows[0]]
+    Ako batch padne, ponavlja se red po red da se izdvoji neispravan redak;
+    ostali redovi se upisuju. Vraća (broj upisanih, greške).
+    """
+    try:
+        with db.begin_nested():
+            db.execute(insert(ArtiklKriterija), [values for _, values in batch])
+        return len(batch), []
+    except SQLAlchemyError:
+        pass
+
+    inserted = 0
+    errors: list[str] = []
+    for row_num, values in batch:
+        try:
+            with db.begin_nested():
+                db.execute(insert(ArtiklKriterija), values)
+            inserted += 1
+        except SQLAlchemyError as e:
+            errors.append(f"Red {row_num}: {e}")
+            logger.warning("Greška u redu %d: %s", row_num, e)
+    return inserted, errors
 
-    # Map column names
-    artikl_idx = None
-    kriterija_idx = None
 
-    artikl_aliases = {"artikl", "sifra", "šifra", "artikl_sifra", "sifra_artikla"}
-    kriterija_aliases = {"kriterija", "kriterij", "criteria", "criterion", "tip"}
+def _create_kriterije(db: Session, nazivi: list[str]) -> dict[str, int]:
+    """
+    Kreiraj kriterije jednim INSERT ... RETURNING; vraća {naziv.lower(): id}.
 
-    for i, h in enumerate(header):
-        if h in artikl_aliases:
-            artikl_idx = i
-        if h in kriterija_aliases:
-            kriterija_idx = i
+    Ako batch padne, kriteriji se kreiraju pojedinačno i neuspjeli se preskaču
+    (redovi s tim kriterijem prijavljuju se kao greške).
+    """
+    created: dict[str, int] = {}
+    try:
+        with db.begin_nested():
+            rows = db.execute(
+                insert(KriterijaSku).returning(KriterijaSku.id, KriterijaSku.naziv),
+                [{"naziv": naziv} for naziv in nazivi],
+            ).tuples().all()
+        for kriterija_id, naziv in rows:
+            created[naziv.lower()] = kriterija_id
+    except SQLAlchemyError:
+        for naziv in nazivi:
+            try:
+                with db.begin_nested():
+                    created[naziv.lower()] = db.execute(
+                        insert(KriterijaSku).values(naziv=naziv).returning(KriterijaSku.id)
+                    ).scalar_one()
+            except SQLAlchemyError as e:
+                logger.warning("Kriterij '%s' nije kreiran: %s", naziv, e)
+    if created:
+        logger.info("Automatski kreirano %d kriterija", len(created))
+    return created
+
+
+class _SheetReader:
+    """Prvi sheet XLSX-a kao iterator redova (tuple vrijednosti), calamine ili openpyxl."""
+
+    def __init__(self, file: BinaryIO) -> None:
+        self._wb = None
+        self._sheet = None
+        self._ws = None
+        if CalamineWorkbook is not None:
+            self._sheet = CalamineWorkbook.from_filelike(file).get_sheet_by_index(0)
+        else:
+            self._wb = load_workbook(
+                filename=file, read_only=True, data_only=True, keep_links=False,
+            )
+            self._ws = self._wb.active
 
-    if artikl_idx is None:
-        return {"imported": 0, "skipped": 0, "errors": ["Kolona 'artikl' ili 'sifra' nije pronađena u headeru."]}
-    if kriterija_idx is None:
-        return {"imported": 0, "skipped": 0, "errors": ["Kolona 'kriterija' nije pronađena u headeru."]}
+    @property
+    def has_sheet(self) -> bool:
+        return self._sheet is not None or self._ws is not None
 
-    # Cache: kriterija_naziv -> KriterijaSku object
-    kriterija_cache: dict[str, KriterijaSku] = {}
-    existing_kriterije = db.execute(select(KriterijaSku)).scalars().all()
-    for k in existing_kriterije:
-        kriterija_cache[k.naziv.strip().lower()] = k
+    def rows(self, min_row: int = 1) -> Iterator[Sequence[Any]]:
+        """Redovi od min_row (1-based), lijeno — sheet se ne kopira u listu."""
+        if self._sheet is not None:
+            for row in islice(self._sheet.iter_rows(), min_row - 1, None):
+                yield tuple(_calamine_value(v) for v in row)
+        else:
+            yield from self._ws.iter_rows(min_row=min_row, values_only=True)
 
-    # Cache: artikl sifra -> Artikl object (for naziv lookup)
-    artikl_cache: dict[str, Artikl] = {}
+    def close(self) -> None:
+        if self._wb is not None:
+            self._wb.close()
 
-    imported = 0
-    skipped = 0
-    errors: list[str] = []
 
-    for row_num, row in enumerate(rows[1:], start=2):
-        try:
-            raw_artikl = row[artikl_idx]
-            raw_kriterija = row[kriterija_idx]
+def _parse_rows(file: BinaryIO) -> tuple[list[tuple[int, str, str]], int, str | None]:
+    """
+    Faza 1: pročitaj sheet u listu (broj_reda, šifra, naziv_kriterija).
 
-            if not raw_artikl or not raw_kriterija:
+    Prazni i kratki redovi te duplikati unutar datoteke se preskaču.
+    Vraća (redovi, preskočeno, greška) — greška je poruka za neispravnu datoteku.
+    """
+    reader = _SheetReader(file)
+    try:
+        if not reader.has_sheet:
+            return [], 0, "XLSX nema aktivni sheet."
+
+        header_row = next(reader.rows(), None)
+        if header_row is None:
+            return [], 0, "XLSX nema podataka (samo header ili prazno)."
+
+        # Map column names — prva kolona koja odgovara ulozi ima prednost
+        artikl_idx = None
+        kriterija_idx = None
+        for i, cell in enumerate(header_row):
+            role = _HEADER_ROLES.get(_normalize(cell)) if cell else None
+            if role == "artikl" and artikl_idx is None:
+                artikl_idx = i
+            elif role == "kriterija" and kriterija_idx is None:
+                kriterija_idx = i
+            if artikl_idx is not None and kriterija_idx is not None:
+                break
+
+        if artikl_idx is None:
+            return [], 0, "Kolona 'artikl' ili 'sifra' nije pronađena u headeru."
+        if kriterija_idx is None:
+            return [], 0, "Kolona 'kriterija' nije pronađena u headeru."
+
+        parsed: list[tuple[int, str, str]] = []
+        skipped = 0
+        seen: set[tuple[str, str]] = set()
+        min_len = max(artikl_idx, kriterija_idx) + 1
+        row_num = 1
+        for row_num, row in enumerate(reader.rows(min_row=2), start=2):
+            if len(row) < min_len or not row[artikl_idx] or not row[kriterija_idx]:
                 skipped += 1
                 continue
+            artikl_sifra = str(row[artikl_idx]).strip()
+            kriterija_naziv = str(row[kriterija_idx]).strip()
 
-            artikl_sifra = str(raw_artikl).strip()
-            kriterija_naziv = str(raw_kriterija).strip()
-
-            # Resolve kriterija - create if doesn't exist
-            key = kriterija_naziv.lower()
-            if key not in kriterija_cache:
-                new_k = KriterijaSku(naziv=kriterija_naziv)
-                db.add(new_k)
-                db.flush()
-                kriterija_cache[key] = new_k
-                logger.info(f"Automatski kreiran kriterij: {kriterija_naziv}")
-
-            kriterija_obj = kriterija_cache[key]
-
-            # Resolve artikl naziv from artikli table
-            artikl_naziv = None
-            if artikl_sifra not in artikl_cache:
-                result = db.execute(
-                    select(Artikl).where(Artikl.artikl == artikl_sifra)
-                ).scalar_one_or_none()
-                if result:
-                    artikl_cache[artikl_sifra] = result
-            if artikl_sifra in artikl_cache:
-                artikl_naziv = artikl_cache[artikl_sifra].naziv
-
-            # Check for duplicate
-            existing = db.execute(
-                select(ArtiklKriterija).where(
-                    ArtiklKriterija.artikl == artikl_sifra,
-                    ArtiklKriterija.kriterija_id == kriterija_obj.id,
-                )
-            ).scalar_one_or_none()
-
-            if existing:
+            # Duplikat unutar iste datoteke
+            pair = (artikl_sifra, kriterija_naziv.lower())
+            if pair in seen:
                 skipped += 1
                 continue
+            seen.add(pair)
+            parsed.append((row_num, artikl_sifra, kriterija_naziv))
 
-            new_ak = ArtiklKriterija(
-                artikl=artikl_sifra,
-                artikl_naziv=artikl_naziv,
-                kriterija_id=kriterija_obj.id,
-            )
-            db.add(new_ak)
-            imported += 1
+        if row_num == 1:
+            return [], 0, "XLSX nema podataka (samo header ili prazno)."
+        return parsed, skipped, None
+    finally:
+        reader.close()
 
-        except Exception as e:
-            errors.append(f"Red {row_num}: {str(e)}")
-            logger.warning(f"Greška u redu {row_num}: {e}")
 
-    db.commit()
-    wb.close()
+def _resolve_caches(
+    db: Session,
+    parsed: list[tuple[int, str, str]],
+) -> tuple[dict[str, int], dict[str, str | None], set[tuple[str, int]]]:
+    """
+    Faza 2: razriješi sve potrebno iz baze skupnim upitima.
+
+    Vraća ({naziv_kriterija.lower(): id}, {šifra: naziv_artikla},
+    {(šifra, kriterija_id)} postojećih veza). Nedostajući kriteriji se kreiraju.
+    """
+    kriterija_map: dict[str, int] = {
+        naziv.strip().lower(): kriterija_id
+        for naziv, kriterija_id in db.execute(select(KriterijaSku.naziv, KriterijaSku.id)).tuples()
+    }
+    novi_kriteriji: dict[str, str] = {}
+    for _, _, kriterija_naziv in parsed:
+        key = kriterija_naziv.lower()
+        if key not in kriterija_map:
+            novi_kriteriji.setdefault(key, kriterija_naziv)
+    if novi_kriteriji:
+        kriterija_map.update(_create_kriterije(db, list(novi_kriteriji.values())))
+
+    sifre = list({artikl_sifra for _, artikl_sifra, _ in parsed})
+    naziv_map: dict[str, str | None] = {}
+    for i in range(0, len(sifre), _ARTIKL_CHUNK):
+        naziv_map.update(
+            db.execute(
+                select(Artikl.artikl, Artikl.naziv).where(Artikl.artikl.in_(sifre[i:i + _ARTIKL_CHUNK]))
+            ).tuples().all()
+        )
+
+    # Postojeće veze — Core redovi u blokovima (yield_per) ravno u set
+    existing_pairs: set[tuple[str, int]] = set(
+        db.execute(
+            select(ArtiklKriterija.artikl, ArtiklKriterija.kriterija_id)
+            .execution_options(yield_per=_ARTIKL_CHUNK)
+        ).tuples()
+    )
+    return kriterija_map, naziv_map, existing_pairs
+
+
+def _bulk_insert(
+    db: Session,
+    parsed: list[tuple[int, str, str]],
+    kriterija_map: dict[str, int],
+    naziv_map: dict[str, str | None],
+    existing_pairs: set[tuple[str, int]],
+    on_progress: Callable[[int, int], None] | None = None,
+) -> tuple[int, int, list[str]]:
+    """
+    Faza 3: upiši nove veze u batchevima. Vraća (upisano, preskočeno, greške).
+
+    `on_progress(upisano, ukupno)` se poziva prije svakog međucommita.
+    """
+    imported = 0
+    skipped = 0
+    errors: list[str] = []
+    pending: list[tuple[int, dict[str, Any]]] = []
+
+    committed = 0
+
+    def flush_pending() -> None:
+        nonlocal imported, committed
+        ok, batch_errors = _insert_batch(db, pending)
+        imported += ok
+        errors.extend(batch_errors)
+        pending.clear()
+        if imported - committed >= _COMMIT_EVERY:
+            if on_progress is not None:
+                on_progress(imported, len(parsed))
+            db.commit()
+            committed = imported
+            logger.info("Import artikl-kriterija: upisano %d/%d redova", imported, len(parsed))
+
+    for row_num, artikl_sifra, kriterija_naziv in parsed:
+        kriterija_id = kriterija_map.get(kriterija_naziv.lower())
+        if kriterija_id is None:
+            errors.append(f"Red {row_num}: kriterij '{kriterija_naziv}' nije moguće kreirati.")
+            continue
+
+        # Veza već postoji u bazi
+        if (artikl_sifra, kriterija_id) in existing_pairs:
+            skipped += 1
+            continue
+
+        pending.append((row_num, {
+            "artikl": artikl_sifra,
+            "artikl_naziv": naziv_map.get(artikl_sifra),
+            "kriterija_id": kriterija_id,
+        }))
+        if len(pending) >= _INSERT_BATCH:
+            flush_pending()
+
+    if pending:
+        flush_pending()
+    return imported, skipped, errors
+
+
+def import_artikl_kriterija_from_xlsx(
+    file: BinaryIO,
+    db: Session,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> dict[str, Any]:
+    """Import artikl-kriterija veza iz XLSX datoteke.
+
+    `file` je datoteka otvorena za binarno čitanje (npr. UploadFile.file) —
+    čita se izravno, bez kopiranja uploada u bytes.
+
+    Tri faze: parsiranje sheeta, skupno razrješavanje iz baze, batch INSERT.
+    Returns dict with keys: imported, skipped, errors.
+    """
+    parsed, parse_skipped, error = _parse_rows(file)
+    if error:
+        return {"imported": 0, "skipped": 0, "errors": [error]}
+
+    # Commit ide po blokovima od _COMMIT_EVERY veza; neočekivana greška
+    # poništava samo blok koji još nije commitan
+    try:
+        kriterija_map, naziv_map, existing_pairs = _resolve_caches(db, parsed)
+        imported, skipped, errors = _bulk_insert(
+            db, parsed, kriterija_map, naziv_map, existing_pairs, on_progress
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
 
     return {
         "imported": imported,
-        "skipped": skipped,
+        "skipped": parse_skipped + skipped,
         "errors": errors,
     }
+
+
+def run_artikl_kriterija_import(db: Session, sync_log: SyncLog, path: str) -> None:
+    """
+    Import iz datoteke na disku kao background posao praćen kroz SyncLog.
+
+    Status ide RUNNING -> IN_PROGRESS (napredak) -> COMPLETED/FAILED, isto kao
+    ERP sinkronizacije, pa se prati preko /sync/status/{id}.
+    """
+    sync_log.status = "RUNNING"
+    sync_log.message = "Čitanje XLSX datoteke..."
+    db.commit()
+
+    def progress(imported: int, total: int) -> None:
+        sync_log.status = "IN_PROGRESS"
+        sync_log.message = f"Upisano {imported}/{total} redova"
+
+    try:
+        with open(path, "rb") as file:
+            result = import_artikl_kriterija_from_xlsx(file, db, on_progress=progress)
+        errors = result["errors"]
+        sync_log.status = "COMPLETED"
+        sync_log.message = (
+            f"Dodano: {result['imported']}, Preskočeno: {result['skipped']}, Greške: {len(errors)}"
+            + (f" — {'; '.join(errors[:3])}" if errors else "")
+        )
+        sync_log.finished_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        logger.exception("Import artikl-kriterija failed: %s", e)
+        db.rollback()
+        sync_log.status = "FAILED"
+        sync_log.message = str(e)[:500]
+        sync_log.finished_at = datetime.utcnow()
+        db.commit()
@@ -6,20 +6,122 @@ Provider se odabire preko DB settings tablice (key: 'geocoding_provider').
 """
 from __future__ import annotations
 
-import hashlib
 import logging
+import struct
+import threading
 import time
-from typing import NamedTuple
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, NamedTuple
 
+import numpy as np
 import requests
-from sqlalchemy import and_, select
+from pydantic_core import from_json
+from requests.adapters import HTTPAdapter
+from sqlalchemy import Row, and_, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from urllib3.util.retry import Retry
 
 from app.core.config import settings as app_settings
+from app.models.config_models import Setting
 from app.models.sync_models import DistanceMatrixCache
+from app.utils.cache import TTLCache
+from app.utils.google_maps import get_gmaps_client
+from app.utils.polyline import decode_encoded_polyline
+
+try:  # ijson stream-parsira velike TomTom geometry odgovore
+    import ijson
+except ImportError:  # fallback: cijeli odgovor preko _loads
+    ijson = None
 
 logger = logging.getLogger(__name__)
 
+# In-process cache (origin_hash, dest_hash) -> (distance_m, duration_s) ispred DB cache-a.
+_memory_cache: TTLCache[tuple[bytes, bytes], tuple[int | None, int | None]] = TTLCache(maxsize=50_000, ttl=3600)
+
+# Aktivni provider se čita iz settings tablice najviše jednom u minuti, ne po paru
+_PROVIDER_TTL = 60
+_provider_cache: TTLCache[str, str] = TTLCache(maxsize=1, ttl=_PROVIDER_TTL)
+
+# Broj hash vrijednosti po IN listi (MSSQL dopušta najviše 2100 parametara po upitu)
+_PRELOAD_CHUNK = 500
+
+# Najdulje čekanje na TomTom async Matrix rezultat (sekunde)
+_TOMTOM_POLL_TIMEOUT = 60.0
+
+# Zadani TomTom truck parametri za komercijalni prijevoz
+_TOMTOM_TRUCK_PARAMS: Mapping[str, str] = MappingProxyType({
+    "travelMode": "truck",
+    "vehicleCommercial": "true",
+})
+
+# Ključ lokacije u distance_matrix_cache: (lat, lng) * 1e5 kao big-endian int32
+_LOCATION_KEY = struct.Struct(">ii")
+
+# Paralelni provider pozivi u get_distance_matrix (<= pool_maxsize HTTP adaptera)
+_MATRIX_WORKERS = 16
+
+# Dijeljeni HTTP session: keep-alive konekcije prema providerima se ponovno
+# koriste (bez DNS/TCP/TLS handshakea po pozivu). Retry samo za GET na 502/503/504.
+_http = requests.Session()
+_http_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504], raise_on_status=False),
+)
+_http.mount("https://", _http_adapter)
+_http.mount("http://", _http_adapter)
+
+
+class _CircuitBreaker:
+    """
+    Nakon `threshold` uzastopnih grešaka providera preskače HTTP pozive
+    `reset_after` sekundi (odmah fallback umjesto čekanja na timeout).
+    """
+
+    def __init__(self, threshold: int, reset_after: float) -> None:
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._failures = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return time.monotonic() < self._open_until
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.threshold:
+                self._open_until = time.monotonic() + self.reset_after
+                self._failures = 0
+
+
+_breakers = {name: _CircuitBreaker(threshold=5, reset_after=30.0) for name in ("osrm", "ors", "tomtom")}
+
+
+def _loads(resp: requests.Response) -> Any:
+    """JSON tijelo odgovora preko pydantic-core parsera (Rust), izravno iz bajtova."""
+    return from_json(resp.content)
+
+
+def _retry_after_seconds(value: str | None) -> float | None:
+    """Retry-After u sekundama (HTTP-date oblik se ignorira)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
 
 class DistanceResult(NamedTuple):
     """Rezultat distance upita."""
@@ -29,12 +131,22 @@ class DistanceResult(NamedTuple):
 
 
 def _get_provider(db: Session) -> str:
-    """Dohvati aktivni provider iz DB settings."""
-    from app.models.config_models import Setting
-    from sqlalchemy import func as sqlfunc
-    row = db.execute(
-        select(Setting).where(sqlfunc.upper(Setting.key) == "GEOCODING_PROVIDER")
-    ).scalar_one_or_none()
+    """Dohvati aktivni provider iz DB settings (cache-irano _PROVIDER_TTL sekundi)."""
+    cached = _provider_cache.get("provider")
+    if cached is not None:
+        return cached
+    provider = _read_provider(db)
+    _provider_cache.set("provider", provider)
+    return provider
+
+
+def invalidate_provider_cache() -> None:
+    _provider_cache.clear()
+
+
+def _read_provider(db: Session) -> str:
+    # Ključ je PK; collation baze je case-insensitive pa pokriva i 'GEOCODING_PROVIDER'
+    row = db.get(Setting, "geocoding_provider")
     if row and row.value:
         return row.value.strip().lower()
     if app_settings.ORS_API_KEY:
@@ -49,33 +161,111 @@ def _get_provider(db: Session) -> str:
 class DistanceMatrixService:
     """Servis za izračun udaljenosti između točaka s više providera."""
 
+    # Provider -> metoda za udaljenost jednog para (nepoznat provider -> OSRM)
+    _DISTANCE_DISPATCH = {
+        "google": "_distance_google",
+        "ors": "_distance_ors",
+        "tomtom": "_distance_tomtom",
+        "osrm": "_distance_osrm",
+    }
+
     @staticmethod
-    def _hash_location(lat: float, lng: float) -> str:
-        key = f"{lat:.5f},{lng:.5f}"
-        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+    def _hash_location(lat: float, lng: float) -> bytes:
+        # Koordinate zaokružene na 5 decimala (~1 m) spakirane kao dva int32:
+        # 8 bajtova, bez kolizija na toj preciznosti i bez SHA-256 po pozivu.
+        return _LOCATION_KEY.pack(round(lat * 1e5), round(lng * 1e5))
 
-    def _get_from_cache(self, db: Session, origin_hash: str, dest_hash: str) -> DistanceMatrixCache | None:
+    def _get_from_cache(self, db: Session, origin_hash: bytes, dest_hash: bytes) -> Row | None:
+        # Samo kolone iz ix_dmc_pair (ključ + INCLUDE) – upit je pokriven indeksom
         return db.execute(
-            select(DistanceMatrixCache).where(
+            select(DistanceMatrixCache.distance_m, DistanceMatrixCache.duration_s).where(
                 and_(
                     DistanceMatrixCache.origin_hash == origin_hash,
                     DistanceMatrixCache.dest_hash == dest_hash,
                 )
             )
-        ).scalar_one_or_none()
+        ).one_or_none()
 
     def _save_to_cache(
-        self, db: Session, origin_hash: str, dest_hash: str,
+        self, db: Session, origin_hash: bytes, dest_hash: bytes,
         distance_m: int | None, duration_s: int | None, provider: str,
-    ) -> DistanceMatrixCache:
-        cache_entry = DistanceMatrixCache(
-            origin_hash=origin_hash, dest_hash=dest_hash,
-            distance_m=distance_m, duration_s=duration_s, provider=provider,
-        )
-        db.add(cache_entry)
+    ) -> None:
+        self._save_to_cache_many(db, [{
+            "origin_hash": origin_hash, "dest_hash": dest_hash,
+            "distance_m": distance_m, "duration_s": duration_s, "provider": provider,
+        }])
+
+    def _save_to_cache_many(self, db: Session, rows: list[dict]) -> None:
+        """
+        Upiši cache parove jednim executemany INSERT-om i jednim commitom.
+        Parovi koji već postoje u bazi se preskaču; INSERT ide u savepoint pa
+        konflikt s paralelnim upisom ne poništava ostatak transakcije pozivatelja.
+        """
+        if not rows:
+            return
+
+        # Pojedinačni par je pozivatelj upravo tražio u cache-u; za batch se postojeći preskaču
+        existing: set[tuple[bytes, bytes]] = set()
+        for i in range(0, len(rows) if len(rows) > 1 else 0, _PRELOAD_CHUNK):
+            chunk = rows[i:i + _PRELOAD_CHUNK]
+            existing.update(
+                (origin_hash, dest_hash)
+                for origin_hash, dest_hash in db.execute(
+                    select(DistanceMatrixCache.origin_hash, DistanceMatrixCache.dest_hash).where(
+                        DistanceMatrixCache.origin_hash.in_({r["origin_hash"] for r in chunk}),
+                        DistanceMatrixCache.dest_hash.in_({r["dest_hash"] for r in chunk}),
+                    )
+                )
+            )
+        rows = [r for r in rows if (r["origin_hash"], r["dest_hash"]) not in existing]
+        if not rows:
+            return
+
+        try:
+            with db.begin_nested():
+                db.execute(insert(DistanceMatrixCache), rows)
+        except IntegrityError:
+            # Paralelni zahtjev je u međuvremenu upisao neki od parova – memorijski cache je svejedno popunjen
+            logger.warning("Distance cache: konflikt pri upisu %d parova", len(rows))
         db.commit()
-        db.refresh(cache_entry)
-        return cache_entry
+
+    def preload_cache(self, db: Session, locations: list[tuple[float, float]]) -> int:
+        """
+        Učitaj u memoriju sve cache-irane parove između zadanih lokacija.
+        Jedan IN upit po bloku umjesto N^2 pojedinačnih upita u get_distance.
+        Vraća broj učitanih parova.
+        """
+        hashes = list(dict.fromkeys(self._hash_location(lat, lng) for lat, lng in locations))
+        if len(hashes) < 2:
+            return 0
+
+        found: dict[tuple[bytes, bytes], tuple[int | None, int | None]] = {}
+        for i in range(0, len(hashes), _PRELOAD_CHUNK):
+            origin_chunk = hashes[i:i + _PRELOAD_CHUNK]
+            for j in range(0, len(hashes), _PRELOAD_CHUNK):
+                dest_chunk = hashes[j:j + _PRELOAD_CHUNK]
+                rows = db.execute(
+                    select(
+                        DistanceMatrixCache.origin_hash,
+                        DistanceMatrixCache.dest_hash,
+                        DistanceMatrixCache.distance_m,
+                        DistanceMatrixCache.duration_s,
+                    ).where(
+                        DistanceMatrixCache.origin_hash.in_(origin_chunk),
+                        DistanceMatrixCache.dest_hash.in_(dest_chunk),
+                    )
+                ).all()
+                for origin_hash, dest_hash, distance_m, duration_s in rows:
+                    found[(origin_hash, dest_hash)] = (distance_m, duration_s)
+
+        if app_settings.ASSUME_SYMMETRIC_DISTANCE:
+            # Zrcaljeni parovi se ne spremaju u DB – B→A se izvodi iz A→B ako B→A nema svoj red
+            for (origin_hash, dest_hash), value in list(found.items()):
+                found.setdefault((dest_hash, origin_hash), value)
+
+        for key, value in found.items():
+            _memory_cache.set(key, value)
+        return len(found)
 
     # -------------------------------------------------------------------------
     # Provider implementations
@@ -85,15 +275,19 @@ class DistanceMatrixService:
         self, origin_lat: float, origin_lng: float, dest_lat: float, dest_lng: float,
     ) -> DistanceResult:
         """Besplatni OSRM demo server za routing/distance."""
+        breaker = _breakers["osrm"]
+        if breaker.is_open():
+            return DistanceResult(None, None, False)
         try:
             url = (
                 f"http://router.project-osrm.org/route/v1/driving/"
                 f"{origin_lng},{origin_lat};{dest_lng},{dest_lat}"
                 f"?overview=false"
             )
-            resp = requests.get(url, timeout=10)
+            resp = _http.get(url, timeout=10)
             resp.raise_for_status()
-            data = resp.json()
+            data = _loads(resp)
+            breaker.record_success()
             if data.get("code") == "Ok" and data.get("routes"):
                 route = data["routes"][0]
                 return DistanceResult(
@@ -103,6 +297,7 @@ class DistanceMatrixService:
                 )
             return DistanceResult(None, None, False)
         except Exception as e:
+            breaker.record_failure()
             logger.exception("OSRM distance error: %s", e)
             return DistanceResult(None, None, False)
 
@@ -114,8 +309,11 @@ class DistanceMatrixService:
         if not api_key:
             logger.warning("ORS API ključ nedostaje, fallback na OSRM")
             return self._distance_osrm(origin_lat, origin_lng, dest_lat, dest_lng)
+        breaker = _breakers["ors"]
+        if breaker.is_open():
+            return self._distance_osrm(origin_lat, origin_lng, dest_lat, dest_lng)
         try:
-            resp = requests.post(
+            resp = _http.post(
                 "https://api.openrouteservice.org/v2/directions/driving-car",
                 json={
                     "coordinates": [
@@ -130,7 +328,8 @@ class DistanceMatrixService:
                 timeout=10,
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = _loads(resp)
+            breaker.record_success()
             routes = data.get("routes", [])
             if routes:
                 summary = routes[0].get("summary", {})
@@ -141,6 +340,7 @@ class DistanceMatrixService:
                 )
             return DistanceResult(None, None, False)
         except Exception as e:
+            breaker.record_failure()
             logger.warning("ORS distance error: %s – fallback na OSRM", e)
             return self._distance_osrm(origin_lat, origin_lng, dest_lat, dest_lng)
 
@@ -153,8 +353,7 @@ class DistanceMatrixService:
             logger.warning("Google Maps API ključ nedostaje")
             return DistanceResult(None, None, False)
         try:
-            import googlemaps
-            gmaps = googlemaps.Client(key=api_key)
+            gmaps = get_gmaps_client()
             result = gmaps.distance_matrix(
                 origins=[(origin_lat, origin_lng)],
                 destinations=[(dest_lat, dest_lng)],
@@ -177,12 +376,10 @@ class DistanceMatrixService:
     # -------------------------------------------------------------------------
 
     @staticmethod
-    def _tomtom_truck_params() -> dict:
-        """Zadani TomTom truck parametri za komercijalni prijevoz."""
-        return {
-            "travelMode": "truck",
-            "vehicleCommercial": "true",
-        }
+    @lru_cache(maxsize=4)
+    def _tomtom_route_params(api_key: str) -> Mapping[str, str]:
+        """Query parametri za Calculate Route (ključ + truck profil), složeni jednom po ključu."""
+        return MappingProxyType({"key": api_key, **_TOMTOM_TRUCK_PARAMS})
 
     def _distance_tomtom(
         self, origin_lat: float, origin_lng: float, dest_lat: float, dest_lng: float,
@@ -192,19 +389,20 @@ class DistanceMatrixService:
         if not api_key:
             logger.warning("TomTom API ključ nedostaje, fallback na OSRM")
             return self._distance_osrm(origin_lat, origin_lng, dest_lat, dest_lng)
+        breaker = _breakers["tomtom"]
+        if breaker.is_open():
+            return self._distance_osrm(origin_lat, origin_lng, dest_lat, dest_lng)
         try:
             locations = f"{origin_lat},{origin_lng}:{dest_lat},{dest_lng}"
-            params = {
-                "key": api_key,
-                **self._tomtom_truck_params(),
-            }
-            resp = requests.get(
+            params = self._tomtom_route_params(api_key)
+            resp = _http.get(
                 f"https://api.tomtom.com/routing/1/calculateRoute/{locations}/json",
                 params=params,
                 timeout=10,
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = _loads(resp)
+            breaker.record_success()
             routes = data.get("routes", [])
             if routes:
                 summary = routes[0].get("summary", {})
@@ -215,6 +413,7 @@ class DistanceMatrixService:
                 )
             return DistanceResult(None, None, False)
         except Exception as e:
+            breaker.record_failure()
             logger.warning("TomTom distance error: %s – fallback na OSRM", e)
             return self._distance_osrm(origin_lat, origin_lng, dest_lat, dest_lng)
 
@@ -227,29 +426,38 @@ class DistanceMatrixService:
             logger.warning("TomTom API ključ nedostaje za geometry")
             return None
         try:
-            locations = ":".join(f"{lat},{lng}" for lat, lng in coordinates)
+            locations = ":".join([f"{lat},{lng}" for lat, lng in coordinates])
             params = {
-                "key": api_key,
+                **self._tomtom_route_params(api_key),
                 "routeRepresentation": "polyline",
-                **self._tomtom_truck_params(),
             }
             logger.info("TomTom geometry request: %d waypoints", len(coordinates))
-            resp = requests.get(
+            with _http.get(
                 f"https://api.tomtom.com/routing/1/calculateRoute/{locations}/json",
                 params=params,
                 timeout=30,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            routes = data.get("routes", [])
-            if routes:
-                all_points: list[list[float]] = []
-                for leg in routes[0].get("legs", []):
-                    for point in leg.get("points", []):
-                        all_points.append([point["latitude"], point["longitude"]])
-                if all_points:
-                    logger.info("TomTom geometry: dobiveno %d koordinata", len(all_points))
-                    return all_points
+                stream=ijson is not None,
+            ) as resp:
+                resp.raise_for_status()
+                if ijson is not None:
+                    # Točke se parsiraju jedna po jedna iz streama, bez cijelog
+                    # routes/legs/points stabla u memoriji (bez alternativa je ruta jedna)
+                    resp.raw.decode_content = True
+                    all_points = [
+                        [point["latitude"], point["longitude"]]
+                        for point in ijson.items(resp.raw, "routes.item.legs.item.points.item", use_float=True)
+                    ]
+                else:
+                    data = _loads(resp)
+                    routes = data.get("routes", [])
+                    all_points = [
+                        [point["latitude"], point["longitude"]]
+                        for leg in (routes[0].get("legs", []) if routes else [])
+                        for point in leg.get("points", [])
+                    ]
+            if all_points:
+                logger.info("TomTom geometry: dobiveno %d koordinata", len(all_points))
+                return all_points
             logger.warning("TomTom geometry: prazan routes odgovor")
             return None
         except Exception as e:
@@ -270,19 +478,17 @@ class DistanceMatrixService:
             body: dict = {
                 "origins": origins,
                 "destinations": destinations,
-                "options": {
-                    **self._tomtom_truck_params(),
-                },
+                "options": dict(_TOMTOM_TRUCK_PARAMS),
             }
             logger.info("TomTom Matrix sync: %d lokacija (%d ćelija)", n, n * n)
-            resp = requests.post(
+            resp = _http.post(
                 "https://api.tomtom.com/routing/1/matrix/sync/json",
                 params={"key": api_key},
                 json=body,
                 timeout=60,
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = _loads(resp)
             return self._parse_tomtom_matrix(data, n)
         except Exception as e:
             logger.exception("TomTom Matrix sync error: %s", e)
@@ -302,12 +508,10 @@ class DistanceMatrixService:
             body: dict = {
                 "origins": origins,
                 "destinations": destinations,
-                "options": {
-                    **self._tomtom_truck_params(),
-                },
+                "options": dict(_TOMTOM_TRUCK_PARAMS),
             }
             logger.info("TomTom Matrix async: %d lokacija (%d ćelija)", n, n * n)
-            submit_resp = requests.post(
+            submit_resp = _http.post(
                 "https://api.tomtom.com/routing/1/matrix/async/json",
                 params={"key": api_key},
                 json=body,
@@ -319,32 +523,39 @@ class DistanceMatrixService:
 
             redirect_url = submit_resp.headers.get("Location")
             if not redirect_url:
-                data = submit_resp.json()
+                data = _loads(submit_resp)
                 return self._parse_tomtom_matrix(data, n)
 
-            max_polls = 30
-            poll_interval = 2.0
-            for attempt in range(max_polls):
-                time.sleep(poll_interval)
-                poll_resp = requests.get(
+            # Exponential backoff (0.5 s -> 4 s) uz poštivanje Retry-After, ukupno najviše _TOMTOM_POLL_TIMEOUT
+            deadline = time.monotonic() + _TOMTOM_POLL_TIMEOUT
+            poll_interval = 0.5
+            attempt = 0
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(poll_interval, remaining))
+                attempt += 1
+                poll_resp = _http.get(
                     redirect_url,
                     params={"key": api_key},
                     timeout=30,
                 )
                 if poll_resp.status_code == 200:
-                    data = poll_resp.json()
+                    data = _loads(poll_resp)
                     result = self._parse_tomtom_matrix(data, n)
                     if result:
-                        logger.info("TomTom Matrix async: rezultat dobiven nakon %d pokušaja", attempt + 1)
+                        logger.info("TomTom Matrix async: rezultat dobiven nakon %d pokušaja", attempt)
                         return result
                 elif poll_resp.status_code == 202:
-                    logger.debug("TomTom Matrix async: još se računa (pokušaj %d)", attempt + 1)
-                    continue
+                    logger.debug("TomTom Matrix async: još se računa (pokušaj %d)", attempt)
                 else:
                     logger.warning("TomTom Matrix async poll HTTP %d", poll_resp.status_code)
                     return None
+                retry_after = _retry_after_seconds(poll_resp.headers.get("Retry-After"))
+                poll_interval = retry_after if retry_after is not None else min(4.0, poll_interval * 1.5)
 
-            logger.warning("TomTom Matrix async: istekao timeout nakon %d pokušaja", max_polls)
+            logger.warning("TomTom Matrix async: istekao timeout nakon %d pokušaja", attempt)
             return None
         except Exception as e:
             logger.exception("TomTom Matrix async error: %s", e)
@@ -363,19 +574,39 @@ class DistanceMatrixService:
             logger.warning("TomTom Matrix: nema 'data' ni 'matrix' u odgovoru. Keys: %s", list(data.keys()))
             return None
 
-        dist_matrix = [[0] * n for _ in range(n)]
-        dur_matrix = [[0] * n for _ in range(n)]
+        # Samo uspješne ćelije; popunjavanje matrica je jedno fancy-index pridruživanje
+        ok = [
+            item for item in matrix_data
+            if item.get("statusCode", 200) == 200 and item.get("routeSummary")
+        ]
+        count = len(ok)
+        oi = np.fromiter((item.get("originIndex", 0) for item in ok), dtype=np.intp, count=count)
+        di = np.fromiter((item.get("destinationIndex", 0) for item in ok), dtype=np.intp, count=count)
+        lengths = np.fromiter(
+            (item["routeSummary"].get("lengthInMeters", 0) for item in ok), dtype=np.int64, count=count,
+        )
+        times = np.fromiter(
+            (item["routeSummary"].get("travelTimeInSeconds", 0) for item in ok), dtype=np.int64, count=count,
+        )
 
-        for item in matrix_data:
-            oi = item.get("originIndex", 0)
-            di = item.get("destinationIndex", 0)
-            summary = item.get("routeSummary", {})
-            if item.get("statusCode", 200) == 200 and summary:
-                dist_matrix[oi][di] = int(summary.get("lengthInMeters", 0))
-                dur_matrix[oi][di] = int(summary.get("travelTimeInSeconds", 0))
+        dist = np.zeros((n, n), dtype=np.int64)
+        dur = np.zeros((n, n), dtype=np.int64)
+        dist[oi, di] = lengths
+        dur[oi, di] = times
+        dist_matrix = dist.tolist()
+        dur_matrix = dur.tolist()
 
         return (dist_matrix, dur_matrix)
 
+    def _distance_from_provider(
+        self, provider: str,
+        origin_lat: float, origin_lng: float,
+        dest_lat: float, dest_lng: float,
+    ) -> DistanceResult:
+        """Pozovi odabrani provider (samo HTTP, bez DB pristupa – sigurno iz threada)."""
+        method = getattr(self, self._DISTANCE_DISPATCH.get(provider, "_distance_osrm"))
+        return method(origin_lat, origin_lng, dest_lat, dest_lng)
+
     # -------------------------------------------------------------------------
     # Public API
     # -------------------------------------------------------------------------
@@ -389,34 +620,119 @@ class DistanceMatrixService:
         origin_hash = self._hash_location(origin_lat, origin_lng)
         dest_hash = self._hash_location(dest_lat, dest_lng)
 
-        # 1. Cache
+        # 1. Cache - prvo memorija, zatim DB
+        hit = _memory_cache.get((origin_hash, dest_hash))
+        if hit is not None:
+            return DistanceResult(distance_m=hit[0], duration_s=hit[1], from_cache=True)
+
         cached = self._get_from_cache(db, origin_hash, dest_hash)
         if cached:
+            _memory_cache.set((origin_hash, dest_hash), (cached.distance_m, cached.duration_s))
             return DistanceResult(distance_m=cached.distance_m, duration_s=cached.duration_s, from_cache=True)
 
         # 2. Provider
         provider = _get_provider(db)
-
-        if provider == "google":
-            result = self._distance_google(origin_lat, origin_lng, dest_lat, dest_lng)
-        elif provider == "ors":
-            result = self._distance_ors(origin_lat, origin_lng, dest_lat, dest_lng)
-        elif provider == "tomtom":
-            result = self._distance_tomtom(origin_lat, origin_lng, dest_lat, dest_lng)
-        else:
-            result = self._distance_osrm(origin_lat, origin_lng, dest_lat, dest_lng)
+        result = self._distance_from_provider(provider, origin_lat, origin_lng, dest_lat, dest_lng)
 
         # 3. Cache
         if result.distance_m is not None:
             self._save_to_cache(db, origin_hash, dest_hash, result.distance_m, result.duration_s, provider)
+            _memory_cache.set((origin_hash, dest_hash), (result.distance_m, result.duration_s))
 
         return result
 
     def get_distance_matrix(
-        self, db: Session, locations: list[tuple[float, float]],
+        self, db: Session, locations: list[tuple[float, float]], try_fast: bool = True,
     ) -> list[list[DistanceResult]]:
-        """Izračunaj NxN matricu udaljenosti."""
+        """
+        Izračunaj NxN matricu udaljenosti.
+
+        Jedinstveni parovi se prvo traže u cache-u (jedan preload). Promašaji
+        se dohvaćaju jednim OSRM Table / TomTom Matrix pozivom, a tek ako on
+        ne uspije paralelno par po par (try_fast=False preskače Table/Matrix
+        poziv kad ga je pozivatelj već pokušao). Session se koristi isključivo
+        u pozivajućem threadu – worker threadovi rade samo HTTP pozive.
+        """
         n = len(locations)
+        self.preload_cache(db, locations)
+        hashes = [self._hash_location(lat, lng) for lat, lng in locations]
+
+        # Jedinstveni parovi (origin_hash, dest_hash) -> indeksi lokacija
+        pairs: dict[tuple[bytes, bytes], tuple[int, int]] = {}
+        for i in range(n):
+            for j in range(n):
+                if i != j:
+                    pairs.setdefault((hashes[i], hashes[j]), (i, j))
+
+        values: dict[tuple[bytes, bytes], tuple[int | None, int | None]] = {}
+        misses: list[tuple[bytes, bytes]] = []
+        for key in pairs:
+            hit = _memory_cache.get(key)
+            if hit is not None:
+                values[key] = hit
+            else:
+                misses.append(key)
+
+        fetched: dict[tuple[bytes, bytes], DistanceResult] = {}
+        mirrored: dict[tuple[bytes, bytes], tuple[bytes, bytes]] = {}
+        if misses and app_settings.ASSUME_SYMMETRIC_DISTANCE:
+            # B→A se preuzima od A→B (iz cache-a ili iz istog dohvata) umjesto zasebnog poziva
+            to_fetch: set[tuple[bytes, bytes]] = set()
+            remaining: list[tuple[bytes, bytes]] = []
+            for key in misses:
+                reverse = (key[1], key[0])
+                if reverse in values:
+                    values[key] = values[reverse]
+                elif reverse in to_fetch:
+                    mirrored[key] = reverse
+                else:
+                    to_fetch.add(key)
+                    remaining.append(key)
+            misses = remaining
+
+        if misses:
+            provider = _get_provider(db)
+            # Prvo cijela matrica jednim Table/Matrix pozivom, tek onda par po par
+            fast = self._distance_matrix_fast(locations, db) if try_fast else None
+            if fast is not None:
+                dist_matrix, dur_matrix, provider = fast
+                for key in misses:
+                    i, j = pairs[key]
+                    fetched[key] = DistanceResult(dist_matrix[i][j], dur_matrix[i][j], False)
+            else:
+                logger.info("Distance matrix: %d parova iz cache-a, %d od providera (%s)",
+                            len(values), len(misses), provider)
+                with ThreadPoolExecutor(max_workers=min(_MATRIX_WORKERS, len(misses))) as pool:
+                    futures = {}
+                    for key in misses:
+                        i, j = pairs[key]
+                        futures[pool.submit(
+                            self._distance_from_provider, provider,
+                            locations[i][0], locations[i][1], locations[j][0], locations[j][1],
+                        )] = key
+                    for future in as_completed(futures):
+                        fetched[futures[future]] = future.result()
+
+            new_rows: list[dict] = []
+            for key, result in fetched.items():
+                values[key] = (result.distance_m, result.duration_s)
+                if result.distance_m is not None:
+                    _memory_cache.set(key, values[key])
+                    new_rows.append({
+                        "origin_hash": key[0], "dest_hash": key[1],
+                        "distance_m": result.distance_m, "duration_s": result.duration_s,
+                        "provider": provider,
+                    })
+
+            self._save_to_cache_many(db, new_rows)
+
+            # Zrcaljeni parovi ne idu u DB – preload_cache ih izvodi iz obratnog smjera
+            for key, reverse in mirrored.items():
+                fetched[key] = fetched[reverse]
+                values[key] = values[reverse]
+                if values[key][0] is not None:
+                    _memory_cache.set(key, values[key])
+
         matrix: list[list[DistanceResult]] = []
         for i in range(n):
             row: list[DistanceResult] = []
@@ -424,9 +740,9 @@ class DistanceMatrixService:
                 if i == j:
                     row.append(DistanceResult(0, 0, True))
                 else:
-                    row.append(self.get_distance(
-                        db, locations[i][0], locations[i][1], locations[j][0], locations[j][1],
-                    ))
+                    key = (hashes[i], hashes[j])
+                    distance_m, duration_s = values[key]
+                    row.append(DistanceResult(distance_m, duration_s, key not in fetched))
             matrix.append(row)
         return matrix
 
@@ -439,10 +755,52 @@ class DistanceMatrixService:
         db: opcijski, potreban za čitanje providera (TomTom).
         Vraća (distance_matrix_m, duration_matrix_s) ili None ako ne uspije.
         """
+        result = self._distance_matrix_fast(locations, db)
+        return result[:2] if result else None
+
+    def _distance_matrix_fast(
+        self, locations: list[tuple[float, float]], db: Session | None,
+    ) -> tuple[list[list[int]], list[list[int]], str] | None:
+        """get_distance_matrix_fast uz provider koji je stvarno dao matricu (za cache)."""
         n = len(locations)
         if n < 2:
             return None
 
+        # Duplikati koordinata (isto skladište/kupac više puta) šalju se provideru jednom
+        index: dict[bytes, int] = {}
+        unique: list[tuple[float, float]] = []
+        inverse: list[int] = []
+        for lat, lng in locations:
+            key = self._hash_location(lat, lng)
+            if key not in index:
+                index[key] = len(unique)
+                unique.append((lat, lng))
+            inverse.append(index[key])
+        if len(unique) == n:
+            return self._distance_matrix_unique(locations, db)
+
+        if len(unique) < 2:
+            zeros = [[0] * n for _ in range(n)]
+            return (zeros, [row[:] for row in zeros], "osrm")
+        result = self._distance_matrix_unique(unique, db)
+        if result is None:
+            return None
+        logger.info("Distance matrix: %d lokacija, %d jedinstvenih", n, len(unique))
+        expand = np.ix_(inverse, inverse)
+        return (
+            np.asarray(result[0], dtype=np.int64)[expand].tolist(),
+            np.asarray(result[1], dtype=np.int64)[expand].tolist(),
+            result[2],
+        )
+
+    def _distance_matrix_unique(
+        self, locations: list[tuple[float, float]], db: Session | None,
+    ) -> tuple[list[list[int]], list[list[int]], str] | None:
+        """
+        Matrica za lokacije bez duplikata: TomTom Matrix ako je odabran, inače OSRM Table.
+        Vraća i provider koji je matricu stvarno dao.
+        """
+        n = len(locations)
         provider = _get_provider(db) if db else "osrm"
 
         if provider == "tomtom" and app_settings.TOMTOM_API_KEY:
@@ -451,10 +809,11 @@ class DistanceMatrixService:
             else:
                 result = self._distance_matrix_tomtom_async(locations)
             if result:
-                return result
+                return (*result, "tomtom")
             logger.warning("TomTom Matrix nije uspio, fallback na OSRM Table API")
 
-        return self._distance_matrix_osrm(locations)
+        result = self._distance_matrix_osrm(locations)
+        return (*result, "osrm") if result else None
 
     def _distance_matrix_osrm(
         self, locations: list[tuple[float, float]],
@@ -462,15 +821,15 @@ class DistanceMatrixService:
         """OSRM Table API (1 HTTP poziv) za NxN matricu."""
         n = len(locations)
         try:
-            coords_str = ";".join(f"{lng},{lat}" for lat, lng in locations)
+            coords_str = ";".join([f"{lng},{lat}" for lat, lng in locations])
             url = (
                 f"http://router.project-osrm.org/table/v1/driving/"
                 f"{coords_str}?annotations=distance,duration"
             )
             logger.info("OSRM Table API: %d lokacija", n)
-            resp = requests.get(url, timeout=30)
+            resp = _http.get(url, timeout=30)
             resp.raise_for_status()
-            data = resp.json()
+            data = _loads(resp)
             if data.get("code") == "Ok":
                 distances = data.get("distances", [])
                 durations = data.get("durations", [])
@@ -518,7 +877,7 @@ class DistanceMatrixService:
     def _route_geometry_ors(
         self, coordinates: list[tuple[float, float]],
     ) -> list[list[float]] | None:
-        """ORS Directions API – koristi /geojson endpoint koji vraća LineString koordinate."""
+        """ORS Directions API – JSON endpoint vraća geometriju kao encoded polyline (preciznost 5)."""
         api_key = app_settings.ORS_API_KEY
         if not api_key:
             logger.warning("ORS API ključ nedostaje za geometry")
@@ -528,10 +887,10 @@ class DistanceMatrixService:
             ors_coords = [[lng, lat] for lat, lng in coordinates]
             logger.info("ORS geometry request: %d waypoints", len(ors_coords))
 
-            # VAŽNO: Koristimo /geojson endpoint koji vraća GeoJSON FeatureCollection
-            # JSON endpoint (/driving-car) vraća encoded polyline string, ne GeoJSON!
-            resp = requests.post(
-                "https://api.openrouteservice.org/v2/directions/driving-car/geojson",
+            # JSON endpoint (/driving-car) vraća encoded polyline string – višestruko
+            # manji odgovor od /geojson FeatureCollectiona, dekodira se lokalno
+            resp = _http.post(
+                "https://api.openrouteservice.org/v2/directions/driving-car",
                 json={
                     "coordinates": ors_coords,
                 },
@@ -542,21 +901,19 @@ class DistanceMatrixService:
                 timeout=30,
             )
             resp.raise_for_status()
-            data = resp.json()
-
-            # GeoJSON response: FeatureCollection -> features[0] -> geometry -> coordinates
-            features = data.get("features", [])
-            if features:
-                geom = features[0].get("geometry", {})
-                if geom.get("type") == "LineString":
-                    coords = geom.get("coordinates", [])
+            data = _loads(resp)
+
+            routes = data.get("routes", [])
+            if routes:
+                geom = routes[0].get("geometry")
+                if isinstance(geom, str) and geom:
+                    # Encoded polyline se dekodira izravno u [lat, lng] za Leaflet
+                    coords = decode_encoded_polyline(geom, 5)
                     logger.info("ORS geometry: dobiveno %d koordinata za polyline", len(coords))
-                    # GeoJSON coordinates su [lng, lat] - pretvori u [lat, lng] za Leaflet
-                    return [[c[1], c[0]] for c in coords]
-                else:
-                    logger.warning("ORS geometry: neočekivani tip geometrije: %s", geom.get("type"))
+                    return coords
+                logger.warning("ORS geometry: neočekivani format: type=%s", type(geom).__name__)
             else:
-                logger.warning("ORS geometry: prazan features array. Response keys: %s", list(data.keys()))
+                logger.warning("ORS geometry: prazan routes array. Response keys: %s", list(data.keys()))
 
             return None
         except requests.exceptions.HTTPError as e:
@@ -572,21 +929,21 @@ class DistanceMatrixService:
         """OSRM Directions API s overview=full za geometry."""
         try:
             # OSRM format: lng,lat;lng,lat;...
-            coords_str = ";".join(f"{lng},{lat}" for lat, lng in coordinates)
+            coords_str = ";".join([f"{lng},{lat}" for lat, lng in coordinates])
             url = (
                 f"http://router.project-osrm.org/route/v1/driving/"
-                f"{coords_str}?overview=full&geometries=geojson"
+                f"{coords_str}?overview=full&geometries=polyline6"
             )
             logger.info("OSRM geometry request: %d waypoints", len(coordinates))
-            resp = requests.get(url, timeout=30)
+            resp = _http.get(url, timeout=30)
             resp.raise_for_status()
-            data = resp.json()
+            data = _loads(resp)
             if data.get("code") == "Ok" and data.get("routes"):
                 geom = data["routes"][0].get("geometry")
-                if geom and isinstance(geom, dict) and geom.get("type") == "LineString":
-                    coords = geom.get("coordinates", [])
+                if geom and isinstance(geom, str):
+                    coords = decode_encoded_polyline(geom, 6)
                     logger.info("OSRM geometry: dobiveno %d koordinata za polyline", len(coords))
-                    return [[c[1], c[0]] for c in coords]
+                    return coords
                 else:
                     logger.warning("OSRM geometry: neočekivani format: type=%s", type(geom).__name__)
             else:
@@ -8,15 +8,25 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from collections import deque
+from collections.abc import AsyncIterator
 from datetime import date
 from typing import Any
 
 import aiohttp
+from pydantic_core import from_json
 
 from app.core.config import settings
+from app.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Partneri se u ERP-u rijetko mijenjaju; isti partner se u syncu traži za svaki njegov nalog
+_PARTNER_CACHE_TTL = 300
+
+# Broj stranica artikala koje se istovremeno dohvaćaju iz ERP-a
+_ARTIKLI_CONCURRENCY = 4
+
 
 class ERPClient:
     """Async HTTP klijent za Luceed ERP REST API."""
@@ -24,23 +34,52 @@ class ERPClient:
     def __init__(self) -> None:
         self.base_url = settings.ERP_BASE_URL.rstrip("/")
         self._auth = aiohttp.BasicAuth(settings.ERP_USERNAME, settings.ERP_PASSWORD)
+        # ClientSession je vezan uz event loop; svaki sync job vrti vlastiti loop
+        # (api.sync._run_async), pa se drži jedan session po loopu
+        self._sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._partner_by_uid: TTLCache[str, dict[str, Any]] = TTLCache(maxsize=10_000, ttl=_PARTNER_CACHE_TTL)
+        self._partner_by_sifra: TTLCache[str, dict[str, Any]] = TTLCache(maxsize=10_000, ttl=_PARTNER_CACHE_TTL)
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Session s keep-alive connection poolom, dijeljen svim pozivima u istom loopu."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                auth=self._auth,
+                # Komprimirani JSON – aiohttp transparentno dekomprimira odgovor
+                headers={"Accept": "application/json", "Accept-Encoding": "gzip, deflate"},
+                connector=aiohttp.TCPConnector(
+                    limit=20, limit_per_host=10, ttl_dns_cache=300, keepalive_timeout=60,
+                ),
+            )
+            self._sessions[loop] = session
+        return session
+
+    async def close(self) -> None:
+        """Zatvori session trenutnog event loopa (poziva se prije zatvaranja loopa)."""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
     async def _get(self, path: str, timeout_seconds: int | None = None) -> Any:
         """Izvršava GET zahtjev i vraća JSON odgovor."""
         url = f"{self.base_url}{path}"
         timeout = aiohttp.ClientTimeout(total=timeout_seconds or 60)
         logger.debug("ERP GET %s (timeout=%ss)", url, timeout.total)
-        async with aiohttp.ClientSession(auth=self._auth) as session:
-            async with session.get(url, timeout=timeout) as resp:
-                resp.raise_for_status()
-                return await resp.json()
+        session = await self._get_session()
+        async with session.get(url, timeout=timeout) as resp:
+            resp.raise_for_status()
+            # pydantic-core (Rust) parser direktno nad bajtovima – artikli stranice su višeMB
+            return from_json(await resp.read())
 
     @staticmethod
     def _format_date(d: date) -> str:
-        return d.strftime("%d.%m.%Y")
+        # DD.MM.YYYY bez strftime (locale-aware C put)
+        return f"{d.day:02d}.{d.month:02d}.{d.year:04d}"
 
     # ------------------------------------------------------------------
     # Nalozi prodaje
@@ -109,13 +148,19 @@ class ERPClient:
         Dohvat partnera po UID-u.
 
         GET /datasnap/rest/partneri/uid/{partner_uid}
+
+        Pronađeni partner se cache-ira _PARTNER_CACHE_TTL sekundi.
         """
+        cached = self._partner_by_uid.get(partner_uid)
+        if cached is not None:
+            return cached
         path = f"/datasnap/rest/partneri/uid/{partner_uid}"
         data = await self._get(path)
         result = data.get("result", [])
         if result and isinstance(result, list) and len(result) > 0:
             partner_list = result[0].get("partner", [])
             if partner_list and isinstance(partner_list, list) and len(partner_list) > 0:
+                self._partner_by_uid.set(partner_uid, partner_list[0])
                 return partner_list[0]
         return None
 
@@ -129,14 +174,22 @@ class ERPClient:
         GET /datasnap/rest/partneri/sifra/{partner_sifra}
         
         Vraća: {"result": [{"partner": [...]}]}
+        Pronađeni partner se cache-ira _PARTNER_CACHE_TTL sekundi (i po UID-u).
         """
+        cached = self._partner_by_sifra.get(partner_sifra)
+        if cached is not None:
+            return cached
         path = f"/datasnap/rest/partneri/sifra/{partner_sifra}"
         data = await self._get(path)
         result = data.get("result", [])
         if result and isinstance(result, list) and len(result) > 0:
             partner_list = result[0].get("partner", [])
             if partner_list and isinstance(partner_list, list) and len(partner_list) > 0:
-                return partner_list[0]
+                partner = partner_list[0]
+                self._partner_by_sifra.set(partner_sifra, partner)
+                if partner.get("partner_uid"):
+                    self._partner_by_uid.set(str(partner["partner_uid"]), partner)
+                return partner
         return None
 
     # ------------------------------------------------------------------
@@ -182,19 +235,48 @@ class ERPClient:
                 return artikli[0]
         return None
 
+    async def iter_artikli_pages(
+        self, page_size: int = 500, offset: int = 0, concurrency: int = _ARTIKLI_CONCURRENCY,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Generator stranica artikala, redom po offsetu.
+
+        Nakon prve stranice u letu je do `concurrency` sljedećih zahtjeva (ERP
+        obrađuje više stranica paralelno), pa je u memoriji najviše toliko stranica.
+        """
+        page = await self.get_artikli_page(offset, page_size)
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+
+        next_offset = offset + page_size
+        pending: deque[asyncio.Task[list[dict[str, Any]]]] = deque()
+        try:
+            for _ in range(max(1, concurrency)):
+                pending.append(asyncio.create_task(self.get_artikli_page(next_offset, page_size)))
+                next_offset += page_size
+            while pending:
+                page = await pending.popleft()
+                if not page:
+                    return
+                yield page
+                if len(page) < page_size:
+                    return
+                pending.append(asyncio.create_task(self.get_artikli_page(next_offset, page_size)))
+                next_offset += page_size
+        finally:
+            # Stranice iza kraja (ili nakon greške) se ne čekaju
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
     async def get_all_artikli(self, page_size: int = 500) -> list[dict[str, Any]]:
         """Dohvat svih artikala iteriranjem po stranicama."""
         all_items: list[dict[str, Any]] = []
-        offset = 0
-        while True:
-            page = await self.get_artikli_page(offset, page_size)
-            if not page:
-                break
+        async for page in self.iter_artikli_pages(page_size):
             all_items.extend(page)
-            if len(page) < page_size:
-                break
-            offset += page_size
-            await asyncio.sleep(0.1)  # mali delay između stranica
         return all_items
 
 
@@ -10,7 +10,8 @@ from datetime import datetime
 from typing import Any
 
 from openpyxl import Workbook
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import DEFAULT_FONT, Alignment, Border, Font, NamedStyle, PatternFill, Side
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
@@ -24,6 +25,7 @@ from reportlab.platypus import (
     Table,
     TableStyle,
 )
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.models.erp_models import NalogHeader, Partner
@@ -35,65 +37,215 @@ from app.models.vehicle_models import Vozac, Vozilo
 
 logger = logging.getLogger(__name__)
 
+# Broj UID-ova po IN listi (MSSQL dopušta najviše 2100 parametara po upitu)
+_IN_CHUNK = 1000
+
 # ---------------------------------------------------------------------------
 # Registracija fontova s podrškom za hrvatske znakove (č, ć, ž, đ, š)
 # ---------------------------------------------------------------------------
-_FONTS_DIR = r"C:\Windows\Fonts"
-_fonts_registered = False
+# (ime obitelji, direktorij, {stil: datoteka}) – registrira se prvi izvor s regular fontom
+_FONT_SOURCES: list[tuple[str, str, dict[str, str]]] = [
+    (
+        "Arial",
+        os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+        {"": "arial.ttf", "-Bold": "arialbd.ttf", "-Italic": "ariali.ttf", "-BoldItalic": "arialbi.ttf"},
+    ),
+    (
+        "DejaVuSans",
+        "/usr/share/fonts/truetype/dejavu",
+        {"": "DejaVuSans.ttf", "-Bold": "DejaVuSans-Bold.ttf",
+         "-Italic": "DejaVuSans-Oblique.ttf", "-BoldItalic": "DejaVuSans-BoldOblique.ttf"},
+    ),
+]
+
+
+def _register_croatian_fonts() -> tuple[str, str, str]:
+    """
+    Registriraj TTF font s HR znakovima u ReportLab (Arial na Windowsima,
+    DejaVu Sans na Linuxu). Vraća (regular, bold, italic) imena fontova;
+    bez TTF-a ostaje ugrađena Helvetica (bez č/ć/đ).
+    """
+    for family, fonts_dir, files in _FONT_SOURCES:
+        if not os.path.exists(os.path.join(fonts_dir, files[""])):
+            continue
+        try:
+            # Stil koji nedostaje (npr. DejaVu Oblique) zamjenjuje regular
+            names: dict[str, str] = {}
+            for suffix, filename in files.items():
+                path = os.path.join(fonts_dir, filename)
+                if os.path.exists(path):
+                    pdfmetrics.registerFont(TTFont(family + suffix, path))
+                    names[suffix] = family + suffix
+                else:
+                    names[suffix] = names.get("-Bold" if suffix == "-BoldItalic" else "", family)
+            pdfmetrics.registerFontFamily(
+                family, normal=names[""], bold=names["-Bold"],
+                italic=names["-Italic"], boldItalic=names["-BoldItalic"],
+            )
+            return names[""], names["-Bold"], names["-Italic"]
+        except Exception as exc:
+            logger.warning("Nije moguće registrirati font %s: %s", family, exc)
+    logger.warning("TTF font s HR znakovima nije pronađen, PDF export koristi Helveticu")
+    return "Helvetica", "Helvetica-Bold", "Helvetica-Oblique"
+
+
+# Fontovi se registriraju jednom, pri importu modula
+_PDF_FONTS = _register_croatian_fonts()
+_FONT, _FONT_B, _FONT_I = _PDF_FONTS
+
+# ---------------------------------------------------------------------------
+# Stilovi exporta – nepromjenjivi, pa se grade jednom umjesto po exportu
+# ---------------------------------------------------------------------------
+_XLSX_HEADER_FONT = Font(bold=True, size=14)
+_XLSX_SUBHEADER_FONT = Font(bold=True, size=11)
+_XLSX_REGION_FONT = Font(bold=True, size=13, color="1F4E79")
+_XLSX_HEADER_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+_XLSX_HEADER_FONT_WHITE = Font(bold=True, color="FFFFFF")
+_XLSX_THIN_BORDER = Border(
+    left=Side(style="thin"),
+    right=Side(style="thin"),
+    top=Side(style="thin"),
+    bottom=Side(style="thin"),
+)
+_XLSX_CENTER = Alignment(horizontal="center")
+_XLSX_DATA_STYLE = "bordered"
+_XLSX_STOP_HEADERS = ("Utovar #", "Dostava #", "Partner", "Adresa", "Mjesto", "ETA", "Status")
+
+_PDF_PRIMARY = colors.HexColor("#1F4E79")
+_PDF_STOP_HEADERS = (
+    "Utovar\n#",
+    "Dostava\n#",
+    "Partner / Kupac",
+    "Adresa",
+    "Mjesto",
+    "Palete",
+    "ETA",
+    "Potpis",
+)
+_PDF_INFO_STYLE = TableStyle(
+    [
+        ("FONTNAME", (0, 0), (-1, -1), _FONT),
+        ("FONTNAME", (0, 0), (0, -1), _FONT_B),
+        ("FONTNAME", (2, 0), (2, -1), _FONT_B),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+        ("TOPPADDING", (0, 0), (-1, -1), 2),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("LINEBELOW", (0, -1), (-1, -1), 0.5, colors.HexColor("#CCCCCC")),
+    ]
+)
+_PDF_MASTER_HEADER_STYLE = TableStyle(
+    [
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ]
+)
+_PDF_STOPS_STYLE = TableStyle(
+    [
+        # Header
+        ("BACKGROUND", (0, 0), (-1, 0), _PDF_PRIMARY),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTNAME", (0, 0), (-1, 0), _FONT_B),
+        ("FONTSIZE", (0, 0), (-1, 0), 8),
+        ("ALIGN", (0, 0), (-1, 0), "CENTER"),
+        ("VALIGN", (0, 0), (-1, 0), "MIDDLE"),
+        # Data rows
+        ("FONTNAME", (0, 1), (-1, -1), _FONT),
+        ("FONTSIZE", (0, 1), (-1, -1), 9),
+        ("ALIGN", (0, 1), (1, -1), "CENTER"),  # Utovar# i Dostava# centrirano
+        ("ALIGN", (5, 1), (5, -1), "CENTER"),  # Palete centrirano
+        ("ALIGN", (6, 1), (6, -1), "CENTER"),  # ETA centrirano
+        ("VALIGN", (0, 1), (-1, -1), "MIDDLE"),
+        # Grid
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#999999")),
+        ("LINEBELOW", (0, 0), (-1, 0), 1.5, _PDF_PRIMARY),
+        # Padding
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 6),
+        ("TOPPADDING", (0, 0), (-1, 0), 6),
+        ("BOTTOMPADDING", (0, 1), (-1, -1), 5),
+        ("TOPPADDING", (0, 1), (-1, -1), 5),
+        ("LEFTPADDING", (0, 0), (-1, -1), 4),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 4),
+        # Alternating rows
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#F2F6FA")]),
+    ]
+)
+# Visine redova tablice stopova: leading ćelije (ReportLab default 12) × broj linija + padding
+_PDF_CELL_LEADING = 12
+_PDF_HEADER_PADDING = 12  # TOP/BOTTOMPADDING 6 + 6
+_PDF_ROW_PADDING = 10  # TOP/BOTTOMPADDING 5 + 5
+_PDF_NOTE_STYLE = ParagraphStyle(
+    "FooterNote",
+    fontName=_FONT_I,
+    fontSize=7,
+    textColor=colors.HexColor("#888888"),
+)
+
 
+def _pdf_partner_columns(partner: Partner) -> tuple[str, str, str]:
+    """Naziv, adresa i mjesto partnera za tablicu utovara (— gdje podatak nedostaje)."""
+    if partner.naziv:
+        name = partner.naziv
+    elif partner.ime and partner.prezime:
+        name = f"{partner.ime} {partner.prezime}"
+    else:
+        name = "—"
+    return (
+        name,
+        partner.adresa or "—",
+        partner.naziv_mjesta or partner.mjesto or "—",
+    )
 
-def _register_croatian_fonts() -> None:
-    """Registriraj Arial font (podržava HR znakove) u ReportLab."""
-    global _fonts_registered
-    if _fonts_registered:
-        return
 
-    font_map = {
-        "Arial": "arial.ttf",
-        "Arial-Bold": "arialbd.ttf",
-        "Arial-Italic": "ariali.ttf",
-        "Arial-BoldItalic": "arialbi.ttf",
-    }
+def _pdf_row_height(row: list[str], padding: int) -> int:
+    """Visina reda tablice – isto što bi Table izmjerio, bez mjerenja svake ćelije."""
+    lines = 1 + max(cell.count("\n") for cell in row)
+    return _PDF_CELL_LEADING * lines + padding
 
-    for name, filename in font_map.items():
-        path = os.path.join(_FONTS_DIR, filename)
-        if os.path.exists(path):
-            try:
-                pdfmetrics.registerFont(TTFont(name, path))
-            except Exception as exc:
-                logger.warning("Nije moguće registrirati font %s: %s", name, exc)
 
-    _fonts_registered = True
+def _pallets_str(count: int) -> str:
+    """Broj WMS paleta ili — ako ih nema."""
+    return str(count) if count > 0 else "—"
 
 
 class ExportService:
     """Servis za export ruta u PDF i Excel formate."""
 
-    def _get_nalog(self, db: Session, nalog_uid: str) -> Any:
+    def _get_nalozi(self, db: Session, stops) -> dict[str, Any]:
         """
-        Dohvati nalog header - prvo u rutiranju, pa u originalu.
+        Dohvati nalog headere svih stopova - prvo u rutiranju, pa u originalu.
         Nalozi su premješteni iz nalozi_header u nalozi_header_rutiranje
-        kada se stave u rutiranje.
+        kada se stave u rutiranje. Jedan IN upit po tablici umjesto dva db.get po stopu.
         """
-        nalog = db.get(NalogHeaderRutiranje, nalog_uid)
-        if not nalog:
-            nalog = db.get(NalogHeader, nalog_uid)
-        return nalog
-
-    def _get_route_regions(self, db: Session, stops, ) -> list[str]:
+        uids = list(dict.fromkeys(stop.nalog_uid for stop in stops if stop.nalog_uid))
+        nalozi: dict[str, Any] = {}
+        for model in (NalogHeaderRutiranje, NalogHeader):
+            missing = [uid for uid in uids if uid not in nalozi]
+            for i in range(0, len(missing), _IN_CHUNK):
+                for nalog in db.execute(
+                    select(model).where(model.nalog_prodaje_uid.in_(missing[i:i + _IN_CHUNK]))
+                ).scalars():
+                    nalozi[nalog.nalog_prodaje_uid] = nalog
+        return nalozi
+
+    def _get_partners(self, db: Session, nalozi: dict[str, Any]) -> dict[str, Partner]:
+        """Partneri naloga rute jednim IN upitom (umjesto db.get po stopu)."""
+        uids = list({nalog.partner_uid for nalog in nalozi.values() if nalog.partner_uid})
+        partners: dict[str, Partner] = {}
+        for i in range(0, len(uids), _IN_CHUNK):
+            for partner in db.execute(
+                select(Partner).where(Partner.partner_uid.in_(uids[i:i + _IN_CHUNK]))
+            ).scalars():
+                partners[partner.partner_uid] = partner
+        return partners
+
+    def _get_route_regions(self, db: Session, nalozi: dict[str, Any]) -> list[str]:
         """Dohvati nazive svih regija koje pokriva ruta."""
-        region_ids: set[int] = set()
-        for stop in stops:
-            nalog = self._get_nalog(db, stop.nalog_uid)
-            if nalog and nalog.regija_id:
-                region_ids.add(nalog.regija_id)
-
-        region_names: list[str] = []
-        for rid in sorted(region_ids):
-            regija = db.get(Regija, rid)
-            if regija:
-                region_names.append(regija.naziv)
-        return region_names
+        region_ids = {nalog.regija_id for nalog in nalozi.values() if nalog.regija_id}
+        if not region_ids:
+            return []
+        return list(db.execute(
+            select(Regija.naziv).where(Regija.id.in_(region_ids)).order_by(Regija.id)
+        ).scalars())
 
     def _get_pallet_counts(self, db: Session, stops) -> dict[str, int]:
         """Dohvati broj paleta (distinct SSCC) po nalogu iz mantis_sscc."""
@@ -101,24 +253,19 @@ class ExportService:
         if not nalog_uids:
             return {}
 
-        items = (
-            db.query(MantisSSCC)
-            .filter(MantisSSCC.nalog_prodaje_uid.in_(nalog_uids))
-            .all()
-        )
-
-        # Grupiraj po nalog_uid
-        counts: dict[str, int] = {}
-        grouped: dict[str, set[str]] = {}
-        for it in items:
-            uid = it.nalog_prodaje_uid
-            if uid not in grouped:
-                grouped[uid] = set()
-            if it.sscc:
-                grouped[uid].add(it.sscc)
-
-        for uid in nalog_uids:
-            counts[uid] = len(grouped.get(uid, set()))
+        # Baza broji distinct SSCC po nalogu umjesto učitavanja cijelih MantisSSCC redova
+        counts: dict[str, int] = dict.fromkeys(nalog_uids, 0)
+        for i in range(0, len(nalog_uids), _IN_CHUNK):
+            rows = db.execute(
+                select(MantisSSCC.nalog_prodaje_uid, func.count(func.distinct(MantisSSCC.sscc)))
+                .where(
+                    MantisSSCC.nalog_prodaje_uid.in_(nalog_uids[i:i + _IN_CHUNK]),
+                    MantisSSCC.sscc != "",
+                )
+                .group_by(MantisSSCC.nalog_prodaje_uid)
+            ).all()
+            for uid, count in rows:
+                counts[uid] = count
 
         return counts
 
@@ -144,124 +291,88 @@ class ExportService:
             .all()
         )
 
-        # Regije
-        region_names = self._get_route_regions(db, stops)
+        # Nalozi stopova i regije
+        nalozi = self._get_nalozi(db, stops)
+        region_names = self._get_route_regions(db, nalozi)
 
-        # Obrnut redoslijed za utovar (zadnji na dostavi = prvi na utovar)
-        stops_utovar = list(reversed(stops))
-
-        # Kreiraj workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = f"Ruta {ruta_id}"
-
-        # Stilovi
-        header_font = Font(bold=True, size=14)
-        subheader_font = Font(bold=True, size=11)
-        region_font = Font(bold=True, size=13, color="1F4E79")
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_font_white = Font(bold=True, color="FFFFFF")
-        thin_border = Border(
-            left=Side(style="thin"),
-            right=Side(style="thin"),
-            top=Side(style="thin"),
-            bottom=Side(style="thin"),
-        )
+        partners = self._get_partners(db, nalozi)
+
+        # Write-only workbook: redovi se streamaju u XML redom, bez DOM-a svih ćelija
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(f"Ruta {ruta_id}")
+        # Jedan named style za cijeli blok podataka umjesto stila po ćeliji
+        wb.add_named_style(NamedStyle(name=_XLSX_DATA_STYLE, font=DEFAULT_FONT, border=_XLSX_THIN_BORDER))
+
+        def styled(value: Any, **style: Any) -> WriteOnlyCell:
+            cell = WriteOnlyCell(ws, value=value)
+            for attr, val in style.items():
+                setattr(cell, attr, val)
+            return cell
+
+        # Širine kolona (u write-only modu moraju biti postavljene prije redova)
+        for col, width in zip("ABCDEFG", (10, 10, 30, 30, 20, 10, 15)):
+            ws.column_dimensions[col].width = width
 
         # Naslov
-        ws["A1"] = f"Ruta #{ruta_id}"
-        ws["A1"].font = header_font
-        ws.merge_cells("A1:G1")
+        ws.append([styled(f"Ruta #{ruta_id}", font=_XLSX_HEADER_FONT)])
+        ws.merged_cells.add("A1:G1")
+        ws.append([])
 
         # Informacije o ruti
-        current_row = 3
-        ws[f"A{current_row}"] = "Datum:"
-        ws[f"B{current_row}"] = str(ruta.datum) if ruta.datum else "—"
-        current_row += 1
+        info_rows: list[tuple[str, str]] = [("Datum:", str(ruta.datum) if ruta.datum else "—")]
         if ruta.raspored:
-            ws[f"A{current_row}"] = "Raspored:"
-            ws[f"B{current_row}"] = str(ruta.raspored)
-            current_row += 1
-        ws[f"A{current_row}"] = "Status:"
-        ws[f"B{current_row}"] = ruta.status or "—"
-        current_row += 1
-        ws[f"A{current_row}"] = "Vozilo:"
-        ws[f"B{current_row}"] = vozilo.oznaka if vozilo else "—"
-        current_row += 1
-        ws[f"A{current_row}"] = "Vozač:"
-        ws[f"B{current_row}"] = f"{vozac.ime} {vozac.prezime}" if vozac else "—"
-        current_row += 1
-        ws[f"A{current_row}"] = "Udaljenost:"
-        ws[f"B{current_row}"] = f"{float(ruta.distance_km):.1f} km" if ruta.distance_km else "—"
-        current_row += 1
-        ws[f"A{current_row}"] = "Trajanje:"
-        ws[f"B{current_row}"] = f"{ruta.duration_min} min" if ruta.duration_min else "—"
-        current_row += 1
-        ws[f"A{current_row}"] = "Broj stopova:"
-        ws[f"B{current_row}"] = str(len(stops))
-
-        for row_idx in range(3, current_row + 1):
-            ws[f"A{row_idx}"].font = subheader_font
+            info_rows.append(("Raspored:", str(ruta.raspored)))
+        info_rows += [
+            ("Status:", ruta.status or "—"),
+            ("Vozilo:", vozilo.oznaka if vozilo else "—"),
+            ("Vozač:", f"{vozac.ime} {vozac.prezime}" if vozac else "—"),
+            ("Udaljenost:", f"{float(ruta.distance_km):.1f} km" if ruta.distance_km else "—"),
+            ("Trajanje:", f"{ruta.duration_min} min" if ruta.duration_min else "—"),
+            ("Broj stopova:", str(len(stops))),
+        ]
+        for label, value in info_rows:
+            ws.append([styled(label, font=_XLSX_SUBHEADER_FONT), value])
+        current_row = 2 + len(info_rows)
 
         # Regije
-        current_row += 2
+        ws.append([])
+        current_row += 1
         if region_names:
-            ws[f"A{current_row}"] = f"Regija: {', '.join(region_names)}"
-            ws[f"A{current_row}"].font = region_font
-            ws.merge_cells(f"A{current_row}:G{current_row}")
+            ws.append([styled(f"Regija: {', '.join(region_names)}", font=_XLSX_REGION_FONT)])
             current_row += 1
+            ws.merged_cells.add(f"A{current_row}:G{current_row}")
 
         # Tablica stopova - Lista utovara
-        current_row += 1
-        ws[f"A{current_row}"] = "Lista utovara"
-        ws[f"A{current_row}"].font = header_font
-        ws.merge_cells(f"A{current_row}:G{current_row}")
+        ws.append([])
+        ws.append([styled("Lista utovara", font=_XLSX_HEADER_FONT)])
+        current_row += 2
+        ws.merged_cells.add(f"A{current_row}:G{current_row}")
 
         # Header tablice
-        current_row += 2
-        header_row = current_row
-        headers = ["Utovar #", "Dostava #", "Partner", "Adresa", "Mjesto", "ETA", "Status"]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=header_row, column=col, value=header)
-            cell.font = header_font_white
-            cell.fill = header_fill
-            cell.border = thin_border
-            cell.alignment = Alignment(horizontal="center")
+        ws.append([])
+        ws.append([
+            styled(
+                header, font=_XLSX_HEADER_FONT_WHITE, fill=_XLSX_HEADER_FILL,
+                border=_XLSX_THIN_BORDER, alignment=_XLSX_CENTER,
+            )
+            for header in _XLSX_STOP_HEADERS
+        ])
 
         # Podaci stopova u obrnutom redoslijedu za utovar
-        for i, stop in enumerate(stops_utovar):
-            row = header_row + 1 + i
-            nalog = self._get_nalog(db, stop.nalog_uid)
-            partner = None
-            if nalog and nalog.partner_uid:
-                partner = db.get(Partner, nalog.partner_uid)
-
-            ws.cell(row=row, column=1, value=i + 1).border = thin_border
-            ws.cell(row=row, column=2, value=stop.redoslijed).border = thin_border
-            ws.cell(
-                row=row, column=3, value=partner.naziv if partner else "—"
-            ).border = thin_border
-            ws.cell(
-                row=row, column=4, value=partner.adresa if partner else "—"
-            ).border = thin_border
-            ws.cell(
-                row=row, column=5, value=partner.naziv_mjesta or (partner.mjesto if partner else "—")
-            ).border = thin_border
-            ws.cell(
-                row=row,
-                column=6,
-                value=stop.eta.strftime("%H:%M") if stop.eta else "—",
-            ).border = thin_border
-            ws.cell(row=row, column=7, value=stop.status or "—").border = thin_border
-
-        # Širine kolona
-        ws.column_dimensions["A"].width = 10
-        ws.column_dimensions["B"].width = 10
-        ws.column_dimensions["C"].width = 30
-        ws.column_dimensions["D"].width = 30
-        ws.column_dimensions["E"].width = 20
-        ws.column_dimensions["F"].width = 10
-        ws.column_dimensions["G"].width = 15
+        # Obrnut redoslijed za utovar (zadnji na dostavi = prvi na utovar)
+        for i, stop in enumerate(reversed(stops)):
+            nalog = nalozi.get(stop.nalog_uid)
+            partner = partners.get(nalog.partner_uid) if nalog and nalog.partner_uid else None
+            values = (
+                i + 1,
+                stop.redoslijed,
+                partner.naziv if partner else "—",
+                partner.adresa if partner else "—",
+                (partner.naziv_mjesta or partner.mjesto) if partner else "—",
+                stop.eta.strftime("%H:%M") if stop.eta else "—",
+                stop.status or "—",
+            )
+            ws.append([styled(value, style=_XLSX_DATA_STYLE) for value in values])
 
         # Spremi u bytes
         output = io.BytesIO()
@@ -276,11 +387,7 @@ class ExportService:
         Returns:
             bytes sadržaj PDF datoteke
         """
-        _register_croatian_fonts()
-
-        FONT = "Arial"
-        FONT_B = "Arial-Bold"
-        FONT_I = "Arial-Italic"
+        FONT, FONT_B = _FONT, _FONT_B
 
         ruta = db.get(Ruta, ruta_id)
         if not ruta:
@@ -297,15 +404,15 @@ class ExportService:
             .all()
         )
 
-        # Regije
-        region_names = self._get_route_regions(db, stops)
+        # Nalozi stopova i regije
+        nalozi = self._get_nalozi(db, stops)
+        region_names = self._get_route_regions(db, nalozi)
 
         # SSCC / pallet counts iz WMS-a
         pallet_counts = self._get_pallet_counts(db, stops)
         total_route_pallets = sum(pallet_counts.values())
 
-        # Obrnut redoslijed za utovar (zadnji na dostavi = prvi na utovar)
-        stops_utovar = list(reversed(stops))
+        partners = self._get_partners(db, nalozi)
 
         # ---- Landscape A4 ----
         page_w, page_h = landscape(A4)  # 842 x 595
@@ -349,7 +456,7 @@ class ExportService:
             header_left_styles.extend([
                 ("FONTNAME", (0, 1), (0, 1), FONT_B),
                 ("FONTSIZE", (0, 1), (0, 1), 12),
-                ("TEXTCOLOR", (0, 1), (0, 1), colors.HexColor("#1F4E79")),
+                ("TEXTCOLOR", (0, 1), (0, 1), _PDF_PRIMARY),
                 ("FONTNAME", (0, 2), (0, 2), FONT),
                 ("FONTSIZE", (0, 2), (0, 2), 8),
                 ("TEXTCOLOR", (0, 2), (0, 2), colors.grey),
@@ -370,7 +477,7 @@ class ExportService:
         dist_str = f"{float(ruta.distance_km):.1f} km" if ruta.distance_km else "—"
         dur_str = f"{ruta.duration_min} min" if ruta.duration_min else "—"
 
-        paleta_str = str(total_route_pallets) if total_route_pallets > 0 else "—"
+        paleta_str = _pallets_str(total_route_pallets)
         info_rows = [
             ["Datum:", datum_str, "Vozilo:", vozilo_str],
             ["Raspored:", raspored_str, "Vozač:", vozac_str],
@@ -379,90 +486,40 @@ class ExportService:
         ]
         col_w = usable_width * 0.50 / 4
         info_right = Table(info_rows, colWidths=[col_w * 0.9, col_w * 1.1, col_w * 0.9, col_w * 1.1])
-        info_right.setStyle(
-            TableStyle(
-                [
-                    ("FONTNAME", (0, 0), (-1, -1), FONT),
-                    ("FONTNAME", (0, 0), (0, -1), FONT_B),
-                    ("FONTNAME", (2, 0), (2, -1), FONT_B),
-                    ("FONTSIZE", (0, 0), (-1, -1), 8),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
-                    ("TOPPADDING", (0, 0), (-1, -1), 2),
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                    ("LINEBELOW", (0, -1), (-1, -1), 0.5, colors.HexColor("#CCCCCC")),
-                ]
-            )
-        )
+        info_right.setStyle(_PDF_INFO_STYLE)
 
         # Spoji u jedan red
         master_header = Table(
             [[header_left, info_right]],
             colWidths=[usable_width * 0.50, usable_width * 0.50],
         )
-        master_header.setStyle(
-            TableStyle(
-                [
-                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ]
-            )
-        )
+        master_header.setStyle(_PDF_MASTER_HEADER_STYLE)
         elements.append(master_header)
         elements.append(Spacer(1, 6))
 
         # ========== TABLICA UTOVARA ==========
 
         # Header
-        table_data = [
+        table_data = [list(_PDF_STOP_HEADERS)]
+
+        # Partner kolone računaju se jednom po partneru, ne po stopu
+        partner_cols = {uid: _pdf_partner_columns(p) for uid, p in partners.items()}
+        partner_uid_by_nalog = {uid: n.partner_uid for uid, n in nalozi.items()}
+        no_partner = ("—", "—", "—")
+        eta_fmt = "%H:%M"
+
+        table_data.extend([
             [
-                "Utovar\n#",
-                "Dostava\n#",
-                "Partner / Kupac",
-                "Adresa",
-                "Mjesto",
-                "Palete",
-                "ETA",
-                "Potpis",
+                str(i + 1),
+                str(stop.redoslijed),
+                *partner_cols.get(partner_uid_by_nalog.get(stop.nalog_uid), no_partner),
+                _pallets_str(pallet_counts.get(stop.nalog_uid, 0)),
+                stop.eta.strftime(eta_fmt) if stop.eta else "—",
+                "",  # potpis kolona — prazno za ručni potpis
             ]
-        ]
-
-        for i, stop in enumerate(stops_utovar):
-            nalog = self._get_nalog(db, stop.nalog_uid)
-            partner = None
-            if nalog and nalog.partner_uid:
-                partner = db.get(Partner, nalog.partner_uid)
-
-            # Partner naziv
-            partner_name = "—"
-            if partner:
-                if partner.naziv:
-                    partner_name = partner.naziv
-                elif partner.ime and partner.prezime:
-                    partner_name = f"{partner.ime} {partner.prezime}"
-
-            # Adresa
-            partner_adresa = partner.adresa if partner and partner.adresa else "—"
-
-            # Mjesto
-            partner_mjesto = "—"
-            if partner:
-                partner_mjesto = partner.naziv_mjesta or partner.mjesto or "—"
-
-            # Palete iz WMS-a
-            pc = pallet_counts.get(stop.nalog_uid, 0)
-            palete_str = str(pc) if pc > 0 else "—"
-
-            table_data.append(
-                [
-                    str(i + 1),
-                    str(stop.redoslijed),
-                    partner_name,
-                    partner_adresa,
-                    partner_mjesto,
-                    palete_str,
-                    stop.eta.strftime("%H:%M") if stop.eta else "—",
-                    "",  # potpis kolona — prazno za ručni potpis
-                ]
-            )
+            # Obrnut redoslijed za utovar (zadnji na dostavi = prvi na utovar)
+            for i, stop in enumerate(reversed(stops))
+        ])
 
         # Širine kolona za landscape (ukupno ~ usable_width)
         col_widths = [
@@ -476,54 +533,21 @@ class ExportService:
             3.5 * cm,   # Potpis
         ]
 
-        stops_table = Table(table_data, colWidths=col_widths, repeatRows=1)
-        stops_table.setStyle(
-            TableStyle(
-                [
-                    # Header
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1F4E79")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                    ("FONTNAME", (0, 0), (-1, 0), FONT_B),
-                    ("FONTSIZE", (0, 0), (-1, 0), 8),
-                    ("ALIGN", (0, 0), (-1, 0), "CENTER"),
-                    ("VALIGN", (0, 0), (-1, 0), "MIDDLE"),
-                    # Data rows
-                    ("FONTNAME", (0, 1), (-1, -1), FONT),
-                    ("FONTSIZE", (0, 1), (-1, -1), 9),
-                    ("ALIGN", (0, 1), (1, -1), "CENTER"),  # Utovar# i Dostava# centrirano
-                    ("ALIGN", (5, 1), (5, -1), "CENTER"),  # Palete centrirano
-                    ("ALIGN", (6, 1), (6, -1), "CENTER"),  # ETA centrirano
-                    ("VALIGN", (0, 1), (-1, -1), "MIDDLE"),
-                    # Grid
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#999999")),
-                    ("LINEBELOW", (0, 0), (-1, 0), 1.5, colors.HexColor("#1F4E79")),
-                    # Padding
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 6),
-                    ("TOPPADDING", (0, 0), (-1, 0), 6),
-                    ("BOTTOMPADDING", (0, 1), (-1, -1), 5),
-                    ("TOPPADDING", (0, 1), (-1, -1), 5),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 4),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 4),
-                    # Alternating rows
-                    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#F2F6FA")]),
-                ]
-            )
-        )
+        # Fiksni oblik tablice: visine redova zadane unaprijed pa Platypus ne mjeri ćelije
+        row_heights = [_pdf_row_height(table_data[0], _PDF_HEADER_PADDING)]
+        row_heights += [_pdf_row_height(row, _PDF_ROW_PADDING) for row in table_data[1:]]
+
+        stops_table = Table(table_data, colWidths=col_widths, rowHeights=row_heights, repeatRows=1)
+        stops_table.setStyle(_PDF_STOPS_STYLE)
         elements.append(stops_table)
 
         # ========== FOOTER NOTE ==========
         elements.append(Spacer(1, 8))
-        note_style = ParagraphStyle(
-            "FooterNote",
-            fontName=FONT_I,
-            fontSize=7,
-            textColor=colors.HexColor("#888888"),
-        )
         elements.append(
             Paragraph(
                 "Redoslijed utovara: zadnja dostava se utovaruje prva. "
                 "Kolona 'Potpis' služi za potvrdu preuzimanja robe.",
-                note_style,
+                _PDF_NOTE_STYLE,
             )
         )
 
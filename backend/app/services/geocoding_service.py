@@ -19,10 +19,17 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings as app_settings
+from app.models.config_models import Setting
 from app.models.sync_models import GeocodingCache
+from app.utils.cache import TTLCache
+from app.utils.google_maps import get_gmaps_client
 
 logger = logging.getLogger(__name__)
 
+# In-process cache uspješnih rezultata (normalizirana adresa -> (lat, lng, adresa)).
+# Ispred je DB cache-a; rezultati su čista funkcija adrese pa nema invalidacije.
+_memory_cache: TTLCache[str, tuple[Decimal, Decimal, str | None]] = TTLCache(maxsize=50_000, ttl=3600)
+
 
 # =============================================================================
 # Čišćenje / normalizacija adresa za bolje geocoding rezultate
@@ -129,11 +136,8 @@ class GeocodingResult(NamedTuple):
 
 def _get_provider(db: Session) -> str:
     """Dohvati aktivni geocoding provider iz DB settings."""
-    from app.models.config_models import Setting
-    from sqlalchemy import func as sqlfunc
-    row = db.execute(
-        select(Setting).where(sqlfunc.upper(Setting.key) == "GEOCODING_PROVIDER")
-    ).scalar_one_or_none()
+    # Ključ je PK; collation baze je case-insensitive pa pokriva i 'GEOCODING_PROVIDER'
+    row = db.get(Setting, "geocoding_provider")
     if row and row.value:
         return row.value.strip().lower()
     # Default: ORS ako ima ključ, inače TomTom, google, nominatim
@@ -150,9 +154,12 @@ class GeocodingService:
     """Servis za geocoding adresa s DB cache-om i više providera."""
 
     @staticmethod
-    def _hash_address(address: str) -> str:
-        normalized = address.lower().strip()
-        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    def _normalize_address(address: str) -> str:
+        return address.lower().strip()
+
+    @classmethod
+    def _hash_address(cls, address: str) -> bytes:
+        return hashlib.sha256(cls._normalize_address(address).encode("utf-8")).digest()
 
     def _get_from_cache(self, db: Session, address: str) -> GeocodingCache | None:
         address_hash = self._hash_address(address)
@@ -172,6 +179,10 @@ class GeocodingService:
         db.refresh(cache_entry)
         return cache_entry
 
+    def invalidate(self, address: str) -> None:
+        """Izbaci adresu iz in-process cache-a (nakon ručne izmjene ili brisanja DB zapisa)."""
+        _memory_cache.pop(self._normalize_address(address))
+
     # -------------------------------------------------------------------------
     # Provider implementations
     # -------------------------------------------------------------------------
@@ -242,8 +253,7 @@ class GeocodingService:
             logger.warning("Google Maps API ključ nije konfiguriran")
             return GeocodingResult(None, None, None, False)
         try:
-            import googlemaps
-            gmaps = googlemaps.Client(key=api_key)
+            gmaps = get_gmaps_client()
             results = gmaps.geocode(address, region="hr", language="hr")
             if results:
                 location = results[0]["geometry"]["location"]
@@ -317,9 +327,15 @@ class GeocodingService:
         if not address or not address.strip():
             return GeocodingResult(None, None, None, False)
 
-        # 1. Cache - ali samo ako ima koordinate (NULL cache preskaćemo za retry)
+        # 1. Cache - prvo memorija, zatim DB (NULL cache preskaćemo za retry)
+        memory_key = self._normalize_address(address)
+        hit = _memory_cache.get(memory_key)
+        if hit is not None:
+            return GeocodingResult(lat=hit[0], lng=hit[1], formatted_address=hit[2], from_cache=True)
+
         cached = self._get_from_cache(db, address)
         if cached and cached.lat is not None and cached.lng is not None:
+            _memory_cache.set(memory_key, (cached.lat, cached.lng, cached.address))
             return GeocodingResult(lat=cached.lat, lng=cached.lng, formatted_address=cached.address, from_cache=True)
 
         # 2. Provider i varijante adrese
@@ -355,7 +371,8 @@ class GeocodingService:
             if cached and cached.lat is None:
                 db.delete(cached)
                 db.flush()
-            self._save_to_cache(db, address, best_result.lat, best_result.lng, provider)
+            entry = self._save_to_cache(db, address, best_result.lat, best_result.lng, provider)
+            _memory_cache.set(memory_key, (entry.lat, entry.lng, entry.address))
             return best_result
         else:
             # Spremi NULL samo ako ne postoji zapis (da ne dupliciramo)
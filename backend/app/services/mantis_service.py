@@ -7,10 +7,11 @@ podatke u lokalnu tablicu mantis_sscc.
 from __future__ import annotations
 
 import logging
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Any
 
-from sqlalchemy import delete, select, text, func as sa_func
+from sqlalchemy import delete, select, text, update, func as sa_func
 from sqlalchemy.orm import Session
 
 from app.models.erp_models import NalogHeader
@@ -23,6 +24,15 @@ logger = logging.getLogger(__name__)
 # Koliko minuta stari podaci su "svježi" pa ih ne treba ponovo dohvaćati
 CACHE_FRESHNESS_MINUTES = 5
 
+# Polja koja određuju je li se WMS redak promijenio (sve osim synced_at)
+_WMS_FIELDS = (
+    "order_code", "nalog_prodaje_uid", "order_shipment_code", "product_id", "product",
+    "quantity", "item_status_id", "item_status_code", "item_status_code2", "item_status",
+    "zone", "zone_id", "location", "sscc", "psscc", "order_shipment_status_id",
+    "order_shipment_status_code", "order_shipment_status", "customer", "receiver",
+    "memo", "assigned_user", "agency", "city",
+)
+
 
 class MantisService:
     """Servis za komunikaciju s Mantis WMS-om i upravljanje SSCC podacima."""
@@ -79,6 +89,37 @@ class MantisService:
 
         return uid_to_code
 
+    @staticmethod
+    def _map_wms_row(row: dict, nalog_uid: str | None, now: datetime) -> dict[str, Any]:
+        """Mapiraj redak iz v_CST_OrderProgress na dict za MantisSSCC."""
+        return {
+            "order_code": row.get("OrderCode", ""),
+            "nalog_prodaje_uid": nalog_uid,
+            "order_shipment_code": row.get("OrderShipmentCode"),
+            "product_id": row.get("ProductID"),
+            "product": row.get("Product"),
+            "quantity": row.get("Quantity"),
+            "item_status_id": row.get("ItemStatusID"),
+            "item_status_code": row.get("ItemStatusCode"),
+            "item_status_code2": row.get("ItemStatusCode2"),
+            "item_status": row.get("ItemStatus"),
+            "zone": row.get("Zone"),
+            "zone_id": row.get("ZoneID"),
+            "location": row.get("Location"),
+            "sscc": row.get("SSCC"),
+            "psscc": row.get("PSSCC"),
+            "order_shipment_status_id": row.get("OrderShipmentStatusID"),
+            "order_shipment_status_code": row.get("OrderShipmentStatusCode"),
+            "order_shipment_status": row.get("OrderShipmentStatus"),
+            "customer": row.get("Customer"),
+            "receiver": row.get("Receiver"),
+            "memo": row.get("Memo"),
+            "assigned_user": row.get("AssignedUser"),
+            "agency": row.get("Agency"),
+            "city": row.get("City"),
+            "synced_at": now,
+        }
+
     # ------------------------------------------------------------------
     # Sync iz WMS-a
     # ------------------------------------------------------------------
@@ -139,51 +180,56 @@ class MantisService:
 
         logger.info("WMS vratio %d redaka za %d naloga", len(all_wms_rows), len(order_codes))
 
-        # Obriši stare cache zapise za ove OrderCode-ove
-        if order_codes:
-            db.execute(
-                delete(MantisSSCC).where(MantisSSCC.order_code.in_(order_codes))
-            )
-
-        # Insertiraj nove
+        # Mapiraj WMS retke i grupiraj po OrderCode
+        new_by_code: dict[str, list[dict[str, Any]]] = {code: [] for code in order_codes}
         for row in all_wms_rows:
             order_code = row.get("OrderCode", "")
-            nalog_uid = code_to_uid.get(order_code)
-            sscc_val = row.get("SSCC")
-
-            sscc_record = MantisSSCC(
-                order_code=order_code,
-                nalog_prodaje_uid=nalog_uid,
-                order_shipment_code=row.get("OrderShipmentCode"),
-                product_id=row.get("ProductID"),
-                product=row.get("Product"),
-                quantity=row.get("Quantity"),
-                item_status_id=row.get("ItemStatusID"),
-                item_status_code=row.get("ItemStatusCode"),
-                item_status_code2=row.get("ItemStatusCode2"),
-                item_status=row.get("ItemStatus"),
-                zone=row.get("Zone"),
-                zone_id=row.get("ZoneID"),
-                location=row.get("Location"),
-                sscc=sscc_val,
-                psscc=row.get("PSSCC"),
-                order_shipment_status_id=row.get("OrderShipmentStatusID"),
-                order_shipment_status_code=row.get("OrderShipmentStatusCode"),
-                order_shipment_status=row.get("OrderShipmentStatus"),
-                customer=row.get("Customer"),
-                receiver=row.get("Receiver"),
-                memo=row.get("Memo"),
-                assigned_user=row.get("AssignedUser"),
-                agency=row.get("Agency"),
-                city=row.get("City"),
-                synced_at=now,
-            )
-            db.add(sscc_record)
+            mapped = self._map_wms_row(row, code_to_uid.get(order_code), now)
+            new_by_code.setdefault(order_code, []).append(mapped)
             total_items += 1
-            if sscc_val:
-                total_pallets_set.add(f"{order_code}:{sscc_val}")
+            if mapped["sscc"]:
+                total_pallets_set.add(f"{order_code}:{mapped['sscc']}")
+
+        # Delta: usporedi s postojećim cacheom i prepiši samo promijenjene naloge
+        old_by_code: dict[str, Counter] = {code: Counter() for code in order_codes}
+        existing_rows = db.execute(
+            select(*(getattr(MantisSSCC, f) for f in _WMS_FIELDS))
+            .where(MantisSSCC.order_code.in_(order_codes))
+        ).all()
+        for r in existing_rows:
+            old_by_code[r.order_code][tuple(r)] += 1
+
+        changed_codes: list[str] = []
+        unchanged_codes: list[str] = []
+        for code, rows in new_by_code.items():
+            new_fp = Counter(tuple(r[f] for f in _WMS_FIELDS) for r in rows)
+            if new_fp == old_by_code.get(code, Counter()):
+                unchanged_codes.append(code)
+            else:
+                changed_codes.append(code)
+
+        if changed_codes:
+            db.execute(
+                delete(MantisSSCC).where(MantisSSCC.order_code.in_(changed_codes))
+            )
+            # Core executemany umjesto ORM instanci — cache redove nitko ne čita kao objekte.
+            # Prazna lista bi postala INSERT ... DEFAULT VALUES (nalog nestao iz WMS-a)
+            new_rows = [mapped for code in changed_codes for mapped in new_by_code[code]]
+            if new_rows:
+                db.execute(MantisSSCC.__table__.insert(), new_rows)
+        if unchanged_codes:
+            # Nepromijenjeni nalozi — samo osvježi synced_at (svježina cachea)
+            db.execute(
+                update(MantisSSCC)
+                .where(MantisSSCC.order_code.in_(unchanged_codes))
+                .values(synced_at=now)
+            )
 
         db.commit()
+        logger.info(
+            "WMS cache: %d naloga promijenjeno, %d nepromijenjeno",
+            len(changed_codes), len(unchanged_codes),
+        )
 
         stats = {
             "synced_orders": len(order_codes),
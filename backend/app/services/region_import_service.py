@@ -86,7 +86,7 @@ def _parse_csv(content: bytes) -> list[dict[str, str]]:
 
 def _parse_xlsx(content: bytes) -> list[dict[str, str]]:
     """Parsiraj XLSX; prvi sheet, prvi red = header."""
-    wb = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    wb = load_workbook(io.BytesIO(content), read_only=True, data_only=True, keep_links=False)
     ws = wb.active
     if not ws:
         raise ValueError("Excel datoteka nema aktivni sheet.")
@@ -6,7 +6,6 @@ Koristi konfigurabilan geocoding/distance provider (ORS/Google/Nominatim/OSRM).
 """
 from __future__ import annotations
 
-import json
 import logging
 from datetime import date, datetime, timedelta
 from decimal import Decimal
@@ -14,12 +13,12 @@ from typing import Any
 
 import requests
 
-from sqlalchemy import func, select
+from sqlalchemy import Float, cast, delete, func, select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings as app_settings
 from app.models.config_models import Setting
-from app.models.erp_models import NalogHeader, NalogDetail, Partner, Skladiste, Artikl
+from app.models.erp_models import NalogHeader, NalogDetail, Partner, RoutingStop, Skladiste, Artikl
 from app.models.routing_models import Ruta, RutaPolyline, RutaStop
 from app.models.routing_order_models import (
     NalogDetailRutiranje,
@@ -27,6 +26,7 @@ from app.models.routing_order_models import (
     NalogHeaderRutiranje,
 )
 from app.models.vehicle_models import Vozilo
+from app.schemas.routing import RouteStopFast
 from app.services.distance_service import distance_service, _get_provider as _get_distance_provider
 from app.services.geocoding_service import geocoding_service
 from app.services.ortools_optimizer import (
@@ -121,7 +121,10 @@ class RoutingService:
         partner = db.get(Partner, nalog.partner_uid)
         if not partner:
             return None
+        return self._geocode_partner_address(db, partner)
 
+    def _geocode_partner_address(self, db: Session, partner) -> tuple[float, float] | None:
+        """Geocodiraj adresu partnera. Radi s Partner i RoutingStop (v_routing_stops)."""
         address_parts = []
         if partner.adresa:
             address_parts.append(partner.adresa)
@@ -147,36 +150,60 @@ class RoutingService:
 
     def _calculate_demand(self, db: Session, nalog_uid: str, from_rutiranje: bool = False) -> tuple[float, float]:
         """Izračunaj ukupnu masu (kg) i volumen (m³) za nalog. Provjerava i rutiranje tablicu."""
-        DetailModel = NalogDetailRutiranje if from_rutiranje else NalogDetail
-        details = db.execute(
-            select(DetailModel).where(DetailModel.nalog_prodaje_uid == nalog_uid)
-        ).scalars().all()
+        def _rows(DetailModel):
+            # Jedan upit s joinom na artikl (samo masa/volumen) umjesto SELECT-a po stavci;
+            # CAST u FLOAT pa driver vraća float, bez Decimal objekta po vrijednosti
+            return db.execute(
+                select(
+                    cast(DetailModel.kolicina, Float),
+                    cast(Artikl.masa, Float),
+                    cast(Artikl.volumen, Float),
+                )
+                .outerjoin(Artikl, Artikl.artikl == DetailModel.artikl)
+                .where(DetailModel.nalog_prodaje_uid == nalog_uid)
+            ).all()
+
+        rows = _rows(NalogDetailRutiranje if from_rutiranje else NalogDetail)
         # Ako nema rezultata i nismo gledali rutiranje, probaj rutiranje
-        if not details and not from_rutiranje:
-            details = db.execute(
-                select(NalogDetailRutiranje).where(NalogDetailRutiranje.nalog_prodaje_uid == nalog_uid)
-            ).scalars().all()
+        if not rows and not from_rutiranje:
+            rows = _rows(NalogDetailRutiranje)
 
         total_kg = 0.0
         total_m3 = 0.0
 
-        for d in details:
-            qty = float(d.kolicina or 0)
-            if qty <= 0:
+        for qty, masa, volumen in rows:
+            if not qty or qty <= 0:
                 continue
-            # Pronađi artikl za masu/volumen
-            if d.artikl:
-                artikl = db.execute(
-                    select(Artikl).where(Artikl.artikl == d.artikl)
-                ).scalar_one_or_none()
-                if artikl:
-                    masa = float(artikl.masa or 0)
-                    volumen = float(artikl.volumen or 0)
-                    total_kg += masa * qty
-                    total_m3 += (volumen / 1_000_000) * qty  # mm³ -> m³
+            total_kg += (masa or 0.0) * qty
+            total_m3 += ((volumen or 0.0) / 1_000_000) * qty  # mm³ -> m³
 
         return (total_kg, total_m3)
 
+    def _geocode_routing_stop(self, db: Session, row: RoutingStop) -> dict[str, Any]:
+        """Preview rezultat za nalog iz v_routing_stops."""
+        location = self._geocode_partner_address(db, row)
+        # Isti izračun kao create_route – preview kapacitet mora odgovarati ruti
+        demand_kg, demand_m3 = self._calculate_demand(db, row.nalog_prodaje_uid)
+
+        kupac = ""
+        if row.partner_naziv:
+            kupac = row.partner_naziv
+            if row.partner_ime and row.partner_prezime:
+                kupac += f" => {row.partner_ime} {row.partner_prezime}"
+        elif row.partner_ime and row.partner_prezime:
+            kupac = f"{row.partner_ime} {row.partner_prezime}"
+
+        return {
+            "nalog_uid": row.nalog_prodaje_uid,
+            "lat": location[0] if location else None,
+            "lng": location[1] if location else None,
+            "address": f"{row.adresa or ''}, {row.naziv_mjesta or ''}",
+            "kupac": kupac,
+            "demand_kg": round(demand_kg, 2),
+            "demand_m3": round(demand_m3, 4),
+            "nalog_prodaje": str(row.broj) if row.broj else row.nalog_prodaje_uid[:15],
+        }
+
     def geocode_orders(
         self, db: Session, nalog_uids: list[str]
     ) -> list[dict[str, Any]]:
@@ -188,10 +215,22 @@ class RoutingService:
         results = []
         depot = self._get_depot_location(db)
 
+        # Originali s partnerom: jedan upit na v_routing_stops umjesto header + partner + stavke po nalogu
+        stop_rows = {
+            r.nalog_prodaje_uid: r
+            for r in db.execute(
+                select(RoutingStop).where(RoutingStop.nalog_prodaje_uid.in_(nalog_uids))
+            ).scalars()
+        } if nalog_uids else {}
+
         for uid in nalog_uids:
             # Traži u rutiranju prvo, pa u originalu
             nalog = db.get(NalogHeaderRutiranje, uid)
             from_rutiranje = nalog is not None
+            stop_row = stop_rows.get(uid) if not from_rutiranje else None
+            if stop_row is not None:
+                results.append(self._geocode_routing_stop(db, stop_row))
+                continue
             if not nalog:
                 nalog = db.get(NalogHeader, uid)
             if not nalog:
@@ -291,6 +330,7 @@ class RoutingService:
 
         # Fallback: pojedinačni pozivi (sporije, ali radi)
         logger.warning("Nearest Neighbor: OSRM Table API nedostupan, koristim pojedinačne pozive")
+        distance_service.preload_cache(db, locations)
         current_location = depot
         unvisited = stops.copy()
         ordered = []
@@ -376,28 +416,24 @@ class RoutingService:
 
         # Pokušaj brzi OSRM/TomTom Table API (1 poziv za cijelu matricu)
         locs_for_matrix = [(loc.lat, loc.lng) for loc in locations]
+        # Cache-irani parovi u memoriju jednim upitom (fallback i izračun udaljenosti nakon optimizacije)
+        distance_service.preload_cache(db, locs_for_matrix)
         fast_result = distance_service.get_distance_matrix_fast(locs_for_matrix, db=db)
         if fast_result:
             distance_matrix, duration_matrix = fast_result
             logger.info("OR-Tools: koristim brzi OSRM Table API (%dx%d)", n, n)
         else:
-            # Fallback: pojedinačni pozivi
+            # Fallback: par po par (cache + paralelni provider pozivi); brzi put je već pokušan
             logger.warning("OR-Tools: OSRM Table API nedostupan, koristim pojedinačne pozive")
-            for i in range(n):
-                dist_row: list[int] = []
-                dur_row: list[int] = []
-                for j in range(n):
-                    if i == j:
-                        dist_row.append(0)
-                        dur_row.append(0)
-                    else:
-                        result = distance_service.get_distance(
-                            db, locations[i].lat, locations[i].lng, locations[j].lat, locations[j].lng,
-                        )
-                        dist_row.append(result.distance_m or 10000)
-                        dur_row.append(result.duration_s or 600)
-                distance_matrix.append(dist_row)
-                duration_matrix.append(dur_row)
+            matrix = distance_service.get_distance_matrix(db, locs_for_matrix, try_fast=False)
+            distance_matrix = [
+                [0 if i == j else (r.distance_m or 10000) for j, r in enumerate(row)]
+                for i, row in enumerate(matrix)
+            ]
+            duration_matrix = [
+                [0 if i == j else (r.duration_s or 600) for j, r in enumerate(row)]
+                for i, row in enumerate(matrix)
+            ]
 
         result = ortools_optimizer.optimize(
             locations=locations, vehicles=vehicles,
@@ -618,10 +654,9 @@ class RoutingService:
         coords_for_geom = [depot] + [(s.lat, s.lng) for s in stops]
         geometry = distance_service.get_route_geometry(db, coords_for_geom)
         if geometry:
-            polyline_json = json.dumps(geometry)
             db.add(RutaPolyline(
                 ruta_id=ruta.id,
-                polyline=polyline_json,
+                coords=geometry,
                 distance_km=ruta.distance_km,
                 duration_min=ruta.duration_min,
             ))
@@ -634,16 +669,14 @@ class RoutingService:
                 rut_header.ruta_id = ruta.id
                 rut_header.status_rutiranja = "NA_RUTI"
 
-            # Obriši iz originala (jer su vec sigurno u rutiranju)
+            # Soft-delete u originalu (jer su vec sigurno u rutiranju; rute_stops ima FK na header)
             orig_header = db.get(NalogHeader, uid)
             if orig_header:
-                # Najprije stavke
-                orig_details = db.execute(
-                    select(NalogDetail).where(NalogDetail.nalog_prodaje_uid == uid)
-                ).scalars().all()
-                for od in orig_details:
-                    db.delete(od)
-                db.delete(orig_header)
+                orig_header.deleted_at = datetime.utcnow()
+
+        # Stavke originala brišu se jednim DELETE-om
+        if resolved_uids:
+            db.execute(delete(NalogDetail).where(NalogDetail.nalog_prodaje_uid.in_(resolved_uids)))
 
         db.commit()
         db.refresh(ruta)
@@ -687,11 +720,11 @@ class RoutingService:
                         select(RutaPolyline).where(RutaPolyline.ruta_id == ruta_id)
                     ).scalar_one_or_none()
                     if polyline_obj:
-                        polyline_obj.polyline = json.dumps(geometry)
+                        polyline_obj.coords = geometry
                     else:
                         db.add(RutaPolyline(
                             ruta_id=ruta_id,
-                            polyline=json.dumps(geometry),
+                            coords=geometry,
                             distance_km=ruta.distance_km,
                             duration_min=ruta.duration_min,
                         ))
@@ -761,18 +794,18 @@ class RoutingService:
                 else:
                     partner_naziv = partner.partner
 
-            stop_details.append({
-                "id": stop.id,
-                "nalog_uid": stop.nalog_uid,
-                "redoslijed": stop.redoslijed,
-                "eta": stop.eta.isoformat() if stop.eta else None,
-                "status": stop.status,
-                "partner_naziv": partner_naziv,
-                "partner_adresa": partner.adresa if partner else None,
-                "partner_mjesto": partner.naziv_mjesta if partner else None,
-                "lat": lat,
-                "lng": lng,
-            })
+            stop_details.append(RouteStopFast(
+                id=stop.id,
+                nalog_uid=stop.nalog_uid,
+                redoslijed=stop.redoslijed,
+                eta=stop.eta,
+                status=stop.status,
+                partner_naziv=partner_naziv,
+                partner_adresa=partner.adresa if partner else None,
+                partner_mjesto=partner.naziv_mjesta if partner else None,
+                lat=lat,
+                lng=lng,
+            ))
 
         vozilo = db.get(Vozilo, ruta.vozilo_id) if ruta.vozilo_id else None
 
@@ -782,16 +815,11 @@ class RoutingService:
         polyline_obj = db.execute(
             select(RutaPolyline).where(RutaPolyline.ruta_id == ruta_id)
         ).scalar_one_or_none()
-        polyline: list[list[float]] | None = None
-        if polyline_obj and polyline_obj.polyline:
-            try:
-                polyline = json.loads(polyline_obj.polyline)
-            except (json.JSONDecodeError, TypeError):
-                pass
+        polyline = polyline_obj.coords if polyline_obj else None
 
         # Ako nema spremljenog polyline, generiraj on-the-fly i spremi za buduće pozive
         if not polyline:
-            stop_coords = [(s["lat"], s["lng"]) for s in stop_details if s.get("lat") and s.get("lng")]
+            stop_coords = [(s.lat, s.lng) for s in stop_details if s.lat and s.lng]
             if stop_coords:
                 depot = self._get_depot_location(db)
                 coords_for_geom = [depot] + stop_coords
@@ -800,13 +828,12 @@ class RoutingService:
                 if polyline:
                     logger.info("Polyline generiran: %d koordinata, spremam u DB", len(polyline))
                     # Spremi za buduće pozive
-                    polyline_json = json.dumps(polyline)
                     if polyline_obj:
-                        polyline_obj.polyline = polyline_json
+                        polyline_obj.coords = polyline
                     else:
                         db.add(RutaPolyline(
                             ruta_id=ruta_id,
-                            polyline=polyline_json,
+                            coords=polyline,
                             distance_km=ruta.distance_km,
                             duration_min=ruta.duration_min,
                         ))
@@ -8,16 +8,27 @@ from __future__ import annotations
 import asyncio
 import logging
 import sys
-from datetime import date, datetime
-from decimal import Decimal
+from datetime import date, datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal
 from typing import Any
 
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session
-
-from app.models.erp_models import Artikl, GrupaArtikla, NalogDetail, NalogHeader, Partner, Skladiste, VrstaIsporuke
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.models.erp_models import (
+    PARTNER_SIFRARNICI,
+    Artikl,
+    GrupaArtikla,
+    NalogDetail,
+    NalogHeader,
+    Partner,
+    PartnerSifrarnik,
+    Skladiste,
+    VrstaIsporuke,
+)
 from app.models.regional_models import PostanskiBroj
 from app.models.erp_models import NaloziBlacklist
+from app.models.routing_models import RutaStop
 from app.models.routing_order_models import NalogHeaderRutiranje, NalogHeaderArhiva
 from app.models.sync_models import SyncLog
 from app.models.config_models import RefreshLog
@@ -60,11 +71,15 @@ def _get_sync_warehouse_codes(db: Session) -> set[str]:
 # Helper funkcije za parsiranje
 # ==============================================================================
 
-def _safe_decimal(value: Any, default: Decimal | None = None) -> Decimal | None:
+def _safe_decimal(value: Any, default: Decimal | None = None, places: int | None = None) -> Decimal | None:
+    """places zaokružuje na skalu kolone kako bi usporedba s vrijednošću iz baze bila točna."""
     if value is None or value == "":
         return default
     try:
-        return Decimal(str(value))
+        result = Decimal(str(value))
+        if places is not None:
+            result = result.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+        return result
     except Exception:
         return default
 
@@ -173,11 +188,10 @@ def map_partner(erp: dict[str, Any]) -> dict[str, Any]:
         "b2b_mjesto": _safe_str(erp.get("b2b_mjesto")),
         "drzava_uid": _safe_str(erp.get("drzava_uid")),
         "drzava": _safe_str(erp.get("drzava")),
-        "naziv_drzave": _safe_str(erp.get("naziv_drzave")),
         "b2b_drzava": _safe_str(erp.get("b2b_drzava")),
         "valuta": _safe_str(erp.get("valuta")),
         "b2b_valuta": _safe_str(erp.get("b2b_valuta")),
-        "rabat": _safe_decimal(erp.get("rabat")),
+        "rabat": _safe_decimal(erp.get("rabat"), places=2),
         "limit_iznos": _safe_decimal(erp.get("limit_iznos")),
         "limit_dana": _safe_int(erp.get("limit_dana")),
         "odgoda_placanja": _safe_int(erp.get("odgoda_placanja")),
@@ -203,41 +217,52 @@ def map_partner(erp: dict[str, Any]) -> dict[str, Any]:
         "export_cjenika": _safe_str(erp.get("export_cjenika")),
         "grupacija_uid": _safe_str(erp.get("grupacija_uid")),
         "grupacija": _safe_str(erp.get("grupacija")),
-        "naziv_grupacije": _safe_str(erp.get("naziv_grupacije")),
         "parent__partner_uid": _safe_str(erp.get("parent__partner_uid")),
         "parent__partner": _safe_str(erp.get("parent__partner")),
         "parent__partner_b2b": _safe_str(erp.get("parent__partner_b2b")),
         "komercijalista_uid": _safe_str(erp.get("komercijalista_uid")),
         "komercijalista": _safe_str(erp.get("komercijalista")),
-        "ime_komercijaliste": _safe_str(erp.get("ime_komercijaliste")),
         "kam_uid": _safe_str(erp.get("kam_uid")),
         "kam": _safe_str(erp.get("kam")),
-        "ime_kam": _safe_str(erp.get("ime_kam")),
         "grupa_partnera_uid": _safe_str(erp.get("grupa_partnera_uid")),
         "grupa_partnera": _safe_str(erp.get("grupa_partnera")),
-        "naziv_grupe_partnera": _safe_str(erp.get("naziv_grupe_partnera")),
         "agent_uid": _safe_str(erp.get("agent_uid")),
         "agent": _safe_str(erp.get("agent")),
-        "naziv_agenta": _safe_str(erp.get("naziv_agenta")),
         "vrsta_isporuke_uid": _safe_str(erp.get("vrsta_isporuke_uid")),
         "vrsta_isporuke": _safe_str(erp.get("vrsta_isporuke")),
-        "naziv_vrste_isporuke": _safe_str(erp.get("naziv_vrste_isporuke")),
         "grupa_mjesta_uid": _safe_str(erp.get("grupa_mjesta_uid")),
         "grupa_mjesta": _safe_str(erp.get("grupa_mjesta")),
-        "naziv_grupe_mjesta": _safe_str(erp.get("naziv_grupe_mjesta")),
         "nivo_partnera_uid": _safe_str(erp.get("nivo_partnera_uid")),
         "nivo_partnera": _safe_str(erp.get("nivo_partnera")),
-        "naziv_nivoa_partnera": _safe_str(erp.get("naziv_nivoa_partnera")),
         "suradnik_uid": _safe_str(erp.get("suradnik_uid")),
         "suradnik": _safe_str(erp.get("suradnik")),
-        "naziv_suradnika": _safe_str(erp.get("naziv_suradnika")),
         "odakle_uid": _safe_str(erp.get("odakle_uid")),
         "odakle": _safe_str(erp.get("odakle")),
-        "odakle_naziv": _safe_str(erp.get("odakle_naziv")),
         "synced_at": datetime.utcnow(),
     }
 
 
+def map_partner_sifrarnici(erp: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Izdvaja šifrarnike (grupacija, komercijalista, agent, ...) iz ERP partner JSON-a.
+
+    Vraća jedan dict po tipu za koji ERP vraća uid; naziv se sprema
+    u partner_sifrarnici, a ne na partnera.
+    """
+    result: list[dict[str, Any]] = []
+    for tip, (uid_kolona, _, naziv_kljuc) in PARTNER_SIFRARNICI.items():
+        uid = _safe_str(erp.get(uid_kolona))
+        if not uid:
+            continue
+        result.append({
+            "tip": tip,
+            "uid": uid,
+            "sifra": _safe_str(erp.get(tip)),
+            "naziv": _safe_str(erp.get(naziv_kljuc)),
+        })
+    return result
+
+
 def map_artikl(erp: dict[str, Any]) -> dict[str, Any]:
     """Mapira ERP artikl JSON na dict za Artikl model."""
     glavni_dobavljac_artikl = _safe_str(erp.get("glavni_dobavljac_artikl"))
@@ -251,24 +276,24 @@ def map_artikl(erp: dict[str, Any]) -> dict[str, Any]:
         "naziv": _safe_str(erp.get("naziv")),
         "barcode": _safe_str(erp.get("barcode")),
         "jm": _safe_str(erp.get("jm")),
-        "vpc": _safe_decimal(erp.get("vpc")),
-        "mpc": _safe_decimal(erp.get("mpc")),
-        "duzina": _safe_decimal(erp.get("duzina")),
-        "sirina": _safe_decimal(erp.get("sirina")),
-        "visina": _safe_decimal(erp.get("visina")),
-        "masa": _safe_decimal(erp.get("masa")),
-        "volumen": _safe_decimal(erp.get("volumen")),
+        "vpc": _safe_decimal(erp.get("vpc"), places=4),
+        "mpc": _safe_decimal(erp.get("mpc"), places=4),
+        "duzina": _safe_decimal(erp.get("duzina"), places=3),
+        "sirina": _safe_decimal(erp.get("sirina"), places=3),
+        "visina": _safe_decimal(erp.get("visina"), places=3),
+        "masa": _safe_decimal(erp.get("masa"), places=3),
+        "volumen": _safe_decimal(erp.get("volumen"), places=6),
         "pakiranje": _safe_str(erp.get("pakiranje")),
         "pakiranje_jm": _safe_str(erp.get("pakiranje_jm")),
-        "pakiranje_masa": _safe_decimal(erp.get("pakiranje_masa")),
+        "pakiranje_masa": _safe_decimal(erp.get("pakiranje_masa"), places=3),
         "pakiranje_barcode": _safe_str(erp.get("pakiranje_barcode")),
         "pakiranje_trans": _safe_str(erp.get("pakiranje_trans")),
         "pakiranje_trans_jm": _safe_str(erp.get("pakiranje_trans_jm")),
-        "pakiranje_trans_masa": _safe_decimal(erp.get("pakiranje_trans_masa")),
+        "pakiranje_trans_masa": _safe_decimal(erp.get("pakiranje_trans_masa"), places=3),
         "pakiranje_trans_barcode": _safe_str(erp.get("pakiranje_trans_barcode")),
-        "pakiranje_trans_duzina": _safe_decimal(erp.get("pakiranje_trans_duzina")),
-        "pakiranje_trans_sirina": _safe_decimal(erp.get("pakiranje_trans_sirina")),
-        "pakiranje_trans_visina": _safe_decimal(erp.get("pakiranje_trans_visina")),
+        "pakiranje_trans_duzina": _safe_decimal(erp.get("pakiranje_trans_duzina"), places=3),
+        "pakiranje_trans_sirina": _safe_decimal(erp.get("pakiranje_trans_sirina"), places=3),
+        "pakiranje_trans_visina": _safe_decimal(erp.get("pakiranje_trans_visina"), places=3),
         "naziv_kratki": _safe_str(erp.get("naziv_kratki")),
         "supergrupa_artikla": _safe_str(erp.get("supergrupa_artikla")),
         "supergrupa_artikla_naziv": _safe_str(erp.get("supergrupa_artikla_naziv")),
@@ -277,10 +302,10 @@ def map_artikl(erp: dict[str, Any]) -> dict[str, Any]:
         "grupa_artikla_uid": _safe_str(erp.get("grupa_artikla_uid")),
         "grupa_artikla": _safe_str(erp.get("grupa_artikla")),
         "grupa_artikla_naziv": _safe_str(erp.get("grupa_artikla_naziv")),
-        "masa_netto": _safe_decimal(erp.get("masa_netto")),
-        "pakiranje_duzina": _safe_decimal(erp.get("pakiranje_duzina")),
-        "pakiranje_visina": _safe_decimal(erp.get("pakiranje_visina")),
-        "pakiranje_sirina": _safe_decimal(erp.get("pakiranje_sirina")),
+        "masa_netto": _safe_decimal(erp.get("masa_netto"), places=3),
+        "pakiranje_duzina": _safe_decimal(erp.get("pakiranje_duzina"), places=3),
+        "pakiranje_visina": _safe_decimal(erp.get("pakiranje_visina"), places=3),
+        "pakiranje_sirina": _safe_decimal(erp.get("pakiranje_sirina"), places=3),
         "paleta_kolicina": _safe_int(erp.get("paleta_kolicina")),
         "proizvodac_uid": _safe_str(erp.get("proizvodac_uid")),
         "proizvodac": _safe_str(erp.get("proizvodac")),
@@ -420,35 +445,66 @@ def _assign_regija(db: Session, postanski_broj: str | None) -> int | None:
     return row.regija_id if row else None
 
 
-def _recalculate_totals_for_nalog(db: Session, nalog_uid: str) -> None:
+def _apply_changes(obj: Any, data: dict[str, Any]) -> bool:
     """
-    Izračunaj total_weight i total_volume za nalog na temelju stavki i artikala.
-
-    total_weight = SUM(stavka.kolicina * artikl.masa)
-    total_volume = SUM(stavka.kolicina * artikl.volumen)
+    Postavi ne-None vrijednosti iz data na obj i vrati True ako se išta promijenilo.
 
-    Napomena: artikl.volumen je u cm3 – u bazi držimo cm3, a prikaz u m3 radi frontend
-    dijeljenjem s 1_000_000.
+    synced_at se ne uspoređuje — pomiče se samo kad se sadržaj stvarno
+    promijenio, pa za retke koje ERP vraća nepromijenjene nema UPDATE-a.
     """
-    header = db.get(NalogHeader, nalog_uid)
-    if not header:
-        return
+    changed = False
+    for k, v in data.items():
+        if v is None or k == "synced_at":
+            continue
+        if getattr(obj, k) != v:
+            setattr(obj, k, v)
+            changed = True
+    if changed and data.get("synced_at") is not None:
+        obj.synced_at = data["synced_at"]
+    return changed
 
-    result = db.execute(
-        select(
-            func.sum(NalogDetail.kolicina * Artikl.masa),
-            func.sum(NalogDetail.kolicina * Artikl.volumen),
+
+def purge_deleted_nalozi(db: Session, older_than_days: int = 90) -> int:
+    """
+    Trajno obriši soft-deleteane naloge starije od older_than_days (noćni job).
+    Nalozi na koje još pokazuje neki rute_stops ostaju zbog FK-a.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    uids = (
+        select(NalogHeader.nalog_prodaje_uid)
+        .where(
+            NalogHeader.deleted_at < cutoff,
+            ~exists().where(RutaStop.nalog_uid == NalogHeader.nalog_prodaje_uid),
         )
-        .outerjoin(Artikl, NalogDetail.artikl_uid == Artikl.artikl_uid)
-        .where(NalogDetail.nalog_prodaje_uid == nalog_uid)
-    ).first()
+    )
+    db.execute(delete(NalogDetail).where(NalogDetail.nalog_prodaje_uid.in_(uids)))
+    result = db.execute(
+        delete(NalogHeader).where(NalogHeader.nalog_prodaje_uid.in_(uids)),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    logger.info("Trajno obrisano %d soft-deleteanih naloga (starijih od %d dana)", result.rowcount, older_than_days)
+    return result.rowcount
+
 
-    if result is None:
-        return
+def get_last_successful_sync_at(db: Session, entity: str) -> datetime | None:
+    """Vrati started_at zadnjeg uspješnog (COMPLETED) sync-a za entitet."""
+    return db.execute(
+        select(SyncLog.started_at)
+        .where(SyncLog.entity == entity, SyncLog.status == "COMPLETED")
+        .order_by(SyncLog.started_at.desc())
+        .limit(1)
+    ).scalar_one_or_none()
 
-    total_weight, total_volume = result
-    header.total_weight = total_weight or 0
-    header.total_volume = total_volume or 0
+
+def _upsert_partner_sifrarnici(db: Session, partner_erp: dict[str, Any]) -> None:
+    """Upsert šifrarnika partnera (ne prepisuje postojeće vrijednosti s None)."""
+    for data in map_partner_sifrarnici(partner_erp):
+        existing = db.get(PartnerSifrarnik, (data["tip"], data["uid"]))
+        if existing:
+            _apply_changes(existing, data)
+        else:
+            db.add(PartnerSifrarnik(**data))
 
 
 async def sync_orders(
@@ -567,6 +623,7 @@ async def sync_orders(
                     if partner_erp:
                         partner_found_in_erp = True
                         partner_dict = map_partner(partner_erp)
+                        _upsert_partner_sifrarnici(db, partner_erp)
                         # Ako ERP vrati UID, koristimo njega kao izvor istine
                         if partner_dict.get("partner_uid"):
                             partner_uid = partner_dict["partner_uid"]
@@ -575,9 +632,8 @@ async def sync_orders(
                         if partner_uid:
                             existing_partner = db.get(Partner, partner_uid)
                             if existing_partner:
-                                for k, v in partner_dict.items():
-                                    if v is not None:  # ne prepisuj None vrijednosti
-                                        setattr(existing_partner, k, v)
+                                # ne prepisuj None vrijednosti ni nepromijenjene retke
+                                _apply_changes(existing_partner, partner_dict)
                             else:
                                 db.add(Partner(**partner_dict))
 
@@ -644,12 +700,15 @@ async def sync_orders(
                     skipped += 1
                     continue
 
-                # Upsert nalog header
-                existing_header = db.get(NalogHeader, nalog_prodaje_uid)
+                # Upsert nalog header (soft-deleteani se ponovno aktivira, npr. nakon unblacklista)
+                existing_header = db.get(
+                    NalogHeader, nalog_prodaje_uid,
+                    options=[selectinload(NalogHeader.fiscal)],
+                    execution_options={"include_deleted": True},
+                )
                 if existing_header:
-                    for k, v in header_dict.items():
-                        if v is not None:
-                            setattr(existing_header, k, v)
+                    existing_header.deleted_at = None
+                    _apply_changes(existing_header, header_dict)
                     updated += 1
                     logger.info("UPDATE %s — ažuriran u bazi", nalog_prodaje_uid)
                     _log(f"[SYNC] UPDATE {nalog_prodaje_uid}")
@@ -670,6 +729,8 @@ async def sync_orders(
                     stavke = detail_resp.get("stavke", [])
                     if not isinstance(stavke, list):
                         stavke = []
+                    # Nove stavke idu jednim Core INSERT-om (executemany), bez ORM instanci
+                    new_details: list[dict[str, Any]] = []
                     for stavka_erp in stavke:
                         detail_dict = map_nalog_detail(stavka_erp, nalog_prodaje_uid)
                         stavka_uid = detail_dict.get("stavka_uid")
@@ -690,17 +751,14 @@ async def sync_orders(
 
                         existing_detail = db.get(NalogDetail, stavka_uid)
                         if existing_detail:
-                            for k, v in detail_dict.items():
-                                if v is not None:
-                                    setattr(existing_detail, k, v)
+                            _apply_changes(existing_detail, detail_dict)
                         else:
-                            db.add(NalogDetail(**detail_dict))
+                            new_details.append(detail_dict)
 
-                    db.commit()
-
-                    # Nakon što su sve stavke za ovaj nalog upisane/ažurirane,
-                    # izračunaj total_weight i total_volume.
-                    _recalculate_totals_for_nalog(db, nalog_prodaje_uid)
+                    if new_details:
+                        db.execute(NalogDetail.__table__.insert(), new_details)
+                    # total_weight i total_volume preračunava trigger
+                    # trg_nalozi_details_totals (migracija 016).
                     db.commit()
 
             except Exception as e:
@@ -801,7 +859,7 @@ async def refresh_orders(db: Session, sync_log: SyncLog, datum_od: date) -> None
 
             try:
                 # 2. Provjeri postoji li nalog u našoj bazi i ima li status '08'
-                existing = db.get(NalogHeader, nalog_uid)
+                existing = db.get(NalogHeader, nalog_uid, options=[selectinload(NalogHeader.fiscal)])
                 if not existing or existing.status != "08":
                     skipped += 1
                     continue
@@ -824,11 +882,12 @@ async def refresh_orders(db: Session, sync_log: SyncLog, datum_od: date) -> None
                             await asyncio.sleep(0.05)
                             if partner_erp:
                                 partner_dict = map_partner(partner_erp)
+                                _upsert_partner_sifrarnici(db, partner_erp)
                                 p_changed_fields: list[str] = []
                                 p_old_values: dict[str, str] = {}
                                 p_new_values: dict[str, str] = {}
                                 for k, v in partner_dict.items():
-                                    if v is not None:
+                                    if v is not None and k != "synced_at":
                                         old_val = getattr(existing_partner, k, None)
                                         if old_val != v:
                                             p_changed_fields.append(k)
@@ -836,6 +895,7 @@ async def refresh_orders(db: Session, sync_log: SyncLog, datum_od: date) -> None
                                             p_new_values[k] = str(v)
                                             setattr(existing_partner, k, v)
                                 if p_changed_fields:
+                                    existing_partner.synced_at = partner_dict["synced_at"]
                                     updated_partners += 1
                                     db.add(RefreshLog(
                                         sync_log_id=sync_log.id,
@@ -854,6 +914,7 @@ async def refresh_orders(db: Session, sync_log: SyncLog, datum_od: date) -> None
                             await asyncio.sleep(0.05)
                             if partner_erp:
                                 partner_dict = map_partner(partner_erp)
+                                _upsert_partner_sifrarnici(db, partner_erp)
                                 new_partner = Partner(**partner_dict)
                                 db.add(new_partner)
                                 updated_partners += 1
@@ -878,7 +939,7 @@ async def refresh_orders(db: Session, sync_log: SyncLog, datum_od: date) -> None
                 new_values: dict[str, str] = {}
 
                 for k, v in header_dict.items():
-                    if k == "nalog_prodaje_uid":
+                    if k in ("nalog_prodaje_uid", "synced_at"):
                         continue
                     if v is not None:
                         old_val = getattr(existing, k, None)
@@ -959,17 +1020,13 @@ async def sync_artikli(db: Session, sync_log: SyncLog) -> None:
 
         batch = 0
         _log(f"[Sync artikli] Startam sync od offset={offset} (postojeci artikli u bazi={existing_count})")
-        while True:
+        # Stranice se obrađuju kako stižu (ERP client dohvaća nekoliko unaprijed),
+        # a novi artikli idu jednim Core INSERT-om po stranici.
+        async for page in erp_client.iter_artikli_pages(page_size=limit, offset=offset):
             batch += 1
             # U jednom batchu ista grupa može biti kod više artikala – dodajemo je samo jednom
             grupe_dodane_u_ovom_batchu: set[str] = set()
-            _log(f"[Sync artikli] Batch {batch}: trazim offset={offset}, limit={limit} ...")
-            logger.info("Sync artikli: trazim batch %d (offset=%d, limit=%d)", batch, offset, limit)
-            page = await erp_client.get_artikli_page(offset=offset, limit=limit)
-            if not page:
-                _log(f"[Sync artikli] Batch {batch}: prazan rezultat – kraj.")
-                logger.info("Sync artikli: prazan rezultat za batch %d (offset=%d) – prekidam petlju", batch, offset)
-                break
+            new_artikli: dict[str, dict[str, Any]] = {}
 
             _log(f"[Sync artikli] Batch {batch}: ERP vratio {len(page)} artikala (offset={offset})")
             logger.info("Sync artikli: batch %d, ERP vratio %d artikala (offset=%d)", batch, len(page), offset)
@@ -989,9 +1046,7 @@ async def sync_artikli(db: Session, sync_log: SyncLog) -> None:
                         "supergrupa_artikla_naziv": _safe_str(erp_art.get("supergrupa_artikla_naziv")),
                     }
                     if grupa:
-                        for k, v in grupa_data.items():
-                            if v is not None:
-                                setattr(grupa, k, v)
+                        _apply_changes(grupa, grupa_data)
                         grupe_updated += 1
                     elif grupa_uid not in grupe_dodane_u_ovom_batchu:
                         db.add(GrupaArtikla(**grupa_data))
@@ -1006,12 +1061,10 @@ async def sync_artikli(db: Session, sync_log: SyncLog) -> None:
 
                 existing = db.get(Artikl, artikl_uid)
                 if existing:
-                    for k, v in art_dict.items():
-                        if v is not None:
-                            setattr(existing, k, v)
+                    _apply_changes(existing, art_dict)
                     updated += 1
-                else:
-                    db.add(Artikl(**art_dict))
+                elif artikl_uid not in new_artikli:
+                    new_artikli[artikl_uid] = art_dict
                     created += 1
 
                 if (created + updated) % 1000 == 0:
@@ -1024,6 +1077,10 @@ async def sync_artikli(db: Session, sync_log: SyncLog) -> None:
                         idx,
                     )
 
+            if new_artikli:
+                db.flush()  # grupe prije artikala (FK)
+                db.execute(Artikl.__table__.insert(), list(new_artikli.values()))
+
             _log(
                 f"[Sync artikli] Batch {batch} zavrsen (offset={offset}) | "
                 f"artikli: kreirano={created}, azurirano={updated} | grupe: kreirano={grupe_created}, azurirano={grupe_updated}"
@@ -1044,16 +1101,7 @@ async def sync_artikli(db: Session, sync_log: SyncLog) -> None:
                 f"grupe kreirano={grupe_created}, azurirano={grupe_updated}"
             )
             db.commit()
-            if len(page) < limit:
-                _log(f"[Sync artikli] Zadnji batch ({batch}), {len(page)} zapisa – kraj.")
-                logger.info(
-                    "Sync artikli: zadnji batch (%d) ima %d zapisa (< limit=%d) – kraj",
-                    batch,
-                    len(page),
-                    limit,
-                )
-                break
-            offset += limit
+            offset += len(page)
 
         _log(f"[Sync artikli] GOTOVO. Artikli: kreirano={created}, azurirano={updated}; Grupe: kreirano={grupe_created}, azurirano={grupe_updated}")
         sync_log.status = "COMPLETED"
@@ -1178,8 +1226,13 @@ async def sync_orders_by_raspored(
                 skipped += 1
                 continue
 
-            # Provjeri da nalog ne postoji već u bazi
-            if db.get(NalogHeader, nalog_prodaje_uid):
+            # Provjeri da nalog ne postoji već u bazi (soft-deleteani se smije ponovno importirati)
+            existing_header = db.get(
+                NalogHeader, nalog_prodaje_uid,
+                options=[selectinload(NalogHeader.fiscal)],
+                execution_options={"include_deleted": True},
+            )
+            if existing_header and existing_header.deleted_at is None:
                 skipped_exists += 1
                 skipped += 1
                 continue
@@ -1223,6 +1276,7 @@ async def sync_orders_by_raspored(
 
                     if partner_erp:
                         partner_dict = map_partner(partner_erp)
+                        _upsert_partner_sifrarnici(db, partner_erp)
                         if partner_dict.get("partner_uid"):
                             partner_uid = partner_dict["partner_uid"]
                         partner_postanski_broj = partner_dict.get("postanski_broj")
@@ -1230,9 +1284,7 @@ async def sync_orders_by_raspored(
                             # Provjeri u bazi + u sesiji + tracking
                             existing_partner = db.get(Partner, partner_uid)
                             if existing_partner:
-                                for k, v in partner_dict.items():
-                                    if v is not None:
-                                        setattr(existing_partner, k, v)
+                                _apply_changes(existing_partner, partner_dict)
                             elif partner_uid not in _partners_added_in_session:
                                 db.add(Partner(**partner_dict))
                                 _partners_added_in_session.add(partner_uid)
@@ -1262,7 +1314,11 @@ async def sync_orders_by_raspored(
                 if partner_postanski_broj:
                     header_dict["regija_id"] = _assign_regija(db, partner_postanski_broj)
 
-                db.add(NalogHeader(**header_dict))
+                if existing_header:
+                    existing_header.deleted_at = None
+                    _apply_changes(existing_header, header_dict)
+                else:
+                    db.add(NalogHeader(**header_dict))
                 db.commit()
 
                 # Upsert stavke
@@ -1270,6 +1326,7 @@ async def sync_orders_by_raspored(
                     stavke = detail_resp.get("stavke", [])
                     if not isinstance(stavke, list):
                         stavke = []
+                    new_details: list[dict[str, Any]] = []
                     for stavka_erp in stavke:
                         detail_dict = map_nalog_detail(stavka_erp, nalog_prodaje_uid)
                         stavka_uid = detail_dict.get("stavka_uid")
@@ -1280,10 +1337,10 @@ async def sync_orders_by_raspored(
                             detail_dict["artikl_uid"] = None
                         existing_det = db.get(NalogDetail, stavka_uid)
                         if not existing_det:
-                            db.add(NalogDetail(**detail_dict))
-                    db.commit()
-                    # Izračunaj total_weight i total_volume iz stavki
-                    _recalculate_totals_for_nalog(db, nalog_prodaje_uid)
+                            new_details.append(detail_dict)
+                    if new_details:
+                        db.execute(NalogDetail.__table__.insert(), new_details)
+                    # total_weight i total_volume preračunava trigger trg_nalozi_details_totals
                     db.commit()
 
                 created += 1
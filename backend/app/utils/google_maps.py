@@ -0,0 +1,30 @@
+"""
+Dijeljeni Google Maps klijent.
+
+googlemaps.Client pri kreiranju otvara vlastiti requests.Session, pa se jedan
+klijent po procesu ponovno koristi za sve geocoding i distance pozive
+(keep-alive konekcije umjesto novog TLS handshakea po pozivu).
+"""
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+from app.core.config import settings as app_settings
+
+if TYPE_CHECKING:
+    import googlemaps
+
+_client: googlemaps.Client | None = None
+_lock = threading.Lock()
+
+
+def get_gmaps_client() -> googlemaps.Client:
+    """Lijeno kreiran Google Maps klijent; pretpostavlja postavljen GOOGLE_MAPS_API_KEY."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                import googlemaps
+                _client = googlemaps.Client(key=app_settings.GOOGLE_MAPS_API_KEY)
+    return _client
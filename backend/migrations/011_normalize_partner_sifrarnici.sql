@@ -0,0 +1,81 @@
+-- ============================================================================
+-- Migracija: Normalizacija naziva šifrarnika partnera
+-- Datum: 2026-10-16
+-- Opis: Nazivi (naziv_grupacije, ime_komercijaliste, naziv_agenta, ...) se
+--       sele iz tablice partneri u partner_sifrarnici (tip, uid). Na partneru
+--       ostaju samo *_uid i šifra kolone.
+-- ============================================================================
+
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'partner_sifrarnici')
+BEGIN
+    CREATE TABLE partner_sifrarnici (
+        tip NVARCHAR(30) NOT NULL,
+        uid NVARCHAR(50) NOT NULL,
+        sifra NVARCHAR(50) NULL,
+        naziv NVARCHAR(255) NULL,
+        updated_at DATETIME DEFAULT GETUTCDATE(),
+        CONSTRAINT PK_partner_sifrarnici PRIMARY KEY (tip, uid)
+    );
+    PRINT 'Tablica partner_sifrarnici kreirana.';
+END
+GO
+
+-- ============================================================================
+-- Prebaci postojeće nazive iz partneri (uzima se jedan naziv po uid-u)
+-- ============================================================================
+
+IF EXISTS (SELECT * FROM sys.columns WHERE object_id = OBJECT_ID('partneri') AND name = 'naziv_grupacije')
+BEGIN
+    EXEC('
+    INSERT INTO partner_sifrarnici (tip, uid, sifra, naziv)
+    SELECT src.tip, src.uid, MAX(src.sifra), MAX(src.naziv)
+    FROM (
+        SELECT ''drzava'', drzava_uid, drzava, naziv_drzave FROM partneri
+        UNION ALL SELECT ''grupacija'', grupacija_uid, grupacija, naziv_grupacije FROM partneri
+        UNION ALL SELECT ''komercijalista'', komercijalista_uid, komercijalista, ime_komercijaliste FROM partneri
+        UNION ALL SELECT ''kam'', kam_uid, kam, ime_kam FROM partneri
+        UNION ALL SELECT ''grupa_partnera'', grupa_partnera_uid, grupa_partnera, naziv_grupe_partnera FROM partneri
+        UNION ALL SELECT ''agent'', agent_uid, agent, naziv_agenta FROM partneri
+        UNION ALL SELECT ''vrsta_isporuke'', vrsta_isporuke_uid, vrsta_isporuke, naziv_vrste_isporuke FROM partneri
+        UNION ALL SELECT ''grupa_mjesta'', grupa_mjesta_uid, grupa_mjesta, naziv_grupe_mjesta FROM partneri
+        UNION ALL SELECT ''nivo_partnera'', nivo_partnera_uid, nivo_partnera, naziv_nivoa_partnera FROM partneri
+        UNION ALL SELECT ''suradnik'', suradnik_uid, suradnik, naziv_suradnika FROM partneri
+        UNION ALL SELECT ''odakle'', odakle_uid, odakle, odakle_naziv FROM partneri
+    ) AS src (tip, uid, sifra, naziv)
+    WHERE src.uid IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM partner_sifrarnici ps WHERE ps.tip = src.tip AND ps.uid = src.uid
+      )
+    GROUP BY src.tip, src.uid;
+    ');
+    PRINT 'Nazivi šifrarnika prebačeni u partner_sifrarnici.';
+END
+GO
+
+-- ============================================================================
+-- Ukloni denormalizirane nazive iz partneri
+-- ============================================================================
+
+DECLARE @col NVARCHAR(100);
+DECLARE cols CURSOR LOCAL FAST_FORWARD FOR
+    SELECT name FROM sys.columns
+    WHERE object_id = OBJECT_ID('partneri')
+      AND name IN (
+          'naziv_drzave', 'naziv_grupacije', 'ime_komercijaliste', 'ime_kam',
+          'naziv_grupe_partnera', 'naziv_agenta', 'naziv_vrste_isporuke',
+          'naziv_grupe_mjesta', 'naziv_nivoa_partnera', 'naziv_suradnika', 'odakle_naziv'
+      );
+OPEN cols;
+FETCH NEXT FROM cols INTO @col;
+WHILE @@FETCH_STATUS = 0
+BEGIN
+    EXEC('ALTER TABLE partneri DROP COLUMN ' + @col);
+    PRINT 'Kolona partneri.' + @col + ' uklonjena.';
+    FETCH NEXT FROM cols INTO @col;
+END
+CLOSE cols;
+DEALLOCATE cols;
+GO
+
+PRINT 'Migracija 011 zavrsena.';
+GO
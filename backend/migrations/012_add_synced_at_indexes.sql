@@ -0,0 +1,43 @@
+-- ============================================================================
+-- Migracija: Indeksi na synced_at za inkrementalni (delta) sync
+-- Datum: 2026-10-16
+-- Opis: Range seek na "promijenjeno od X" umjesto skeniranja cijele tablice
+-- ============================================================================
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_partneri_synced_at' AND object_id = OBJECT_ID('partneri'))
+BEGIN
+    CREATE INDEX ix_partneri_synced_at ON partneri (synced_at);
+    PRINT 'Indeks ix_partneri_synced_at kreiran.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_artikli_synced_at' AND object_id = OBJECT_ID('artikli'))
+BEGIN
+    CREATE INDEX ix_artikli_synced_at ON artikli (synced_at);
+    PRINT 'Indeks ix_artikli_synced_at kreiran.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_nalozi_header_synced_at' AND object_id = OBJECT_ID('nalozi_header'))
+BEGIN
+    CREATE INDEX ix_nalozi_header_synced_at ON nalozi_header (synced_at);
+    PRINT 'Indeks ix_nalozi_header_synced_at kreiran.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_nalozi_details_synced_at' AND object_id = OBJECT_ID('nalozi_details'))
+BEGIN
+    CREATE INDEX ix_nalozi_details_synced_at ON nalozi_details (synced_at);
+    PRINT 'Indeks ix_nalozi_details_synced_at kreiran.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_mantis_sscc_synced_at' AND object_id = OBJECT_ID('mantis_sscc'))
+BEGIN
+    CREATE INDEX ix_mantis_sscc_synced_at ON mantis_sscc (synced_at);
+    PRINT 'Indeks ix_mantis_sscc_synced_at kreiran.';
+END
+GO
+
+PRINT 'Migracija 012 zavrsena.';
+GO
@@ -0,0 +1,21 @@
+-- ============================================================================
+-- Migracija: Filtrirani covering indeks na nalozi_header (raspored, status)
+-- Datum: 2026-10-16
+-- Opis: Planer čita samo naloge s rasporedom; indeks pokriva kolone koje
+--       rutiranje koristi pa aktivni skup ostaje mali i u buffer poolu.
+--       Filter ne može sadržavati SYSUTCDATETIME() (nedeterministički), pa se
+--       stari nalozi i dalje sele u nalozi_header_arhiva.
+-- ============================================================================
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_nalozi_header_raspored_active' AND object_id = OBJECT_ID('nalozi_header'))
+BEGIN
+    CREATE NONCLUSTERED INDEX ix_nalozi_header_raspored_active
+        ON nalozi_header (raspored, status)
+        INCLUDE (partner_uid, vrsta_isporuke, skladiste, sa__skladiste, regija_id, total_weight, total_volume)
+        WHERE raspored IS NOT NULL;
+    PRINT 'Indeks ix_nalozi_header_raspored_active kreiran.';
+END
+GO
+
+PRINT 'Migracija 013 zavrsena.';
+GO
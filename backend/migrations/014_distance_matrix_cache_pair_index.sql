@@ -0,0 +1,25 @@
+-- ============================================================================
+-- Migracija: Unique indeks na (origin_hash, dest_hash) u distance_matrix_cache
+-- Datum: 2026-10-16
+-- Opis: Lookup u distance_matrix_cache filtrira po paru hash-eva, a tablica
+--       nije imala indeks pa je svaki upit radio table scan. Prije kreiranja
+--       unique indeksa brišu se eventualni duplikati (zadržava se najnoviji).
+-- ============================================================================
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_dmc_pair' AND object_id = OBJECT_ID('distance_matrix_cache'))
+BEGIN
+    ;WITH dup AS (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY origin_hash, dest_hash ORDER BY updated_at DESC, id DESC
+        ) AS rn
+        FROM distance_matrix_cache
+    )
+    DELETE FROM dup WHERE rn > 1;
+
+    CREATE UNIQUE INDEX ix_dmc_pair ON distance_matrix_cache (origin_hash, dest_hash);
+    PRINT 'Indeks ix_dmc_pair kreiran.';
+END
+GO
+
+PRINT 'Migracija 014 zavrsena.';
+GO
@@ -0,0 +1,70 @@
+-- ============================================================================
+-- Migracija: Hash ključevi cache tablica kao BINARY(32)
+-- Datum: 2026-10-16
+-- Opis: geocoding_cache.address_hash i distance_matrix_cache.origin_hash /
+--       dest_hash se spremaju kao sirovi SHA-256 digest (BINARY(32)) umjesto
+--       hex stringa NVARCHAR(64). Postojeće vrijednosti se konvertiraju
+--       (CONVERT stil 2 = hex bez '0x'), indeksi se kreiraju ponovo.
+-- ============================================================================
+
+-- ============================================================================
+-- geocoding_cache.address_hash
+-- ============================================================================
+
+IF EXISTS (
+    SELECT * FROM sys.columns
+    WHERE object_id = OBJECT_ID('geocoding_cache') AND name = 'address_hash'
+      AND TYPE_NAME(system_type_id) IN ('nvarchar', 'varchar')
+)
+BEGIN
+    -- Ukloni unique constraint / indekse na staroj koloni (ime je generirano)
+    DECLARE @sql NVARCHAR(MAX) = N'';
+    SELECT @sql = @sql + CASE WHEN i.is_unique_constraint = 1
+            THEN N'ALTER TABLE geocoding_cache DROP CONSTRAINT ' + QUOTENAME(i.name) + N';'
+            ELSE N'DROP INDEX ' + QUOTENAME(i.name) + N' ON geocoding_cache;'
+        END
+    FROM sys.indexes i
+    JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+    JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+    WHERE i.object_id = OBJECT_ID('geocoding_cache') AND c.name = 'address_hash' AND i.is_primary_key = 0;
+    EXEC sp_executesql @sql;
+
+    ALTER TABLE geocoding_cache ADD address_hash_bin BINARY(32) NULL;
+    EXEC('UPDATE geocoding_cache SET address_hash_bin = CONVERT(BINARY(32), address_hash, 2)');
+    ALTER TABLE geocoding_cache DROP COLUMN address_hash;
+    EXEC sp_rename 'geocoding_cache.address_hash_bin', 'address_hash', 'COLUMN';
+    EXEC('ALTER TABLE geocoding_cache ALTER COLUMN address_hash BINARY(32) NOT NULL');
+    EXEC('ALTER TABLE geocoding_cache ADD CONSTRAINT uq_geocoding_cache_address_hash UNIQUE (address_hash)');
+    PRINT 'geocoding_cache.address_hash konvertiran u BINARY(32).';
+END
+GO
+
+-- ============================================================================
+-- distance_matrix_cache.origin_hash / dest_hash
+-- ============================================================================
+
+IF EXISTS (
+    SELECT * FROM sys.columns
+    WHERE object_id = OBJECT_ID('distance_matrix_cache') AND name = 'origin_hash'
+      AND TYPE_NAME(system_type_id) IN ('nvarchar', 'varchar')
+)
+BEGIN
+    IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_dmc_pair' AND object_id = OBJECT_ID('distance_matrix_cache'))
+        DROP INDEX ix_dmc_pair ON distance_matrix_cache;
+
+    ALTER TABLE distance_matrix_cache ADD origin_hash_bin BINARY(32) NULL, dest_hash_bin BINARY(32) NULL;
+    EXEC('UPDATE distance_matrix_cache
+          SET origin_hash_bin = CONVERT(BINARY(32), origin_hash, 2),
+              dest_hash_bin = CONVERT(BINARY(32), dest_hash, 2)');
+    ALTER TABLE distance_matrix_cache DROP COLUMN origin_hash, dest_hash;
+    EXEC sp_rename 'distance_matrix_cache.origin_hash_bin', 'origin_hash', 'COLUMN';
+    EXEC sp_rename 'distance_matrix_cache.dest_hash_bin', 'dest_hash', 'COLUMN';
+    EXEC('ALTER TABLE distance_matrix_cache ALTER COLUMN origin_hash BINARY(32) NOT NULL');
+    EXEC('ALTER TABLE distance_matrix_cache ALTER COLUMN dest_hash BINARY(32) NOT NULL');
+    EXEC('CREATE UNIQUE INDEX ix_dmc_pair ON distance_matrix_cache (origin_hash, dest_hash)');
+    PRINT 'distance_matrix_cache hash kolone konvertirane u BINARY(32).';
+END
+GO
+
+PRINT 'Migracija 015 zavrsena.';
+GO
@@ -0,0 +1,64 @@
+-- ============================================================================
+-- Migracija: Trigger za total_weight / total_volume na nalozi_header
+-- Datum: 2026-10-16
+-- Opis: Nakon INSERT/UPDATE/DELETE na nalozi_details trigger set-based
+--       preračunava total_weight = SUM(kolicina * artikli.masa) i
+--       total_volume = SUM(kolicina * artikli.volumen) za zahvaćene naloge.
+--       Sync više ne računa totale u Pythonu nakon upisa stavki.
+-- ============================================================================
+
+CREATE OR ALTER TRIGGER trg_nalozi_details_totals
+ON nalozi_details
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    -- UPDATE koji ne dira kolone bitne za totale (npr. samo synced_at) preskačemo
+    IF EXISTS (SELECT 1 FROM inserted) AND EXISTS (SELECT 1 FROM deleted)
+       AND NOT (UPDATE(kolicina) OR UPDATE(artikl_uid) OR UPDATE(nalog_prodaje_uid))
+        RETURN;
+
+    ;WITH affected AS (
+        SELECT nalog_prodaje_uid FROM inserted
+        UNION
+        SELECT nalog_prodaje_uid FROM deleted
+    )
+    UPDATE h
+    SET total_weight = ISNULL(s.total_weight, 0),
+        total_volume = ISNULL(s.total_volume, 0)
+    FROM nalozi_header h
+    JOIN affected a ON a.nalog_prodaje_uid = h.nalog_prodaje_uid
+    OUTER APPLY (
+        SELECT SUM(d.kolicina * ar.masa) AS total_weight,
+               SUM(d.kolicina * ar.volumen) AS total_volume
+        FROM nalozi_details d
+        LEFT JOIN artikli ar ON ar.artikl_uid = d.artikl_uid
+        WHERE d.nalog_prodaje_uid = h.nalog_prodaje_uid
+    ) s;
+END
+GO
+
+PRINT 'Trigger trg_nalozi_details_totals kreiran.';
+GO
+
+-- ============================================================================
+-- Jednokratno poravnanje postojećih totala
+-- ============================================================================
+
+UPDATE h
+SET total_weight = ISNULL(s.total_weight, 0),
+    total_volume = ISNULL(s.total_volume, 0)
+FROM nalozi_header h
+JOIN (
+    SELECT d.nalog_prodaje_uid,
+           SUM(d.kolicina * ar.masa) AS total_weight,
+           SUM(d.kolicina * ar.volumen) AS total_volume
+    FROM nalozi_details d
+    LEFT JOIN artikli ar ON ar.artikl_uid = d.artikl_uid
+    GROUP BY d.nalog_prodaje_uid
+) s ON s.nalog_prodaje_uid = h.nalog_prodaje_uid;
+GO
+
+PRINT 'Migracija 016 zavrsena.';
+GO
@@ -0,0 +1,109 @@
+-- ============================================================================
+-- Migracija: Vertikalna podjela nalozi_header (hot / fiscal)
+-- Datum: 2026-10-16
+-- Opis: Fiskalna i B2B polja (zki, jir, tip_racuna_*, predmet_*, user_*,
+--       *_b2b) sele se u nalozi_header_fiscal (1:1, PK = nalog_prodaje_uid).
+--       U nalozi_header ostaju kolone koje čitaju planer, POD i prikaz naloga.
+-- ============================================================================
+
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'nalozi_header_fiscal')
+BEGIN
+    CREATE TABLE nalozi_header_fiscal (
+        nalog_prodaje_uid NVARCHAR(50) NOT NULL,
+        nalog_prodaje_b2b NVARCHAR(50) NULL,
+        skladiste_b2b NVARCHAR(50) NULL,
+        na__skladiste_b2b NVARCHAR(50) NULL,
+        partner_b2b NVARCHAR(50) NULL,
+        korisnik__partner_b2b NVARCHAR(50) NULL,
+        agent__partner_b2b NVARCHAR(50) NULL,
+        valuta_b2b NVARCHAR(50) NULL,
+        sa__skladiste_b2b NVARCHAR(50) NULL,
+        skl_dokument_b2b NVARCHAR(50) NULL,
+        status_b2b NVARCHAR(50) NULL,
+        komercijalist__radnik_b2b NVARCHAR(50) NULL,
+        dostavljac__radnik_b2b NVARCHAR(50) NULL,
+        vrsta_isporuke_b2b NVARCHAR(50) NULL,
+        user_uid NVARCHAR(50) NULL,
+        username NVARCHAR(100) NULL,
+        user_b2b NVARCHAR(50) NULL,
+        tip_racuna_uid NVARCHAR(50) NULL,
+        tip_racuna NVARCHAR(20) NULL,
+        tip_racuna_b2b NVARCHAR(50) NULL,
+        predmet_uid NVARCHAR(50) NULL,
+        predmet NVARCHAR(50) NULL,
+        predmet_b2b NVARCHAR(50) NULL,
+        zki NVARCHAR(100) NULL,
+        jir NVARCHAR(100) NULL,
+        CONSTRAINT PK_nalozi_header_fiscal PRIMARY KEY (nalog_prodaje_uid),
+        CONSTRAINT FK_nalozi_header_fiscal_header FOREIGN KEY (nalog_prodaje_uid)
+            REFERENCES nalozi_header (nalog_prodaje_uid) ON DELETE CASCADE
+    );
+    PRINT 'Tablica nalozi_header_fiscal kreirana.';
+END
+GO
+
+-- ============================================================================
+-- Prebaci postojeće vrijednosti (samo nalozi koji imaju barem jedno polje)
+-- ============================================================================
+
+IF EXISTS (SELECT * FROM sys.columns WHERE object_id = OBJECT_ID('nalozi_header') AND name = 'zki')
+BEGIN
+    EXEC('
+    INSERT INTO nalozi_header_fiscal (
+        nalog_prodaje_uid, nalog_prodaje_b2b, skladiste_b2b, na__skladiste_b2b,
+        partner_b2b, korisnik__partner_b2b, agent__partner_b2b, valuta_b2b,
+        sa__skladiste_b2b, skl_dokument_b2b, status_b2b, komercijalist__radnik_b2b,
+        dostavljac__radnik_b2b, vrsta_isporuke_b2b, user_uid, username, user_b2b,
+        tip_racuna_uid, tip_racuna, tip_racuna_b2b, predmet_uid, predmet, predmet_b2b,
+        zki, jir
+    )
+    SELECT
+        h.nalog_prodaje_uid, h.nalog_prodaje_b2b, h.skladiste_b2b, h.na__skladiste_b2b,
+        h.partner_b2b, h.korisnik__partner_b2b, h.agent__partner_b2b, h.valuta_b2b,
+        h.sa__skladiste_b2b, h.skl_dokument_b2b, h.status_b2b, h.komercijalist__radnik_b2b,
+        h.dostavljac__radnik_b2b, h.vrsta_isporuke_b2b, h.user_uid, h.username, h.user_b2b,
+        h.tip_racuna_uid, h.tip_racuna, h.tip_racuna_b2b, h.predmet_uid, h.predmet, h.predmet_b2b,
+        h.zki, h.jir
+    FROM nalozi_header h
+    WHERE NOT EXISTS (SELECT 1 FROM nalozi_header_fiscal f WHERE f.nalog_prodaje_uid = h.nalog_prodaje_uid)
+      AND COALESCE(
+          h.nalog_prodaje_b2b, h.skladiste_b2b, h.na__skladiste_b2b, h.partner_b2b,
+          h.korisnik__partner_b2b, h.agent__partner_b2b, h.valuta_b2b, h.sa__skladiste_b2b,
+          h.skl_dokument_b2b, h.status_b2b, h.komercijalist__radnik_b2b, h.dostavljac__radnik_b2b,
+          h.vrsta_isporuke_b2b, h.user_uid, h.username, h.user_b2b, h.tip_racuna_uid,
+          h.tip_racuna, h.tip_racuna_b2b, h.predmet_uid, h.predmet, h.predmet_b2b, h.zki, h.jir
+      ) IS NOT NULL;
+    ');
+    PRINT 'Fiskalna/B2B polja prebačena u nalozi_header_fiscal.';
+END
+GO
+
+-- ============================================================================
+-- Ukloni hladne kolone iz nalozi_header
+-- ============================================================================
+
+DECLARE @col NVARCHAR(100);
+DECLARE cols CURSOR LOCAL FAST_FORWARD FOR
+    SELECT name FROM sys.columns
+    WHERE object_id = OBJECT_ID('nalozi_header')
+      AND name IN (
+          'nalog_prodaje_b2b', 'skladiste_b2b', 'na__skladiste_b2b', 'partner_b2b',
+          'korisnik__partner_b2b', 'agent__partner_b2b', 'valuta_b2b', 'sa__skladiste_b2b',
+          'skl_dokument_b2b', 'status_b2b', 'komercijalist__radnik_b2b', 'dostavljac__radnik_b2b',
+          'vrsta_isporuke_b2b', 'user_uid', 'username', 'user_b2b', 'tip_racuna_uid',
+          'tip_racuna', 'tip_racuna_b2b', 'predmet_uid', 'predmet', 'predmet_b2b', 'zki', 'jir'
+      );
+OPEN cols;
+FETCH NEXT FROM cols INTO @col;
+WHILE @@FETCH_STATUS = 0
+BEGIN
+    EXEC('ALTER TABLE nalozi_header DROP COLUMN ' + @col);
+    PRINT 'Kolona nalozi_header.' + @col + ' uklonjena.';
+    FETCH NEXT FROM cols INTO @col;
+END
+CLOSE cols;
+DEALLOCATE cols;
+GO
+
+PRINT 'Migracija 017 zavrsena.';
+GO
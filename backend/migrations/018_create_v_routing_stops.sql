@@ -0,0 +1,60 @@
+-- ============================================================================
+-- Migracija: Indeksirani view v_routing_stops (nalozi_header ⋈ partneri)
+-- Datum: 2026-10-16
+-- Opis: Projekcija koju planer čita (raspored, totali, regija, vrsta isporuke
+--       i adresa partnera) materijalizirana kao indeksirani view. MSSQL ga
+--       održava automatski pri upisu u bazne tablice (ekvivalent
+--       materijaliziranog viewa bez REFRESH-a). Indeksirani view ne dopušta
+--       OUTER JOIN, pa su uključeni samo nalozi s partnerom.
+-- ============================================================================
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_PADDING ON;
+SET ANSI_WARNINGS ON;
+SET ARITHABORT ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET NUMERIC_ROUNDABORT OFF;
+GO
+
+IF OBJECT_ID('dbo.v_routing_stops', 'V') IS NULL
+BEGIN
+    EXEC('
+    CREATE VIEW dbo.v_routing_stops
+    WITH SCHEMABINDING
+    AS
+    SELECT
+        h.nalog_prodaje_uid,
+        h.broj,
+        h.raspored,
+        h.status,
+        h.skladiste,
+        h.sa__skladiste,
+        h.vrsta_isporuke,
+        h.regija_id,
+        h.total_weight,
+        h.total_volume,
+        p.partner_uid,
+        p.naziv AS partner_naziv,
+        p.ime AS partner_ime,
+        p.prezime AS partner_prezime,
+        p.adresa,
+        p.naziv_mjesta,
+        p.postanski_broj,
+        p.drzava
+    FROM dbo.nalozi_header h
+    INNER JOIN dbo.partneri p ON p.partner_uid = h.partner_uid
+    ');
+    PRINT 'View v_routing_stops kreiran.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ux_v_routing_stops' AND object_id = OBJECT_ID('dbo.v_routing_stops'))
+BEGIN
+    CREATE UNIQUE CLUSTERED INDEX ux_v_routing_stops ON dbo.v_routing_stops (nalog_prodaje_uid);
+    PRINT 'Indeks ux_v_routing_stops kreiran.';
+END
+GO
+
+PRINT 'Migracija 018 zavrsena.';
+GO
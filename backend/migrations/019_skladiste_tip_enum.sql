@@ -0,0 +1,123 @@
+-- ============================================================================
+-- Migracija: Enum tipovi za skladista.tip i izvor_tip
+-- Datum: 2026-10-16
+-- Opis: skladista.tip postaje VARCHAR(10) s CHECK ('central', 'store') i
+--       defaultom 'store'; redundantna kolona is_central se uklanja (izvodi se
+--       iz tip). zone_izvori.izvor_tip i rute.izvor_tip dobivaju CHECK
+--       ('depot', 'store').
+-- ============================================================================
+
+-- ============================================================================
+-- skladista.tip
+-- ============================================================================
+
+IF EXISTS (SELECT * FROM sys.columns WHERE object_id = OBJECT_ID('skladista') AND name = 'is_central')
+BEGIN
+    EXEC('UPDATE skladista SET tip = ''central'' WHERE is_central = 1 AND (tip IS NULL OR tip <> ''central'')');
+    PRINT 'skladista.tip uskladen s is_central.';
+END
+GO
+
+UPDATE skladista SET tip = 'store' WHERE tip IS NULL OR tip NOT IN ('central', 'store');
+GO
+
+IF EXISTS (
+    SELECT * FROM sys.columns
+    WHERE object_id = OBJECT_ID('skladista') AND name = 'tip'
+      AND (TYPE_NAME(system_type_id) <> 'varchar' OR max_length <> 10)
+)
+BEGIN
+    ALTER TABLE skladista ALTER COLUMN tip VARCHAR(10) NOT NULL;
+    PRINT 'Kolona skladista.tip promijenjena u VARCHAR(10).';
+END
+GO
+
+IF NOT EXISTS (
+    SELECT * FROM sys.default_constraints
+    WHERE parent_object_id = OBJECT_ID('skladista')
+      AND parent_column_id = COLUMNPROPERTY(OBJECT_ID('skladista'), 'tip', 'ColumnId')
+)
+BEGIN
+    ALTER TABLE skladista ADD CONSTRAINT DF_skladista_tip DEFAULT 'store' FOR tip;
+    PRINT 'Default DF_skladista_tip dodan.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.check_constraints WHERE name = 'ck_skladista_tip')
+BEGIN
+    ALTER TABLE skladista ADD CONSTRAINT ck_skladista_tip CHECK (tip IN ('central', 'store'));
+    PRINT 'CHECK ck_skladista_tip dodan.';
+END
+GO
+
+-- Ukloni is_central (prvo njegov default constraint)
+IF EXISTS (SELECT * FROM sys.columns WHERE object_id = OBJECT_ID('skladista') AND name = 'is_central')
+BEGIN
+    DECLARE @df NVARCHAR(200);
+    SELECT @df = dc.name
+    FROM sys.default_constraints dc
+    WHERE dc.parent_object_id = OBJECT_ID('skladista')
+      AND dc.parent_column_id = COLUMNPROPERTY(OBJECT_ID('skladista'), 'is_central', 'ColumnId');
+    IF @df IS NOT NULL
+        EXEC('ALTER TABLE skladista DROP CONSTRAINT ' + @df);
+    ALTER TABLE skladista DROP COLUMN is_central;
+    PRINT 'Kolona skladista.is_central uklonjena.';
+END
+GO
+
+-- ============================================================================
+-- zone_izvori.izvor_tip
+-- ============================================================================
+
+IF EXISTS (
+    SELECT * FROM sys.columns
+    WHERE object_id = OBJECT_ID('zone_izvori') AND name = 'izvor_tip'
+      AND (TYPE_NAME(system_type_id) <> 'varchar' OR max_length <> 10)
+)
+BEGIN
+    ALTER TABLE zone_izvori ALTER COLUMN izvor_tip VARCHAR(10) NOT NULL;
+    PRINT 'Kolona zone_izvori.izvor_tip promijenjena u VARCHAR(10).';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.check_constraints WHERE name = 'ck_zone_izvori_izvor_tip')
+BEGIN
+    IF EXISTS (SELECT 1 FROM zone_izvori WHERE izvor_tip NOT IN ('depot', 'store'))
+        PRINT 'UPOZORENJE: zone_izvori sadrzi izvor_tip izvan (depot, store) - CHECK nije dodan.';
+    ELSE
+    BEGIN
+        ALTER TABLE zone_izvori ADD CONSTRAINT ck_zone_izvori_izvor_tip CHECK (izvor_tip IN ('depot', 'store'));
+        PRINT 'CHECK ck_zone_izvori_izvor_tip dodan.';
+    END
+END
+GO
+
+-- ============================================================================
+-- rute.izvor_tip
+-- ============================================================================
+
+IF EXISTS (
+    SELECT * FROM sys.columns
+    WHERE object_id = OBJECT_ID('rute') AND name = 'izvor_tip'
+      AND (TYPE_NAME(system_type_id) <> 'varchar' OR max_length <> 10)
+)
+BEGIN
+    ALTER TABLE rute ALTER COLUMN izvor_tip VARCHAR(10) NULL;
+    PRINT 'Kolona rute.izvor_tip promijenjena u VARCHAR(10).';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.check_constraints WHERE name = 'ck_rute_izvor_tip')
+BEGIN
+    IF EXISTS (SELECT 1 FROM rute WHERE izvor_tip NOT IN ('depot', 'store'))
+        PRINT 'UPOZORENJE: rute sadrzi izvor_tip izvan (depot, store) - CHECK nije dodan.';
+    ELSE
+    BEGIN
+        ALTER TABLE rute ADD CONSTRAINT ck_rute_izvor_tip CHECK (izvor_tip IN ('depot', 'store'));
+        PRINT 'CHECK ck_rute_izvor_tip dodan.';
+    END
+END
+GO
+
+PRINT 'Migracija 019 zavrsena.';
+GO
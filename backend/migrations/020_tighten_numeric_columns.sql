@@ -0,0 +1,82 @@
+-- ============================================================================
+-- Migracija: Uže numeričke kolone za artikle, partnere i koordinate
+-- Datum: 2026-10-16
+-- Opis: Cijene artikala -> DECIMAL(12,4), mase/dimenzije -> DECIMAL(9,3),
+--       volumen -> DECIMAL(9,6), partneri.rabat -> DECIMAL(5,2).
+--       DECIMAL s preciznošću <= 9 zauzima 5 bajtova umjesto 9.
+--       lat/lng skladišta i geocoding cachea -> FLOAT (8 bajtova).
+--       Kolona se mijenja samo ako sve postojeće vrijednosti stanu u novi
+--       raspon; inače se ispisuje upozorenje i kolona ostaje kakva jest.
+-- ============================================================================
+
+DECLARE @cols TABLE (
+    tbl SYSNAME NOT NULL,
+    col SYSNAME NOT NULL,
+    tip NVARCHAR(30) NOT NULL,
+    type_name SYSNAME NOT NULL,
+    prec TINYINT NULL,
+    scale TINYINT NULL,
+    max_abs DECIMAL(38, 8) NULL
+);
+
+INSERT INTO @cols (tbl, col, tip, type_name, prec, scale, max_abs) VALUES
+    ('artikli', 'vpc', 'DECIMAL(12,4)', 'decimal', 12, 4, 99999999.9999),
+    ('artikli', 'mpc', 'DECIMAL(12,4)', 'decimal', 12, 4, 99999999.9999),
+    ('artikli', 'duzina', 'DECIMAL(9,3)', 'decimal', 9, 3, 999999.999),
+    ('artikli', 'sirina', 'DECIMAL(9,3)', 'decimal', 9, 3, 999999.999),
+    ('artikli', 'visina', 'DECIMAL(9,3)', 'decimal', 9, 3, 999999.999),
+    ('artikli', 'masa', 'DECIMAL(9,3)', 'decimal', 9, 3, 999999.999),
+    ('artikli', 'volumen', 'DECIMAL(9,6)', 'decimal', 9, 6, 999.999999),
+    ('artikli', 'pakiranje_masa', 'DECIMAL(9,3)', 'decimal', 9, 3, 999999.999),
+    ('artikli', 'pakiranje_trans_masa', 'DECIMAL(9,3)', 'decimal', 9, 3, 999999.999),
+    ('artikli', 'pakiranje_trans_duzina', 'DECIMAL(9,3)', 'decimal', 9, 3, 999999.999),
+    ('artikli', 'pakiranje_trans_sirina', 'DECIMAL(9,3)', 'decimal', 9, 3, 999999.999),
+    ('artikli', 'pakiranje_trans_visina', 'DECIMAL(9,3)', 'decimal', 9, 3, 999999.999),
+    ('artikli', 'masa_netto', 'DECIMAL(9,3)', 'decimal', 9, 3, 999999.999),
+    ('artikli', 'pakiranje_duzina', 'DECIMAL(9,3)', 'decimal', 9, 3, 999999.999),
+    ('artikli', 'pakiranje_visina', 'DECIMAL(9,3)', 'decimal', 9, 3, 999999.999),
+    ('artikli', 'pakiranje_sirina', 'DECIMAL(9,3)', 'decimal', 9, 3, 999999.999),
+    ('partneri', 'rabat', 'DECIMAL(5,2)', 'decimal', 5, 2, 999.99),
+    ('skladista', 'lat', 'FLOAT', 'float', NULL, NULL, NULL),
+    ('skladista', 'lng', 'FLOAT', 'float', NULL, NULL, NULL),
+    ('geocoding_cache', 'lat', 'FLOAT', 'float', NULL, NULL, NULL),
+    ('geocoding_cache', 'lng', 'FLOAT', 'float', NULL, NULL, NULL);
+
+DECLARE @tbl SYSNAME, @col SYSNAME, @tip NVARCHAR(30), @type_name SYSNAME,
+        @prec TINYINT, @scale TINYINT, @max_abs DECIMAL(38, 8), @n INT, @sql NVARCHAR(MAX);
+
+DECLARE cols CURSOR LOCAL FAST_FORWARD FOR
+    SELECT c.tbl, c.col, c.tip, c.type_name, c.prec, c.scale, c.max_abs
+    FROM @cols c
+    JOIN sys.columns sc ON sc.object_id = OBJECT_ID(c.tbl) AND sc.name = c.col
+    WHERE TYPE_NAME(sc.system_type_id) <> c.type_name
+       OR (c.prec IS NOT NULL AND (sc.precision <> c.prec OR sc.scale <> c.scale));
+OPEN cols;
+FETCH NEXT FROM cols INTO @tbl, @col, @tip, @type_name, @prec, @scale, @max_abs;
+WHILE @@FETCH_STATUS = 0
+BEGIN
+    SET @n = 0;
+    IF @max_abs IS NOT NULL
+    BEGIN
+        SET @sql = N'SELECT @n = COUNT(*) FROM ' + QUOTENAME(@tbl)
+                 + N' WHERE ABS(' + QUOTENAME(@col) + N') > @max_abs';
+        EXEC sp_executesql @sql, N'@n INT OUTPUT, @max_abs DECIMAL(38, 8)', @n = @n OUTPUT, @max_abs = @max_abs;
+    END
+
+    IF @n > 0
+        PRINT 'UPOZORENJE: ' + @tbl + '.' + @col + ' ima ' + CAST(@n AS NVARCHAR(20))
+            + ' vrijednosti izvan raspona ' + @tip + ' - kolona nije promijenjena.';
+    ELSE
+    BEGIN
+        EXEC('ALTER TABLE ' + @tbl + ' ALTER COLUMN ' + @col + ' ' + @tip + ' NULL');
+        PRINT 'Kolona ' + @tbl + '.' + @col + ' promijenjena u ' + @tip + '.';
+    END
+
+    FETCH NEXT FROM cols INTO @tbl, @col, @tip, @type_name, @prec, @scale, @max_abs;
+END
+CLOSE cols;
+DEALLOCATE cols;
+GO
+
+PRINT 'Migracija 020 zavrsena.';
+GO
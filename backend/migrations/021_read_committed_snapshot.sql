@@ -0,0 +1,24 @@
+-- ============================================================================
+-- Migracija: READ_COMMITTED_SNAPSHOT za bazu aplikacije
+-- Datum: 2026-10-16
+-- Opis: Uz row versioning čitatelji (planer, liste naloga) ne čekaju na
+--       lockove sync transakcija nad nalozi_header/nalozi_details, a
+--       aplikacija i dalje radi na READ COMMITTED razini.
+--       NAPOMENA: ALTER DATABASE s ROLLBACK IMMEDIATE prekida aktivne
+--       transakcije – pokrenuti kad backend ne radi.
+-- ============================================================================
+
+IF EXISTS (
+    SELECT * FROM sys.databases
+    WHERE name = DB_NAME() AND is_read_committed_snapshot_on = 0
+)
+BEGIN
+    DECLARE @sql NVARCHAR(400) =
+        N'ALTER DATABASE ' + QUOTENAME(DB_NAME()) + N' SET READ_COMMITTED_SNAPSHOT ON WITH ROLLBACK IMMEDIATE';
+    EXEC(@sql);
+    PRINT 'READ_COMMITTED_SNAPSHOT ukljucen.';
+END
+GO
+
+PRINT 'Migracija 021 zavrsena.';
+GO
@@ -0,0 +1,151 @@
+-- ============================================================================
+-- Migracija: Soft-delete na nalozi_header + FK rute_stops -> nalozi_header
+-- Datum: 2026-10-16
+-- Opis: Nalozi prebačeni u rutiranje/arhivu ili blacklistani dobivaju
+--       deleted_at umjesto DELETE-a, pa rute_stops.nalog_uid ponovno može
+--       imati FK (i indeks) prema nalozi_header. Za postojeće stopove i
+--       naloge u rutiranju čiji je original već fizički obrisan upisuju se
+--       soft-deleteani stub redovi. Filtrirani indeks iz 013 i view
+--       v_routing_stops iz 018 isključuju soft-deleteane naloge.
+-- ============================================================================
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_PADDING ON;
+SET ANSI_WARNINGS ON;
+SET ARITHABORT ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET NUMERIC_ROUNDABORT OFF;
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE object_id = OBJECT_ID('nalozi_header') AND name = 'deleted_at')
+BEGIN
+    ALTER TABLE nalozi_header ADD deleted_at DATETIME NULL;
+    PRINT 'Kolona nalozi_header.deleted_at dodana.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_nalozi_header_deleted_at' AND object_id = OBJECT_ID('nalozi_header'))
+BEGIN
+    CREATE NONCLUSTERED INDEX ix_nalozi_header_deleted_at ON nalozi_header (deleted_at);
+    PRINT 'Indeks ix_nalozi_header_deleted_at kreiran.';
+END
+GO
+
+-- ============================================================================
+-- Filtrirani indeks planera: samo aktivni (ne soft-deleteani) nalozi
+-- ============================================================================
+
+IF EXISTS (
+    SELECT * FROM sys.indexes
+    WHERE name = 'ix_nalozi_header_raspored_active' AND object_id = OBJECT_ID('nalozi_header')
+      AND filter_definition NOT LIKE '%deleted_at%'
+)
+BEGIN
+    DROP INDEX ix_nalozi_header_raspored_active ON nalozi_header;
+    PRINT 'Stari ix_nalozi_header_raspored_active obrisan.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_nalozi_header_raspored_active' AND object_id = OBJECT_ID('nalozi_header'))
+BEGIN
+    CREATE NONCLUSTERED INDEX ix_nalozi_header_raspored_active
+        ON nalozi_header (raspored, status)
+        INCLUDE (partner_uid, vrsta_isporuke, skladiste, sa__skladiste, regija_id, total_weight, total_volume)
+        WHERE raspored IS NOT NULL AND deleted_at IS NULL;
+    PRINT 'Indeks ix_nalozi_header_raspored_active kreiran (bez soft-deleteanih).';
+END
+GO
+
+-- ============================================================================
+-- v_routing_stops: isključi soft-deleteane naloge
+-- ============================================================================
+
+IF OBJECT_ID('dbo.v_routing_stops', 'V') IS NOT NULL
+   AND OBJECT_DEFINITION(OBJECT_ID('dbo.v_routing_stops')) NOT LIKE '%deleted_at%'
+BEGIN
+    DROP VIEW dbo.v_routing_stops;
+    PRINT 'Stari view v_routing_stops obrisan.';
+END
+GO
+
+IF OBJECT_ID('dbo.v_routing_stops', 'V') IS NULL
+BEGIN
+    EXEC('
+    CREATE VIEW dbo.v_routing_stops
+    WITH SCHEMABINDING
+    AS
+    SELECT
+        h.nalog_prodaje_uid,
+        h.broj,
+        h.raspored,
+        h.status,
+        h.skladiste,
+        h.sa__skladiste,
+        h.vrsta_isporuke,
+        h.regija_id,
+        h.total_weight,
+        h.total_volume,
+        p.partner_uid,
+        p.naziv AS partner_naziv,
+        p.ime AS partner_ime,
+        p.prezime AS partner_prezime,
+        p.adresa,
+        p.naziv_mjesta,
+        p.postanski_broj,
+        p.drzava
+    FROM dbo.nalozi_header h
+    INNER JOIN dbo.partneri p ON p.partner_uid = h.partner_uid
+    WHERE h.deleted_at IS NULL
+    ');
+    PRINT 'View v_routing_stops kreiran.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ux_v_routing_stops' AND object_id = OBJECT_ID('dbo.v_routing_stops'))
+BEGIN
+    CREATE UNIQUE CLUSTERED INDEX ux_v_routing_stops ON dbo.v_routing_stops (nalog_prodaje_uid);
+    PRINT 'Indeks ux_v_routing_stops kreiran.';
+END
+GO
+
+-- ============================================================================
+-- Stub redovi za naloge čiji je original već fizički obrisan
+-- ============================================================================
+
+INSERT INTO nalozi_header (nalog_prodaje_uid, broj, datum, raspored, deleted_at)
+SELECT r.nalog_prodaje_uid, r.broj, r.datum, r.raspored, GETUTCDATE()
+FROM nalozi_header_rutiranje r
+WHERE NOT EXISTS (SELECT 1 FROM nalozi_header h WHERE h.nalog_prodaje_uid = r.nalog_prodaje_uid);
+PRINT 'Stub redovi za naloge u rutiranju: ' + CAST(@@ROWCOUNT AS NVARCHAR(20));
+GO
+
+INSERT INTO nalozi_header (nalog_prodaje_uid, deleted_at)
+SELECT DISTINCT s.nalog_uid, GETUTCDATE()
+FROM rute_stops s
+WHERE NOT EXISTS (SELECT 1 FROM nalozi_header h WHERE h.nalog_prodaje_uid = s.nalog_uid);
+PRINT 'Stub redovi za stopove ruta: ' + CAST(@@ROWCOUNT AS NVARCHAR(20));
+GO
+
+-- ============================================================================
+-- FK + indeks rute_stops.nalog_uid
+-- ============================================================================
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_rute_stops_nalog_uid' AND object_id = OBJECT_ID('rute_stops'))
+BEGIN
+    CREATE NONCLUSTERED INDEX ix_rute_stops_nalog_uid ON rute_stops (nalog_uid);
+    PRINT 'Indeks ix_rute_stops_nalog_uid kreiran.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.foreign_keys WHERE name = 'FK_rute_stops_nalozi_header')
+BEGIN
+    ALTER TABLE rute_stops WITH CHECK
+        ADD CONSTRAINT FK_rute_stops_nalozi_header
+        FOREIGN KEY (nalog_uid) REFERENCES nalozi_header (nalog_prodaje_uid);
+    PRINT 'FK_rute_stops_nalozi_header dodan.';
+END
+GO
+
+PRINT 'Migracija 022 zavrsena.';
+GO
@@ -0,0 +1,37 @@
+-- ============================================================================
+-- Migracija: Binarna geometrija rute u rute_polylines
+-- Datum: 2026-10-16
+-- Opis: Dosadašnja tekstualna kolona polyline (JSON [[lat, lng], ...]) se
+--       preimenuje u polyline_encoded i ostaje za postojeće rute; nova
+--       kolona polyline je VARBINARY(MAX) s float32 nizom koordinata
+--       (app/utils/polyline.py). Nove i ponovno izračunate rute pišu samo
+--       binarni format. Tablica se rebuilda s PAGE kompresijom.
+-- ============================================================================
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE object_id = OBJECT_ID('rute_polylines') AND name = 'polyline_encoded')
+BEGIN
+    EXEC sp_rename 'rute_polylines.polyline', 'polyline_encoded', 'COLUMN';
+    ALTER TABLE rute_polylines ALTER COLUMN polyline_encoded NVARCHAR(MAX) NULL;
+    PRINT 'Kolona rute_polylines.polyline preimenovana u polyline_encoded.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE object_id = OBJECT_ID('rute_polylines') AND name = 'polyline')
+BEGIN
+    ALTER TABLE rute_polylines ADD polyline VARBINARY(MAX) NULL;
+    PRINT 'Kolona rute_polylines.polyline (VARBINARY) dodana.';
+END
+GO
+
+IF EXISTS (
+    SELECT * FROM sys.partitions
+    WHERE object_id = OBJECT_ID('rute_polylines') AND data_compression_desc <> 'PAGE'
+)
+BEGIN
+    ALTER TABLE rute_polylines REBUILD WITH (DATA_COMPRESSION = PAGE);
+    PRINT 'rute_polylines rebuildana s PAGE kompresijom.';
+END
+GO
+
+PRINT 'Migracija 023 zavrsena.';
+GO
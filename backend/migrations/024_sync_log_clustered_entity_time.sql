@@ -0,0 +1,64 @@
+-- ============================================================================
+-- Migracija: sync_log - BIGINT id i clustered (entity, started_at DESC)
+-- Datum: 2026-10-16
+-- Opis: sync_log.id (i refresh_log.sync_log_id) postaje BIGINT. PK na id
+--       postaje NONCLUSTERED, a clustered indeks je (entity, started_at DESC)
+--       pa je upit "zadnji sync za entitet" seek na prvi redak.
+-- ============================================================================
+
+-- Skini postojeći (clustered) PK na sync_log
+DECLARE @pk NVARCHAR(200);
+SELECT @pk = kc.name
+FROM sys.key_constraints kc
+JOIN sys.indexes i ON i.object_id = kc.parent_object_id AND i.index_id = kc.unique_index_id
+WHERE kc.parent_object_id = OBJECT_ID('sync_log') AND kc.type = 'PK' AND i.type_desc = 'CLUSTERED';
+IF @pk IS NOT NULL
+BEGIN
+    EXEC('ALTER TABLE sync_log DROP CONSTRAINT ' + @pk);
+    PRINT 'Clustered PK ' + @pk + ' na sync_log uklonjen.';
+END
+GO
+
+IF EXISTS (
+    SELECT * FROM sys.columns
+    WHERE object_id = OBJECT_ID('sync_log') AND name = 'id' AND TYPE_NAME(system_type_id) = 'int'
+)
+BEGIN
+    ALTER TABLE sync_log ALTER COLUMN id BIGINT NOT NULL;
+    PRINT 'Kolona sync_log.id promijenjena u BIGINT.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_sync_log_entity_time' AND object_id = OBJECT_ID('sync_log'))
+BEGIN
+    CREATE CLUSTERED INDEX ix_sync_log_entity_time ON sync_log (entity, started_at DESC);
+    PRINT 'Clustered indeks ix_sync_log_entity_time kreiran.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.key_constraints WHERE parent_object_id = OBJECT_ID('sync_log') AND type = 'PK')
+BEGIN
+    ALTER TABLE sync_log ADD CONSTRAINT PK_sync_log PRIMARY KEY NONCLUSTERED (id);
+    PRINT 'Nonclustered PK_sync_log dodan.';
+END
+GO
+
+-- ============================================================================
+-- refresh_log.sync_log_id -> BIGINT
+-- ============================================================================
+
+IF EXISTS (
+    SELECT * FROM sys.columns
+    WHERE object_id = OBJECT_ID('refresh_log') AND name = 'sync_log_id' AND TYPE_NAME(system_type_id) = 'int'
+)
+BEGIN
+    IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_refresh_log_sync' AND object_id = OBJECT_ID('refresh_log'))
+        DROP INDEX IX_refresh_log_sync ON refresh_log;
+    ALTER TABLE refresh_log ALTER COLUMN sync_log_id BIGINT NULL;
+    CREATE INDEX IX_refresh_log_sync ON refresh_log (sync_log_id);
+    PRINT 'Kolona refresh_log.sync_log_id promijenjena u BIGINT.';
+END
+GO
+
+PRINT 'Migracija 024 zavrsena.';
+GO
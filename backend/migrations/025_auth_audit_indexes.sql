@@ -0,0 +1,46 @@
+-- ============================================================================
+-- Migracija: Indeksi za audit_log i refresh_tokens
+-- Datum: 2026-10-16
+-- Opis: audit_log se lista po created_at DESC (opcionalno po korisniku) i
+--       traži po (entity, entity_id); refresh_tokens se na svakom refreshu
+--       i logoutu traži po token_hash. Obje tablice dosad nisu imale indekse
+--       osim PK-a pa je svaki upit bio table scan.
+-- ============================================================================
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_audit_log_created_at' AND object_id = OBJECT_ID('audit_log'))
+BEGIN
+    CREATE NONCLUSTERED INDEX ix_audit_log_created_at ON audit_log (created_at DESC);
+    PRINT 'Indeks ix_audit_log_created_at kreiran.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_audit_log_user_created' AND object_id = OBJECT_ID('audit_log'))
+BEGIN
+    CREATE NONCLUSTERED INDEX ix_audit_log_user_created ON audit_log (user_id, created_at DESC);
+    PRINT 'Indeks ix_audit_log_user_created kreiran.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_audit_log_entity' AND object_id = OBJECT_ID('audit_log'))
+BEGIN
+    CREATE NONCLUSTERED INDEX ix_audit_log_entity ON audit_log (entity, entity_id);
+    PRINT 'Indeks ix_audit_log_entity kreiran.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_refresh_tokens_token_hash' AND object_id = OBJECT_ID('refresh_tokens'))
+BEGIN
+    CREATE NONCLUSTERED INDEX ix_refresh_tokens_token_hash ON refresh_tokens (token_hash);
+    PRINT 'Indeks ix_refresh_tokens_token_hash kreiran.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_refresh_tokens_user_revoked' AND object_id = OBJECT_ID('refresh_tokens'))
+BEGIN
+    CREATE NONCLUSTERED INDEX ix_refresh_tokens_user_revoked ON refresh_tokens (user_id, revoked);
+    PRINT 'Indeks ix_refresh_tokens_user_revoked kreiran.';
+END
+GO
+
+PRINT 'Migracija 025 zavrsena.';
+GO
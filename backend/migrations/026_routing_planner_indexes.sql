@@ -0,0 +1,47 @@
+-- ============================================================================
+-- Migracija: Indeksi za skenove planera ruta
+-- Datum: 2026-10-16
+-- Opis: vozila/vozaci.warehouse_id dobivaju indeks (liste po skladištu),
+--       rute dobivaju (warehouse_id, datum) za listu ruta i filtrirani
+--       indeks aktivnih ruta (PLANNED/IN_PROGRESS) za vozačku aplikaciju.
+--       nalozi_header (raspored, status) je već pokriven filtriranim
+--       ix_nalozi_header_raspored_active iz migracije 022.
+-- ============================================================================
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_vozila_warehouse_id' AND object_id = OBJECT_ID('vozila'))
+BEGIN
+    CREATE NONCLUSTERED INDEX ix_vozila_warehouse_id ON vozila (warehouse_id);
+    PRINT 'Indeks ix_vozila_warehouse_id kreiran.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_vozaci_warehouse_id' AND object_id = OBJECT_ID('vozaci'))
+BEGIN
+    CREATE NONCLUSTERED INDEX ix_vozaci_warehouse_id ON vozaci (warehouse_id);
+    PRINT 'Indeks ix_vozaci_warehouse_id kreiran.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_rute_warehouse_datum' AND object_id = OBJECT_ID('rute'))
+BEGIN
+    CREATE NONCLUSTERED INDEX ix_rute_warehouse_datum ON rute (warehouse_id, datum);
+    PRINT 'Indeks ix_rute_warehouse_datum kreiran.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_rute_active' AND object_id = OBJECT_ID('rute'))
+BEGIN
+    CREATE NONCLUSTERED INDEX ix_rute_active
+        ON rute (status, datum)
+        INCLUDE (vozilo_id, vozac_id, driver_user_id)
+        WHERE status IN ('PLANNED', 'IN_PROGRESS');
+    PRINT 'Indeks ix_rute_active kreiran.';
+END
+GO
+
+PRINT 'Migracija 026 zavrsena.';
+GO
@@ -0,0 +1,28 @@
+-- ============================================================================
+-- Migracija: Kompaktni ključ lokacije u distance_matrix_cache
+-- Datum: 2026-10-16
+-- Opis: origin_hash / dest_hash više nisu SHA-256 digest (BINARY(32)) nego
+--       koordinate zaokružene na 5 decimala spakirane kao dva int32
+--       (BINARY(8)). Stari ključevi se ne mogu pretvoriti (SHA-256 nije
+--       reverzibilan), pa se cache isprazni i puni ponovo pri rutiranju.
+-- ============================================================================
+
+IF EXISTS (
+    SELECT * FROM sys.columns
+    WHERE object_id = OBJECT_ID('distance_matrix_cache') AND name = 'origin_hash'
+      AND max_length = 32
+)
+BEGIN
+    IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'ix_dmc_pair' AND object_id = OBJECT_ID('distance_matrix_cache'))
+        DROP INDEX ix_dmc_pair ON distance_matrix_cache;
+
+    TRUNCATE TABLE distance_matrix_cache;
+    ALTER TABLE distance_matrix_cache ALTER COLUMN origin_hash BINARY(8) NOT NULL;
+    ALTER TABLE distance_matrix_cache ALTER COLUMN dest_hash BINARY(8) NOT NULL;
+    EXEC('CREATE UNIQUE INDEX ix_dmc_pair ON distance_matrix_cache (origin_hash, dest_hash)');
+    PRINT 'distance_matrix_cache hash kolone skracene na BINARY(8).';
+END
+GO
+
+PRINT 'Migracija 027 zavrsena.';
+GO
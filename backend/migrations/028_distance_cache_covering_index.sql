@@ -0,0 +1,30 @@
+-- ============================================================================
+-- Migracija: Pokrivajući indeks za distance_matrix_cache
+-- Datum: 2026-10-16
+-- Opis: ix_dmc_pair (origin_hash, dest_hash) dobiva INCLUDE (distance_m,
+--       duration_s) pa lookup pojedinog para i preload matrice čitaju samo
+--       indeks, bez key lookupa na clustered PK. MSSQL nema hash indekse na
+--       disk tablicama; unique B-tree po paru ostaje jedini indeks.
+-- ============================================================================
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+GO
+
+IF NOT EXISTS (
+    SELECT * FROM sys.index_columns ic
+    JOIN sys.indexes i ON i.object_id = ic.object_id AND i.index_id = ic.index_id
+    WHERE i.name = 'ix_dmc_pair' AND i.object_id = OBJECT_ID('distance_matrix_cache')
+      AND ic.is_included_column = 1
+)
+BEGIN
+    CREATE UNIQUE NONCLUSTERED INDEX ix_dmc_pair
+        ON distance_matrix_cache (origin_hash, dest_hash)
+        INCLUDE (distance_m, duration_s)
+        WITH (DROP_EXISTING = ON);
+    PRINT 'Indeks ix_dmc_pair prosiren s INCLUDE (distance_m, duration_s).';
+END
+GO
+
+PRINT 'Migracija 028 zavrsena.';
+GO
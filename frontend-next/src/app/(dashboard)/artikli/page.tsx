@@ -147,15 +147,21 @@ export default function ArtikliPage() {
     onError: (error: Error) => toast.error(error.message),
   })
 
+  // Import se izvršava u backgroundu — prati se preko sync statusa dok ne završi
   const importMutation = useMutation({
-    mutationFn: (file: File) => itemsApi.importArtikliKriterija(file),
-    onSuccess: (data) => {
-      toast.success(
-        `Import završen: ${data.imported} dodano, ${data.skipped} preskočeno.`
-      )
-      if (data.errors.length > 0) {
-        toast.error(`Greške: ${data.errors.slice(0, 3).join("; ")}`)
+    mutationFn: async (file: File) => {
+      const started = await itemsApi.importArtikliKriterija(file)
+      for (;;) {
+        await new Promise((resolve) => setTimeout(resolve, 2000))
+        const resp = await syncApi.status(started.sync_id)
+        if (resp.status === "COMPLETED") return resp
+        if (resp.status === "FAILED" || resp.status === "NOT_FOUND") {
+          throw new Error(resp.message || "Import nije uspio")
+        }
       }
+    },
+    onSuccess: (data) => {
+      toast.success(`Import završen. ${data.message ?? ""}`)
       queryClient.invalidateQueries({ queryKey: ["artikli-kriterija"] })
       queryClient.invalidateQueries({ queryKey: ["artikli-kriterija-sifre"] })
     },
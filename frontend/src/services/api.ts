@@ -532,7 +532,7 @@ export const itemsApi = {
       const err = await response.json().catch(() => ({ detail: response.statusText }))
       throw new Error(err.detail || 'Import nije uspio')
     }
-    return response.json() as Promise<{ imported: number; skipped: number; errors: string[] }>
+    return response.json() as Promise<SyncResponse>
   },
 }
 